@@ -0,0 +1,38 @@
+"""
+Fixed-size Bloom filter used to answer "definitely not revoked" in memory.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Probabilistic set with no false negatives and a tunable false-positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing (Kirsch-Mitzenmacher) from a single 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def is_saturated(self) -> bool:
+        """True once more keys were added than the filter was sized for"""
+        return self.count > self.capacity
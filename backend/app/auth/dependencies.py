@@ -1,22 +1,53 @@
 from typing import Optional
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.config import settings
 from app.models.user import User
+from app.models.company import Company
 from app.models.new_hire import NewHire
 from app.auth.jwt import verify_token
+from app.auth.principal_cache import PrincipalCache
+from app.auth.revocation import revocation_store
 import uuid
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    token = credentials.credentials
+@dataclass(frozen=True)
+class TenantContext:
+    """Authenticated admin user and the company every query is scoped to"""
+    user_id: uuid.UUID
+    company_id: uuid.UUID
+    email: str
+    role: str
+
+
+principal_cache: PrincipalCache[TenantContext] = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_size
+)
+
+
+def invalidate_principal(user_id) -> None:
+    """Forget a user's cached TenantContext (logout, revocation, user changes)"""
+    try:
+        principal_cache.invalidate(uuid.UUID(str(user_id)))
+    except ValueError:
+        pass
+
+
+def invalidate_company_principals(company_id) -> None:
+    """Forget the cached TenantContext of every user of a company"""
+    company_uuid = uuid.UUID(str(company_id))
+    principal_cache.invalidate_where(lambda tenant: tenant.company_id == company_uuid)
+
+
+def _access_token_subject(token: str, db: Session) -> uuid.UUID:
+    """Validate an access token and return its user ID"""
     payload = verify_token(token)
     
     if not payload or payload.get("type") != "access":
@@ -34,15 +65,31 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Convert string user_id to UUID
+    # In-memory Bloom check; the database is only consulted on a match
+    family_id = payload.get("fam")
+    if family_id and revocation_store.is_revoked(db, family_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     try:
-        user_uuid = uuid.UUID(user_id)
+        return uuid.UUID(user_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID format",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user"""
+    user_uuid = _access_token_subject(credentials.credentials, db)
     
     user = db.query(User).filter(User.id == user_uuid, User.is_active == True).first()
     if not user:
@@ -55,6 +102,38 @@ def get_current_user(
     return user
 
 
+def get_tenant_context(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TenantContext:
+    """Resolve the authenticated user and their company in one query.
+    
+    Results are cached per user for PRINCIPAL_CACHE_TTL_SECONDS, so repeated
+    admin requests do not touch the database for authentication at all.
+    """
+    user_uuid = _access_token_subject(credentials.credentials, db)
+    
+    tenant = principal_cache.get(user_uuid)
+    if tenant is not None:
+        return tenant
+    
+    row = db.query(User.id, User.email, User.role, Company.id).join(
+        Company, Company.id == User.company_id
+    ).filter(User.id == user_uuid, User.is_active == True).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_id, email, role, company_id = row
+    tenant = TenantContext(user_id=user_id, company_id=company_id, email=email, role=role or "admin")
+    principal_cache.set(user_uuid, tenant)
+    return tenant
+
+
 def get_current_new_hire(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -110,4 +189,18 @@ def get_optional_user(
     try:
         return get_current_user(credentials, db)
     except HTTPException:
-        return None 
\ No newline at end of file
+        return None 
+
+
+def get_optional_tenant_context(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> Optional[TenantContext]:
+    """Tenant context if a valid admin token was sent, otherwise None"""
+    if not credentials:
+        return None
+    
+    try:
+        return get_tenant_context(credentials, db)
+    except HTTPException:
+        return None
@@ -0,0 +1,120 @@
+"""
+Password hashing off the event loop.
+bcrypt takes 100-300 ms per call; running it inline in an async handler
+stalls every other request on the worker. Hashes and verifications run on a
+small dedicated thread pool (bcrypt releases the GIL) with a bounded queue,
+so a login burst degrades into fast 503s instead of unbounded latency.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+import asyncio
+import os
+import threading
+import time
+from app.config import settings
+from app.auth.jwt import pwd_context
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue is full; surfaced to clients as 503"""
+
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt with queue-depth metrics"""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "queue_wait_seconds": 0.0,
+            "hash_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run func(*args) on the pool, rejecting when the queue is full"""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise PasswordHashingBusy("Password hashing queue is full")
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+            queue_depth = self._in_flight - min(self._in_flight, self.max_workers)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], queue_depth)
+
+        submitted_at = time.perf_counter()
+
+        def _timed_call():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._stats["queue_wait_seconds"] += started_at - submitted_at
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._stats["hash_seconds"] += time.perf_counter() - started_at
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _timed_call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats["completed"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool size, queue depth and cumulative timings"""
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.max_workers,
+                "queue_capacity": self.max_queue,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                **self._stats,
+                "avg_queue_wait_ms": round(self._stats["queue_wait_seconds"] * 1000 / completed, 2) if completed else 0.0,
+                "avg_hash_ms": round(self._stats["hash_seconds"] * 1000 / completed, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue_size
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool"""
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
@@ -1,13 +1,75 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+import hashlib
+import threading
+import time
+import uuid
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of token digest -> decoded claims for tokens that passed verification.
+    
+    Only successfully verified tokens are stored, keyed by SHA-256 so raw
+    tokens are not kept in memory. Entries are dropped once the token's own
+    exp passes, so a cached token never outlives its signature validity.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        if self.max_entries <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(payload)
+    
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        exp = payload.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else None
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+verified_token_cache = VerifiedTokenCache(max_entries=settings.token_cache_size)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -31,22 +93,46 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
-def create_refresh_token(data: Dict[str, Any]) -> str:
-    """Create a refresh token"""
+def create_refresh_token(data: Dict[str, Any], family_id: Optional[str] = None) -> str:
+    """Create a refresh token.
+    
+    Every refresh token gets a unique jti and belongs to a family (fam) shared
+    by all tokens rotated from the same login, so a reused token can revoke
+    the whole chain.
+    """
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({
+        "exp": expire,
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family_id or uuid.uuid4().hex
+    })
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
+def create_token_pair(user_id: str, family_id: Optional[str] = None) -> Tuple[str, str]:
+    """Create an access/refresh token pair in one token family (a new one by default)"""
+    family_id = family_id or uuid.uuid4().hex
+    access_token = create_access_token(data={"sub": user_id, "fam": family_id})
+    refresh_token = create_refresh_token(data={"sub": user_id}, family_id=family_id)
+    return access_token, refresh_token
+
+
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """Verify and decode a JWT token"""
+    payload = verified_token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
     except JWTError:
         return None
+    
+    verified_token_cache.set(token, payload)
+    return payload
 
 
 def create_session_token(new_hire_id: str) -> str:
@@ -0,0 +1,120 @@
+"""
+Failed-login throttling keyed by client IP and by account email.
+
+Checked before the user lookup and bcrypt, so a credential-stuffing burst is
+rejected for the cost of a dict lookup. After a number of free failures each
+further failure doubles the lockout (capped at LOGIN_THROTTLE_MAX_DELAY);
+failures are forgotten after LOGIN_THROTTLE_RESET_SECONDS without one. State
+is per worker and bounded by LOGIN_THROTTLE_MAX_KEYS; the per-IP `auth`
+rate limit policy still applies on top.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import math
+import threading
+import time
+from app.config import settings
+
+
+class _Failures:
+    __slots__ = ("count", "blocked_until", "last_failure")
+
+    def __init__(self):
+        self.count = 0
+        self.blocked_until = 0.0
+        self.last_failure = 0.0
+
+
+class LoginThrottle:
+    """Exponential backoff per key after repeated failures"""
+
+    def __init__(
+        self,
+        base_delay: float,
+        max_delay: float,
+        reset_seconds: float,
+        max_keys: int
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reset_seconds = reset_seconds
+        self.max_keys = max(1, max_keys)
+        self._entries: "OrderedDict[str, _Failures]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.rejected: Dict[str, int] = {}
+        self.recorded = 0
+
+    def _get(self, key: str, now: float) -> Optional[_Failures]:
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.last_failure >= self.reset_seconds:
+            del self._entries[key]
+            return None
+        return entry
+
+    def retry_after(self, keys: List[str], now: Optional[float] = None) -> int:
+        """Seconds until the keys may try again; 0 if none is locked out"""
+        now = time.time() if now is None else now
+        wait = 0.0
+        with self._lock:
+            self.checked += 1
+            for key in keys:
+                entry = self._get(key, now)
+                if entry is not None and entry.blocked_until > now:
+                    wait = max(wait, entry.blocked_until - now)
+                    scope = key.split(":", 1)[0]
+                    self.rejected[scope] = self.rejected.get(scope, 0) + 1
+        return math.ceil(wait)
+
+    def record(self, keys: Dict[str, int], now: Optional[float] = None) -> None:
+        """Count a failed attempt; keys map to the failures allowed before backoff"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.recorded += 1
+            for key, free_attempts in keys.items():
+                entry = self._get(key, now)
+                if entry is None:
+                    if len(self._entries) >= self.max_keys:
+                        self._entries.popitem(last=False)
+                    entry = self._entries[key] = _Failures()
+                else:
+                    self._entries.move_to_end(key)
+                entry.count += 1
+                entry.last_failure = now
+                excess = entry.count - free_attempts
+                if excess > 0:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (excess - 1))
+                    entry.blocked_until = now + delay
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked_keys": len(self._entries),
+                "checked": self.checked,
+                "recorded": self.recorded,
+                "rejected": dict(self.rejected),
+            }
+
+
+login_throttle = LoginThrottle(
+    base_delay=settings.login_throttle_base_delay,
+    max_delay=settings.login_throttle_max_delay,
+    reset_seconds=settings.login_throttle_reset_seconds,
+    max_keys=settings.login_throttle_max_keys
+)
+
+
+def login_keys(client_ip: str, email: str, action: str = "login") -> Dict[str, int]:
+    """Throttle keys for an attempt, with their free failure allowance"""
+    return {
+        f"ip:{action}:{client_ip}": settings.login_throttle_ip_free_attempts,
+        f"email:{action}:{email.strip().lower()}": settings.login_throttle_email_free_attempts,
+    }
@@ -0,0 +1,63 @@
+"""
+Short-lived in-process cache of authenticated principals.
+Lets admin requests skip the user/company lookup for a token's subject that
+was resolved moments ago. Code that logs a user out or changes a user or
+company invalidates the entries on its own worker; entries expire after
+PRINCIPAL_CACHE_TTL_SECONDS, which bounds how long other workers keep a
+stale one.
+"""
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+import threading
+import time
+
+T = TypeVar("T")
+
+
+class PrincipalCache(Generic[T]):
+    """Thread-safe TTL + LRU map"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[T], bool]) -> int:
+        """Drop every entry whose value matches; returns how many were dropped"""
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
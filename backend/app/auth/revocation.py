@@ -0,0 +1,118 @@
+"""
+Revocation store for refresh tokens and token families.
+
+Revocations live in the revoked_tokens table. Each worker mirrors the keys
+in a Bloom filter, so the common case (token not revoked) is answered in
+memory; only Bloom hits are confirmed against the database. The filter picks
+up revocations made by other workers by re-reading recent rows at most every
+REVOCATION_SYNC_SECONDS, which bounds how long a revoked family stays usable
+on another worker.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import threading
+import time
+import uuid
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.auth.bloom import BloomFilter
+from app.models.revoked_token import RevokedToken
+
+
+class RevocationStore:
+    """Bloom-filter-fronted view of the revoked_tokens table"""
+
+    def __init__(self, capacity: int, error_rate: float, sync_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._synced_at: Optional[datetime] = None
+        self._next_sync = 0.0
+
+    def prune(self, db: Session) -> int:
+        """Delete rows whose token can no longer be presented (startup only)"""
+        deleted = db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())).rowcount
+        db.commit()
+        return deleted
+
+    def load(self, db: Session) -> int:
+        """Rebuild the filter from the table; read-only, so safe in a request session"""
+        started_at = datetime.utcnow()
+        keys = db.execute(select(RevokedToken.token_id)).scalars().all()
+
+        bloom = BloomFilter(max(self.capacity, len(keys) * 2), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self._bloom = bloom
+            self._loaded = True
+            self._synced_at = started_at
+            self._next_sync = time.monotonic() + self.sync_seconds
+        return len(keys)
+
+    def _sync(self, db: Session) -> None:
+        """Add rows revoked since the last sync (by any worker) to the filter"""
+        if not self._loaded or self._bloom.is_saturated:
+            self.load(db)
+            return
+        if time.monotonic() < self._next_sync:
+            return
+
+        # Overlap the window so rows committed late by other workers are not missed
+        since = self._synced_at - timedelta(seconds=self.sync_seconds + 5)
+        started_at = datetime.utcnow()
+        keys = db.execute(
+            select(RevokedToken.token_id).where(RevokedToken.revoked_at >= since)
+        ).scalars().all()
+        with self._lock:
+            for key in keys:
+                self._bloom.add(key)
+            self._synced_at = started_at
+            self._next_sync = time.monotonic() + self.sync_seconds
+
+    def is_revoked(self, db: Session, token_id: str) -> bool:
+        """Check a jti or family id; hits the database only on a Bloom match"""
+        self._sync(db)
+        if token_id not in self._bloom:
+            return False
+        return db.get(RevokedToken, token_id) is not None
+
+    def revoke(
+        self,
+        db: Session,
+        token_id: str,
+        reason: str,
+        expires_at: datetime,
+        kind: str = "token",
+        user_id: Optional[uuid.UUID] = None
+    ) -> bool:
+        """Record a revocation; returns False if token_id was already revoked"""
+        db.add(RevokedToken(
+            token_id=token_id,
+            kind=kind,
+            user_id=user_id,
+            reason=reason,
+            revoked_at=datetime.utcnow(),
+            expires_at=expires_at
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        finally:
+            with self._lock:
+                self._bloom.add(token_id)
+        return True
+
+
+revocation_store = RevocationStore(
+    capacity=settings.revocation_bloom_capacity,
+    error_rate=settings.revocation_bloom_error_rate,
+    sync_seconds=settings.revocation_sync_seconds
+)
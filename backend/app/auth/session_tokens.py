@@ -0,0 +1,105 @@
+"""
+Signed, self-describing onboarding session tokens.
+
+Format: ``s1.<payload>.<signature>`` (URL-safe base64, no padding), where the
+payload packs new_hire_id, flow_id, company_id, expiry and the new hire's
+session generation, and the signature is a truncated HMAC-SHA256 over the
+version prefix and payload. Verifying a token needs no database access;
+bumping ``NewHire.session_generation`` revokes every token issued before.
+
+Opaque ``secrets.token_urlsafe`` tokens issued by older versions never
+contain a dot, so the two formats cannot be confused.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+import uuid
+from app.config import settings
+
+TOKEN_PREFIX = "s1"
+
+# new_hire_id, flow_id, company_id (16 bytes each), exp (unix seconds), generation
+_PAYLOAD = struct.Struct(">16s16s16sQI")
+_SIGNATURE_BYTES = 16
+
+_signing_key = hmac.new(
+    settings.secret_key.encode(), b"onboarding-session-token", hashlib.sha256
+).digest()
+
+
+@dataclass(frozen=True)
+class SessionClaims:
+    new_hire_id: uuid.UUID
+    flow_id: uuid.UUID
+    company_id: uuid.UUID
+    expires_at: datetime
+    generation: int
+
+    def is_expired(self) -> bool:
+        return datetime.utcnow() > self.expires_at
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(message: bytes) -> bytes:
+    return hmac.new(_signing_key, message, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def is_signed_session_token(token: str) -> bool:
+    """True when the token uses the signed format (valid or not)"""
+    return token.startswith(TOKEN_PREFIX + ".")
+
+
+def issue_session_token(
+    new_hire_id: uuid.UUID,
+    flow_id: uuid.UUID,
+    company_id: uuid.UUID,
+    expires_at: datetime,
+    generation: int = 0
+) -> str:
+    """Create a signed session token"""
+    exp = int((expires_at - datetime(1970, 1, 1)).total_seconds())
+    payload = _b64encode(_PAYLOAD.pack(
+        new_hire_id.bytes, flow_id.bytes, company_id.bytes, exp, generation
+    ))
+    signed_part = f"{TOKEN_PREFIX}.{payload}"
+    return f"{signed_part}.{_b64encode(_sign(signed_part.encode()))}"
+
+
+def decode_session_token(token: str) -> Optional[SessionClaims]:
+    """Verify a signed session token and return its claims.
+    
+    Returns None for opaque tokens and for tokens whose signature or layout
+    is invalid. Expired tokens are returned; check ``claims.is_expired()``.
+    """
+    if not is_signed_session_token(token):
+        return None
+
+    signed_part, _, signature = token.rpartition(".")
+    try:
+        if not hmac.compare_digest(_b64decode(signature), _sign(signed_part.encode())):
+            return None
+        new_hire_id, flow_id, company_id, exp, generation = _PAYLOAD.unpack(
+            _b64decode(signed_part[len(TOKEN_PREFIX) + 1:])
+        )
+    except (binascii.Error, ValueError, struct.error):
+        return None
+
+    return SessionClaims(
+        new_hire_id=uuid.UUID(bytes=new_hire_id),
+        flow_id=uuid.UUID(bytes=flow_id),
+        company_id=uuid.UUID(bytes=company_id),
+        expires_at=datetime.utcfromtimestamp(exp),
+        generation=generation
+    )
@@ -22,6 +22,20 @@ class Settings(BaseSettings):
     algorithm: str = Field(default="HS256", env="ALGORITHM")
     access_token_expire_minutes: int = Field(default=60, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_days: int = Field(default=7, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    principal_cache_ttl_seconds: int = Field(default=30, env="PRINCIPAL_CACHE_TTL_SECONDS")  # 0 disables
+    principal_cache_size: int = Field(default=10000, env="PRINCIPAL_CACHE_SIZE")
+    token_cache_size: int = Field(default=4096, env="TOKEN_CACHE_SIZE")  # verified JWTs kept decoded; 0 disables
+    revocation_bloom_capacity: int = Field(default=100000, env="REVOCATION_BLOOM_CAPACITY")
+    revocation_bloom_error_rate: float = Field(default=0.001, env="REVOCATION_BLOOM_ERROR_RATE")
+    revocation_sync_seconds: int = Field(default=5, env="REVOCATION_SYNC_SECONDS")  # pick up other workers' revocations
+    password_hash_workers: int = Field(default=0, env="PASSWORD_HASH_WORKERS")  # 0 = CPU count
+    password_hash_queue_size: int = Field(default=32, env="PASSWORD_HASH_QUEUE_SIZE")  # waiting beyond this -> 503
+    login_throttle_ip_free_attempts: int = Field(default=20, env="LOGIN_THROTTLE_IP_FREE_ATTEMPTS")  # failures before backoff
+    login_throttle_email_free_attempts: int = Field(default=5, env="LOGIN_THROTTLE_EMAIL_FREE_ATTEMPTS")
+    login_throttle_base_delay: float = Field(default=1.0, env="LOGIN_THROTTLE_BASE_DELAY")  # seconds, doubled per failure
+    login_throttle_max_delay: float = Field(default=900.0, env="LOGIN_THROTTLE_MAX_DELAY")
+    login_throttle_reset_seconds: float = Field(default=900.0, env="LOGIN_THROTTLE_RESET_SECONDS")  # quiet time that clears failures
+    login_throttle_max_keys: int = Field(default=100000, env="LOGIN_THROTTLE_MAX_KEYS")
     
     # File Storage
     file_storage_type: str = Field(default="local", env="FILE_STORAGE_TYPE")  # local, s3
@@ -31,12 +45,31 @@ class Settings(BaseSettings):
         default=["image/jpeg", "image/png", "image/gif", "application/pdf"],
         env="ALLOWED_FILE_TYPES"
     )
+    upload_chunk_size: int = Field(default=1048576, env="UPLOAD_CHUNK_SIZE")  # bytes read/written per step
+    file_gc_grace_seconds: int = Field(default=86400, env="FILE_GC_GRACE_SECONDS")  # unreferenced blobs kept at least this long
+    file_gc_upload_grace_seconds: int = Field(default=604800, env="FILE_GC_UPLOAD_GRACE_SECONDS")  # onboarding uploads no answer uses are dropped after this
+    file_gc_max_keys: int = Field(default=10000, env="FILE_GC_MAX_KEYS")  # storage keys / references examined per files-gc run
+    file_sendfile_header: Optional[str] = Field(default=None, env="FILE_SENDFILE_HEADER")  # X-Accel-Redirect (nginx) or X-Sendfile
+    file_sendfile_prefix: str = Field(default="/protected-files/", env="FILE_SENDFILE_PREFIX")  # internal nginx location for X-Accel-Redirect
+    signed_url_expire_seconds: int = Field(default=900, env="SIGNED_URL_EXPIRE_SECONDS")  # lifetime of signed upload / download URLs
+    resumable_chunk_max_size: int = Field(default=8388608, env="RESUMABLE_CHUNK_MAX_SIZE")  # largest PATCH body of a resumable upload
+    resumable_upload_expire_seconds: int = Field(default=86400, env="RESUMABLE_UPLOAD_EXPIRE_SECONDS")  # idle resumable uploads are discarded after this
+    resumable_uploads_per_owner: int = Field(default=3, env="RESUMABLE_UPLOADS_PER_OWNER")  # unfinished resumable uploads per new hire
+    inspection_workers: int = Field(default=2, env="INSPECTION_WORKERS")  # tasks inspecting uploaded files, 0 disables
+    inspection_queue_size: int = Field(default=1000, env="INSPECTION_QUEUE_SIZE")
+    inspection_poll_seconds: int = Field(default=60, env="INSPECTION_POLL_SECONDS")  # how often uninspected files are looked up when idle
+    image_workers: int = Field(default=1, env="IMAGE_WORKERS")  # processes rendering image variants, 0 = CPU count
+    image_variant_quality: int = Field(default=80, env="IMAGE_VARIANT_QUALITY")  # WebP quality, 1-100
     
-    # S3 Configuration (for future use)
+    # S3 Configuration (FILE_STORAGE_TYPE=s3, requires boto3)
     s3_bucket: Optional[str] = Field(default=None, env="S3_BUCKET")
     s3_access_key: Optional[str] = Field(default=None, env="S3_ACCESS_KEY")
     s3_secret_key: Optional[str] = Field(default=None, env="S3_SECRET_KEY")
     s3_region: Optional[str] = Field(default=None, env="S3_REGION")
+    s3_endpoint_url: Optional[str] = Field(default=None, env="S3_ENDPOINT_URL")  # MinIO or other S3-compatible servers
+    s3_public_url: Optional[str] = Field(default=None, env="S3_PUBLIC_URL")  # CDN / bucket URL used in file URLs
+    s3_multipart_chunk_size: int = Field(default=8388608, env="S3_MULTIPART_CHUNK_SIZE")  # part size, min 5MB
+    s3_max_pool_connections: int = Field(default=20, env="S3_MAX_POOL_CONNECTIONS")
     
     # Redis (for caching and background tasks)
     redis_url: str = Field(default="redis://localhost:6379", env="REDIS_URL")
@@ -55,9 +88,23 @@ class Settings(BaseSettings):
         env="CORS_ORIGINS"
     )
     
+    # Background deletion
+    deletion_chunk_size: int = Field(default=500, env="DELETION_CHUNK_SIZE")  # rows per DELETE
+    deletion_job_lease_seconds: int = Field(default=300, env="DELETION_JOB_LEASE_SECONDS")
+    deletion_job_max_attempts: int = Field(default=3, env="DELETION_JOB_MAX_ATTEMPTS")  # automatic runs before a failed job waits for manage.py
+    
     # Rate Limiting
     rate_limit_requests: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(default=3600, env="RATE_LIMIT_WINDOW")  # 1 hour
+    rate_limit_max_keys: int = Field(default=100000, env="RATE_LIMIT_MAX_KEYS")  # LRU bound on tracked clients
+    rate_limit_sweep_interval: int = Field(default=30, env="RATE_LIMIT_SWEEP_INTERVAL")  # seconds between idle-key sweeps
+    rate_limit_backend: str = Field(default="memory", env="RATE_LIMIT_BACKEND")  # memory, sqlite, redis
+    rate_limit_sqlite_path: Optional[str] = Field(default=None, env="RATE_LIMIT_SQLITE_PATH")  # defaults to /dev/shm
+    rate_limit_redis_prefix: str = Field(default="rl:", env="RATE_LIMIT_REDIS_PREFIX")
+    rate_limit_redis_timeout: float = Field(default=0.25, env="RATE_LIMIT_REDIS_TIMEOUT")  # seconds before falling back
+    rate_limit_redis_retry_seconds: float = Field(default=5.0, env="RATE_LIMIT_REDIS_RETRY_SECONDS")  # fallback only, after an error
+    rate_limit_policies: dict = Field(default={}, env="RATE_LIMIT_POLICIES")  # overrides, e.g. {"auth": {"requests": 20, "window": 60}}
+    rate_limit_route_cache_size: int = Field(default=4096, env="RATE_LIMIT_ROUTE_CACHE_SIZE")  # matched routes per (method, path shape)
     
     class Config:
         env_file = ".env"
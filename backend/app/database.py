@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine, MetaData
+from typing import Optional
+from pathlib import Path
+from sqlalchemy import create_engine, MetaData, Column, DateTime, event, inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, with_loader_criteria
 from sqlalchemy.pool import StaticPool
 from app.config import settings
 
@@ -28,9 +31,40 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class for models
 Base = declarative_base()
 
+
+class SoftDeleteMixin:
+    """Rows marked deleted are hidden from ORM queries until a background job removes them"""
+    deleted_at = Column(DateTime, nullable=True, index=True)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _hide_soft_deleted_rows(execute_state):
+    """Filter soft-deleted rows out of every ORM SELECT, including joins and lazy loads.
+    
+    Pass execution_options(include_deleted=True) to see them (used by deletion jobs).
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.deleted_at.is_(None),
+                include_aliases=True
+            )
+        )
+
 # Metadata for migrations
 metadata = MetaData()
 
+# Alembic revision this code expects. Bump it together with every new
+# migration in migrations/versions.
+SCHEMA_VERSION = "0011"
+
+ALEMBIC_INI_PATH = Path(__file__).resolve().parent.parent / "alembic.ini"
+
 
 def get_db():
     """Dependency to get database session"""
@@ -48,4 +82,52 @@ def create_tables():
 
 def drop_tables():
     """Drop all tables in the database (for testing)"""
-    Base.metadata.drop_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.drop_all(bind=engine)
+
+
+def get_schema_version() -> Optional[str]:
+    """Get the Alembic revision the database is at, or None if unversioned"""
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except (OperationalError, ProgrammingError):
+            return None
+
+
+def check_schema_version():
+    """Fail fast when the database schema does not match this code.
+
+    A single indexed read; DDL is only ever run by `manage.py migrate`.
+    """
+    current = get_schema_version()
+    if current != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at revision {current or '(none)'}, "
+            f"expected {SCHEMA_VERSION}. Run `python manage.py migrate`."
+        )
+
+
+def _alembic_config():
+    from alembic.config import Config
+    config = Config(str(ALEMBIC_INI_PATH))
+    config.set_main_option("script_location", str(ALEMBIC_INI_PATH.parent / "migrations"))
+    return config
+
+
+def run_migrations(revision: str = "head"):
+    """Upgrade the database to the given Alembic revision"""
+    from alembic import command
+
+    config = _alembic_config()
+    # Databases created by the old create_all() startup have the initial
+    # schema but no version table; adopt them instead of re-creating tables.
+    if get_schema_version() is None and inspect(engine).has_table("companies"):
+        print("ℹ️  Unversioned database found, stamping initial revision 0001")
+        command.stamp(config, "0001")
+    command.upgrade(config, revision)
+
+
+def stamp_schema(revision: str):
+    """Mark the database as being at a revision without running migrations"""
+    from alembic import command
+    command.stamp(_alembic_config(), revision) 
\ No newline at end of file
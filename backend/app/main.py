@@ -1,10 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
-from app.database import create_tables
-from app.routers import auth, companies, flows, stages, content_types, content_blocks, stage_templates, new_hires, onboarding
-from app.middleware.rate_limit import rate_limit_onboarding_middleware
+from app.database import check_schema_version, engine
+from app.routers import auth, companies, flows, stages, content_types, content_blocks, stage_templates, new_hires, onboarding, deletion_jobs, files
+from app.middleware.rate_limit import (
+    RateLimitMiddleware,
+    start_rate_limit_sweeper,
+    stop_rate_limit_sweeper
+)
+from app.rate_limit.factory import close_rate_limit_backend, get_rate_limit_backend
+from app.rate_limit.policies import route_policy_resolver
+from app.middleware.query_stats import install_query_hooks, query_stats_middleware
+from app.auth.hashing import PasswordHashingBusy, password_hasher
+from app.services.image_service import image_processor
+from app.services.inspection_service import inspection_queue
+from app.auth.login_throttle import login_throttle
+from app.storage.base import UploadRejected
 
 # Create FastAPI app
 app = FastAPI(
@@ -15,6 +29,10 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Add rate limiting middleware (per-route policies); added first so CORS
+# headers are applied to its 429 responses as well
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -24,11 +42,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add rate limiting middleware for onboarding endpoints
-app.middleware("http")(rate_limit_onboarding_middleware)
-
-# Mount static files for local storage
-app.mount("/files", StaticFiles(directory=settings.local_storage_path), name="files")
+# Count SQL statements per request; exposed as X-DB-Queries/X-DB-Time in debug mode
+install_query_hooks(engine)
+if settings.debug:
+    app.middleware("http")(query_stats_middleware)
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -40,35 +57,89 @@ app.include_router(content_blocks.router, prefix="/api/content-blocks", tags=["C
 app.include_router(stage_templates.router, prefix="/api/stage-templates", tags=["Stage Templates"])
 app.include_router(new_hires.router, prefix="/api/new-hires", tags=["New Hires"])
 app.include_router(onboarding.router, prefix="/api/onboarding", tags=["Onboarding Sessions"])
+app.include_router(deletion_jobs.router, prefix="/api/deletion-jobs", tags=["Deletion Jobs"])
+
+# Stored files (local storage), with caching headers and access checks
+app.include_router(files.router, prefix="/files", tags=["Files"])
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize application on startup"""
-    # Create database tables
-    create_tables()
+    # Verify the schema revision; migrations are applied by `manage.py migrate`
+    check_schema_version()
     
-    # Seed content types and templates
-    from app.services.content_type_service import ContentTypeService
-    from app.services.stage_template_service import StageTemplateService
+    # Seed content types and templates when the built-in catalog changed
+    from app.services.seed_service import SeedService
     from app.database import SessionLocal
     
     db = SessionLocal()
     try:
-        # Seed content types
-        created_types = ContentTypeService.seed_content_types(db)
-        if created_types:
-            print(f"✅ Seeded {len(created_types)} content types")
-        
-        # Seed stage templates
-        created_templates = StageTemplateService.seed_stage_templates(db)
-        if created_templates:
-            print(f"✅ Seeded {len(created_templates)} stage templates")
+        result = SeedService.seed_catalog(db)
+        if result["changed"]:
+            content_types = result["content_types"]
+            templates = result["stage_templates"]
+            print(
+                f"✅ Seeded catalog {result['fingerprint'][:12]}: "
+                f"{content_types['created']} content types created, {content_types['updated']} updated, "
+                f"{templates['created']} stage templates created"
+            )
             
     except Exception as e:
         print(f"⚠️  Seeding error: {e}")
     finally:
         db.close()
+    
+    # Mirror revoked token families into the in-memory Bloom filter
+    from app.auth.revocation import revocation_store
+    
+    db = SessionLocal()
+    try:
+        revocation_store.prune(db)
+        revoked = revocation_store.load(db)
+        print(f"✅ Loaded {revoked} revoked token(s)")
+    except Exception as e:
+        print(f"⚠️  Revocation store error: {e}")
+    finally:
+        db.close()
+    
+    backend = get_rate_limit_backend()
+    print(f"✅ Rate limiting backend: {backend.name}")
+    start_rate_limit_sweeper()
+    
+    # Inspect uploaded files in the background
+    inspection_queue.start()
+    print(f"✅ File inspection workers: {inspection_queue.workers}")
+    
+    # Finish deletion jobs interrupted by a restart without blocking startup
+    from app.services.deletion_service import DeletionService
+    asyncio.get_running_loop().run_in_executor(None, DeletionService.resume_pending_jobs)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools and background tasks on shutdown"""
+    password_hasher.shutdown()
+    image_processor.shutdown()
+    inspection_queue.stop()
+    stop_rate_limit_sweeper()
+    await close_rate_limit_backend()
+
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Shed login/registration load instead of queueing without bound"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is temporarily overloaded, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(UploadRejected)
+async def upload_rejected_handler(request: Request, exc: UploadRejected):
+    """Uploads over the size limit (413), of a disallowed type (415) or with a bad signed URL (403)"""
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
 
 
 @app.get("/")
@@ -84,4 +155,21 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"} 
+
+
+@app.get("/metrics")
+async def metrics():
+    """Internal worker pool and rate limiter metrics"""
+    # Off the event loop: the SQLite backend counts its rows with a blocking SELECT
+    rate_limit_metrics = await run_in_threadpool(get_rate_limit_backend().metrics)
+    return {
+        "password_hashing": password_hasher.metrics(),
+        "image_processing": image_processor.metrics(),
+        "file_inspection": inspection_queue.metrics(),
+        "login_throttle": login_throttle.metrics(),
+        "rate_limit": {
+            **rate_limit_metrics,
+            "route_cache": route_policy_resolver.metrics()
+        }
+    }
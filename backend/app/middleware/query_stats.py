@@ -0,0 +1,112 @@
+"""
+Per-request SQL query accounting.
+Counts statements and DB time through SQLAlchemy engine events and exposes them
+as X-DB-Queries / X-DB-Time headers in debug mode.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import time
+
+
+class QueryStats:
+    """Mutable per-request query counters"""
+
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.total_time = 0.0
+        self.record_statements = record_statements
+        self.statements: List[str] = []
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if self.record_statements:
+            self.statements.append(statement)
+
+
+# The stats object is shared (not copied) with tasks and threadpool workers
+# spawned for the request, so mutations made there are visible here.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Process-wide collectors used by query_budget; test clients run the app on a
+# portal thread that does not inherit the caller's context.
+_global_collectors: List[QueryStats] = []
+
+_installed_engines = set()
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach cursor execution listeners to an engine (idempotent)"""
+    if id(engine) in _installed_engines:
+        return
+    _installed_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None or _global_collectors:
+            conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is None and not _global_collectors:
+            return
+        start_times = conn.info.get("query_start_time")
+        started = start_times.pop() if start_times else time.perf_counter()
+        elapsed = time.perf_counter() - started
+        if stats is not None:
+            stats.record(statement, elapsed)
+        for collector in list(_global_collectors):
+            collector.record(statement, elapsed)
+
+
+@contextmanager
+def count_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """Count every statement executed in the current context"""
+    stats = QueryStats(record_statements=record_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block") -> Iterator[QueryStats]:
+    """Fail with AssertionError when the wrapped block exceeds max_queries.
+
+    Intended to back a pytest fixture, e.g.
+
+        with query_budget(6, "GET /api/flows/{id}/pipeline"):
+            client.get(f"/api/flows/{flow_id}/pipeline", headers=auth)
+    """
+    stats = QueryStats(record_statements=True)
+    _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _global_collectors.remove(stats)
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+        raise AssertionError(
+            f"{label} executed {stats.count} queries, budget is {max_queries}:\n{statements}"
+        )
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Get the stats object for the current request, if any"""
+    return _current_stats.get()
+
+
+async def query_stats_middleware(request: Request, call_next):
+    """Expose per-request query count and DB time as response headers"""
+    with count_queries() as stats:
+        response = await call_next(request)
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.total_time * 1000:.2f}ms"
+    return response
@@ -1,125 +1,169 @@
 """
-Rate limiting middleware for onboarding endpoints.
-Different limits for different types of operations.
+Rate limiting middleware.
+Each route template maps to a policy (see app.rate_limit.policies); onboarding
+routes are limited per new hire, auth routes per IP, admin routes per user and
+the signed upload endpoint (/files/uploads) per uploader.
 """
-from typing import Dict, Optional
-from fastapi import Request, HTTPException, status
-from datetime import datetime, timedelta
-import time
+from typing import Dict, Optional, Tuple
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import asyncio
-from collections import defaultdict
+import time
+from app.config import settings
+from app.auth.jwt import verify_token
+from app.auth.session_tokens import decode_session_token, is_signed_session_token
+from app.rate_limit.base import RateLimitResult
+from app.rate_limit.factory import get_rate_limit_backend
+from app.storage.signed_urls import decode_upload_token
+from app.rate_limit.policies import (
+    SUBJECT_SESSION,
+    SUBJECT_UPLOAD,
+    SUBJECT_USER,
+    RoutePolicy,
+    load_policies,
+    route_policy_resolver
+)
+
+_sweeper_task: Optional[asyncio.Task] = None
+
+
+async def _sweep_forever(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        # Off the event loop: the SQLite backend's sweep is a blocking DELETE
+        await run_in_threadpool(get_rate_limit_backend().sweep, time.time())
+
+
+def start_rate_limit_sweeper() -> None:
+    """Start evicting idle rate limit keys on the running event loop"""
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.get_running_loop().create_task(
+            _sweep_forever(settings.rate_limit_sweep_interval)
+        )
+
+
+def stop_rate_limit_sweeper() -> None:
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        _sweeper_task = None
 
-# In-memory rate limit storage (use Redis in production)
-rate_limit_storage: Dict[str, Dict[str, list]] = defaultdict(lambda: defaultdict(list))
 
 class RateLimiter:
-    """Rate limiter for onboarding endpoints"""
+    """Rate limiter applying the per-route policies"""
     
-    # Rate limit configurations
-    RATE_LIMITS = {
-        "session_validation": {"requests": 10, "window": 60},  # 10 requests per minute
-        "progress_updates": {"requests": 30, "window": 60},    # 30 requests per minute
-        "file_uploads": {"requests": 5, "window": 60},        # 5 uploads per minute
-        "general": {"requests": 100, "window": 60}            # 100 requests per minute
-    }
-    
-    @staticmethod
-    def get_rate_limit_key(request: Request, session_token: str) -> str:
-        """Generate rate limit key based on endpoint and session token"""
-        path = request.url.path
-        
-        if "progress" in path or "complete" in path:
-            return f"progress_updates:{session_token}"
-        elif "uploads" in path:
-            return f"file_uploads:{session_token}"
-        elif "session" in path and request.method == "GET":
-            return f"session_validation:{session_token}"
-        else:
-            return f"general:{session_token}"
-    
-    @staticmethod
-    def is_rate_limited(key: str, limit_type: str) -> bool:
-        """Check if request is rate limited"""
-        now = time.time()
-        window = RateLimiter.RATE_LIMITS[limit_type]["window"]
-        max_requests = RateLimiter.RATE_LIMITS[limit_type]["requests"]
-        
-        # Clean old entries
-        rate_limit_storage[key] = [
-            timestamp for timestamp in rate_limit_storage[key]
-            if now - timestamp < window
-        ]
-        
-        # Check if limit exceeded
-        if len(rate_limit_storage[key]) >= max_requests:
-            return True
-        
-        # Add current request
-        rate_limit_storage[key].append(now)
-        return False
+    # Policy name -> {"requests": ..., "window": ...}
+    RATE_LIMITS = load_policies()
     
     @staticmethod
-    def get_remaining_requests(key: str, limit_type: str) -> int:
-        """Get remaining requests for the current window"""
-        now = time.time()
-        window = RateLimiter.RATE_LIMITS[limit_type]["window"]
-        max_requests = RateLimiter.RATE_LIMITS[limit_type]["requests"]
-        
-        # Clean old entries
-        rate_limit_storage[key] = [
-            timestamp for timestamp in rate_limit_storage[key]
-            if now - timestamp < window
-        ]
-        
-        return max(0, max_requests - len(rate_limit_storage[key]))
+    async def hit(key: str, limit_type: str, now: Optional[float] = None) -> RateLimitResult:
+        """Count one request against key and report whether it is allowed"""
+        config = RateLimiter.RATE_LIMITS[limit_type]
+        now = time.time() if now is None else now
+        return await get_rate_limit_backend().hit(key, config["requests"], config["window"], now)
 
-async def rate_limit_onboarding_middleware(request: Request, call_next):
-    """Rate limiting middleware for onboarding endpoints"""
-    
-    # Only apply to onboarding endpoints
-    if not request.url.path.startswith("/api/onboarding/"):
-        return await call_next(request)
-    
-    # Extract session token from path
-    path_parts = request.url.path.split("/")
-    if len(path_parts) < 4:
-        return await call_next(request)
-    
-    session_token = path_parts[3]  # /api/onboarding/{session_token}/...
+
+def _client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _rate_limit_subject(scope: Scope, route: RoutePolicy) -> Optional[str]:
+    """Who the request is counted against; None for a forged session token"""
+    if route.subject == SUBJECT_SESSION:
+        session_token = route.path_params.get("session_token", "")
+        # Signed tokens are verified here without a DB lookup and limited per
+        # new hire, so renewing a token does not reset the budget
+        if is_signed_session_token(session_token):
+            claims = decode_session_token(session_token)
+            return str(claims.new_hire_id) if claims else None
+        return session_token
     
-    # Determine rate limit type
-    path = request.url.path
-    if "progress" in path or "complete" in path:
-        limit_type = "progress_updates"
-    elif "uploads" in path:
-        limit_type = "file_uploads"
-    elif "session" in path and request.method == "GET":
-        limit_type = "session_validation"
-    else:
-        limit_type = "general"
+    if route.subject == SUBJECT_UPLOAD:
+        # Counted against the uploader; forged tokens fall back to the IP and are refused by the route
+        claims = decode_upload_token(route.path_params.get("upload_token", ""))
+        if claims is not None:
+            return f"{claims.owner_type}:{claims.owner_id}"
     
-    # Generate rate limit key
-    key = f"{limit_type}:{session_token}"
+    if route.subject == SUBJECT_USER:
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            payload = verify_token(token)  # cached, see VerifiedTokenCache
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
     
-    # Check rate limit
-    if RateLimiter.is_rate_limited(key, limit_type):
-        remaining_time = RateLimiter.RATE_LIMITS[limit_type]["window"]
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error": "Rate limit exceeded",
-                "limit_type": limit_type,
-                "retry_after": remaining_time,
-                "message": f"Too many {limit_type} requests. Please try again later."
-            }
-        )
+    return f"ip:{_client_ip(scope)}"
+
+
+def _rate_limit_headers(result: RateLimitResult) -> Dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining),
+        "X-RateLimit-Reset": str(int(result.reset_at)),
+    }
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware applying the rate limit policy of the matched route.
     
-    # Add rate limit headers to response
-    response = await call_next(request)
-    remaining_requests = RateLimiter.get_remaining_requests(key, limit_type)
+    Requests outside the `path_prefix` prefixes (static files, docs, health) and non-HTTP
+    scopes are passed straight through. Rejections are answered here with a
+    429; allowed responses get the X-RateLimit-* headers added to their start
+    message, so bodies stream through untouched.
+    """
     
-    response.headers["X-RateLimit-Limit"] = str(RateLimiter.RATE_LIMITS[limit_type]["requests"])
-    response.headers["X-RateLimit-Remaining"] = str(remaining_requests)
-    response.headers["X-RateLimit-Reset"] = str(int(time.time() + RateLimiter.RATE_LIMITS[limit_type]["window"]))
+    def __init__(self, app: ASGIApp, path_prefix: Tuple[str, ...] = ("/api/", "/files/uploads/")):
+        self.app = app
+        self.path_prefix = path_prefix
     
-    return response 
\ No newline at end of file
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        
+        route = route_policy_resolver.resolve(scope)
+        if route is None or route.policy is None:
+            await self.app(scope, receive, send)
+            return
+        
+        subject = _rate_limit_subject(scope, route)
+        if subject is None:
+            response = JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid onboarding session token"}
+            )
+            await response(scope, receive, send)
+            return
+        
+        # Check rate limit (one counter update per request)
+        limit_type = route.policy
+        result = await RateLimiter.hit(f"{limit_type}:{subject}", limit_type)
+        headers = _rate_limit_headers(result)
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": {
+                        "error": "Rate limit exceeded",
+                        "limit_type": limit_type,
+                        "retry_after": result.retry_after,
+                        "message": f"Too many {limit_type} requests. Please try again later."
+                    }
+                },
+                headers={**headers, "Retry-After": str(result.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers.append(name, value)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
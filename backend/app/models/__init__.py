@@ -7,6 +7,11 @@ from .content_type import ContentType
 from .new_hire import NewHire
 from .progress import Progress
 from .stage_template import StageTemplate
+from .app_metadata import AppMetadata
+from .deletion_job import DeletionJob
+from .revoked_token import RevokedToken
+from .file_blob import FileBlob, FileReference
+from .resumable_upload import ResumableUpload
 
 __all__ = [
     "Company",
@@ -17,5 +22,11 @@ __all__ = [
     "ContentType",
     "NewHire",
     "Progress",
-    "StageTemplate"
+    "StageTemplate",
+    "AppMetadata",
+    "DeletionJob",
+    "RevokedToken",
+    "FileBlob",
+    "FileReference",
+    "ResumableUpload"
 ] 
\ No newline at end of file
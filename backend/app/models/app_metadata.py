@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime
+from app.database import Base
+
+
+class AppMetadata(Base):
+    """Key/value store for deployment-wide bookkeeping (seed fingerprints, checkpoints)"""
+    __tablename__ = "app_metadata"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AppMetadata(key='{self.key}', value='{self.value}')>"
@@ -3,6 +3,7 @@ from sqlalchemy import Column, String, Text, DateTime, Boolean
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.content_block import JSONField
 import uuid
 
 
@@ -19,6 +20,7 @@ class Company(Base):
     secondary_color = Column(String(7))
     accent_color = Column(String(7))
     logo_url = Column(String(500))
+    logo_variants = Column(JSONField)  # resized WebP renditions of the logo, see ImageService
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
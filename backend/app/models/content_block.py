@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -14,6 +14,7 @@ from sqlalchemy.types import TypeDecorator
 class JSONField(TypeDecorator):
     """JSON field that works with both SQLite and PostgreSQL"""
     impl = Text
+    cache_ok = True
     
     def process_bind_param(self, value, dialect):
         if value is not None:
@@ -28,6 +29,9 @@ class JSONField(TypeDecorator):
 
 class ContentBlock(Base):
     __tablename__ = "content_blocks"
+    __table_args__ = (
+        Index("ix_content_blocks_stage_order", "stage_id", "order_index"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     stage_id = Column(UUID(as_uuid=True), ForeignKey("stages.id"), nullable=False, index=True)
@@ -35,9 +39,14 @@ class ContentBlock(Base):
     config = Column(JSONField, nullable=False)  # validation and display configuration
     content = Column(JSONField, nullable=False)  # actual content data
     order_index = Column(Integer, nullable=False, index=True)
+    media_variants = Column(JSONField)  # resized WebP renditions of a media image, see ImageService
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # 1-based place in the stage, set by ContentService for API responses;
+    # order_index itself is a sparse sort key (see OrderingService)
+    position = None
+
     # Relationships
     stage = relationship("Stage", back_populates="content_blocks")
     progress = relationship("Progress", back_populates="content_block")
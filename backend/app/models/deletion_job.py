@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+import uuid
+
+
+class DeletionJob(Base):
+    """Background job that removes a soft-deleted flow, stage or new hire in chunks"""
+    __tablename__ = "deletion_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    entity_type = Column(String(20), nullable=False)  # flow, stage, new_hire
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String(20), default="pending", index=True)  # pending, running, completed, failed
+    step = Column(String(50))  # current cascade step, used to resume
+    deleted_rows = Column(Integer, default=0)
+    total_rows = Column(Integer, default=0)
+    attempts = Column(Integer, nullable=False, default=0)  # claims so far; failed jobs retry while below the cap
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DeletionJob(id={self.id}, entity_type='{self.entity_type}', status='{self.status}')>"
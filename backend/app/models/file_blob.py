@@ -0,0 +1,47 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.database import Base
+from app.models.content_block import JSONField
+import uuid
+
+
+class FileBlob(Base):
+    """Stored file content, one row per distinct SHA-256 digest"""
+    __tablename__ = "file_blobs"
+
+    digest = Column(String(64), primary_key=True)
+    size = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False)
+    content_type = Column(String(100))
+    storage_path = Column(String(255), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_stored_at = Column(DateTime, default=datetime.utcnow, index=True)  # refreshed on every dedup hit; GC grace starts here
+    inspection = Column(JSONField)  # detected_type, checksum_ok, width/height, pages; see app.storage.inspection
+    inspected_at = Column(DateTime, index=True)  # NULL until the inspection queue got to it
+
+    references = relationship("FileReference", back_populates="blob")
+
+    def __repr__(self):
+        return f"<FileBlob(digest='{self.digest}', size={self.size})>"
+
+
+class FileReference(Base):
+    """A use of a blob by some owner, e.g. a company logo or a new hire's upload"""
+    __tablename__ = "file_references"
+    __table_args__ = (
+        Index("ix_file_references_owner", "owner_type", "owner_id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    blob_digest = Column(String(64), ForeignKey("file_blobs.digest"), nullable=False, index=True)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False, index=True)
+    owner_type = Column(String(30), nullable=False)  # company_logo, onboarding_upload
+    owner_id = Column(UUID(as_uuid=True), nullable=False)
+    filename = Column(String(255))  # original client filename
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    blob = relationship("FileBlob", back_populates="references")
+
+    def __repr__(self):
+        return f"<FileReference(owner_type='{self.owner_type}', owner_id={self.owner_id}, blob='{self.blob_digest}')>"
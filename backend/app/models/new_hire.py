@@ -1,12 +1,13 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, SoftDeleteMixin
+from app.auth.session_tokens import issue_session_token
 import uuid
 
 
-class NewHire(Base):
+class NewHire(Base, SoftDeleteMixin):
     __tablename__ = "new_hires"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -18,6 +19,7 @@ class NewHire(Base):
     status = Column(String(20), default="pending")  # pending, started, completed, expired
     session_token = Column(String(255), unique=True, nullable=False, index=True)
     session_token_expires_at = Column(DateTime, nullable=True, index=True)  # Token expiration
+    session_generation = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke signed tokens
     invited_at = Column(DateTime, default=datetime.utcnow)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
@@ -38,6 +40,17 @@ class NewHire(Base):
             return False  # No expiration set
         return datetime.utcnow() > self.session_token_expires_at
     
+    def issue_session_token(self, expires_at: datetime) -> str:
+        """Revoke earlier signed tokens and store a fresh one"""
+        if self.id is None:
+            self.id = uuid.uuid4()
+        self.session_generation = (self.session_generation or 0) + 1
+        self.session_token = issue_session_token(
+            self.id, self.flow_id, self.company_id, expires_at, self.session_generation
+        )
+        self.session_token_expires_at = expires_at
+        return self.session_token
+    
     def can_access_onboarding(self) -> bool:
         """Check if new hire can access onboarding"""
         return (
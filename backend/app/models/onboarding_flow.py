@@ -2,11 +2,11 @@ from datetime import datetime
 from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, SoftDeleteMixin
 import uuid
 
 
-class OnboardingFlow(Base):
+class OnboardingFlow(Base, SoftDeleteMixin):
     __tablename__ = "onboarding_flows"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
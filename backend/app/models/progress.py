@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -9,6 +9,9 @@ import uuid
 
 class Progress(Base):
     __tablename__ = "progress"
+    __table_args__ = (
+        Index("ix_progress_new_hire_block", "new_hire_id", "content_block_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     new_hire_id = Column(UUID(as_uuid=True), ForeignKey("new_hires.id"), nullable=False, index=True)
@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from app.models.content_block import JSONField
+import uuid
+
+
+class ResumableUpload(Base):
+    """A file sent in chunks; the chunks stay in storage until it is finalized"""
+    __tablename__ = "resumable_uploads"
+    __table_args__ = (
+        Index("ix_resumable_uploads_owner", "owner_type", "owner_id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False)
+    owner_type = Column(String(30), nullable=False)  # same owners as FileReference
+    owner_id = Column(UUID(as_uuid=True), nullable=False)
+    filename = Column(String(255))
+    content_type = Column(String(100), nullable=False)
+    size = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False)  # declared total size
+    sha256 = Column(String(64))  # optional hex digest checked on finalize
+    received = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)  # next expected offset
+    parts = Column(JSONField, nullable=False, default=list)  # [{"offset", "size", "path"}] in offset order
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)  # pushed back by every chunk
+
+    def __repr__(self):
+        return f"<ResumableUpload(id={self.id}, received={self.received}/{self.size})>"
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class RevokedToken(Base):
+    """Revoked refresh token (by jti), whole token family, or spent signed upload token"""
+    __tablename__ = "revoked_tokens"
+
+    token_id = Column(String(64), primary_key=True)  # jti, family id (kind="family") or upload nonce (kind="upload")
+    kind = Column(String(10), nullable=False, default="token")  # token, family, upload
+    user_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    reason = Column(String(20), nullable=False)  # rotated, logout, reuse, uploaded, completed
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # row can be pruned after this
+
+    def __repr__(self):
+        return f"<RevokedToken(token_id='{self.token_id}', kind='{self.kind}', reason='{self.reason}')>"
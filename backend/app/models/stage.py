@@ -1,13 +1,16 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, SoftDeleteMixin
 import uuid
 
 
-class Stage(Base):
+class Stage(Base, SoftDeleteMixin):
     __tablename__ = "stages"
+    __table_args__ = (
+        Index("ix_stages_flow_order", "flow_id", "order"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     flow_id = Column(UUID(as_uuid=True), ForeignKey("onboarding_flows.id"), nullable=False, index=True)
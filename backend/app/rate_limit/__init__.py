@@ -0,0 +1 @@
+# Rate limiter backends package
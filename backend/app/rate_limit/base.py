@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, NamedTuple
+import math
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float  # when the current fixed window ends
+    retry_after: int  # seconds until a request would be allowed again (0 if allowed)
+
+
+def evaluate_sliding_window(previous: int, current: int, limit: int, window: int, now: float) -> RateLimitResult:
+    """Decide one request with the sliding window counter algorithm.
+    
+    `previous` and `current` are the counts of the previous and current fixed
+    windows before this request. The rate over the last `window` seconds is
+    estimated as previous * (1 - elapsed_fraction) + current, i.e. the
+    previous window is assumed to have been uniformly spread.
+    """
+    window_start = int(now // window) * window
+    reset_at = window_start + window
+    estimated = previous * (1.0 - (now - window_start) / window) + current
+    
+    if estimated + 1 > limit:
+        # Time until the weighted previous window decays enough to admit one request
+        if previous and current < limit:
+            needed_weight = (limit - 1 - current) / previous
+            retry_after = max(1, math.ceil(window_start + window * (1 - needed_weight) - now))
+        else:
+            # The current window is full; it becomes the weighted previous one
+            needed_weight = (limit - 1) / current
+            retry_after = max(1, math.ceil(reset_at + window * (1 - needed_weight) - now))
+        return RateLimitResult(False, limit, 0, reset_at, retry_after)
+    
+    return RateLimitResult(True, limit, max(0, int(limit - estimated - 1)), reset_at, 0)
+
+
+class RateLimitBackend(ABC):
+    """Abstract base class for rate limit counter stores"""
+    
+    name = "base"
+    
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        """Count one request against key unless it is over the limit"""
+        pass
+    
+    def sweep(self, now: float) -> int:
+        """Drop state that no longer affects any limit; returns the number of keys removed"""
+        return 0
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Backend-specific counters for the /metrics endpoint"""
+        return {"backend": self.name}
+    
+    async def close(self) -> None:
+        """Release connections"""
+        pass
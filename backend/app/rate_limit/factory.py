@@ -0,0 +1,60 @@
+from typing import Optional
+import os
+import tempfile
+from app.config import settings
+from app.rate_limit.base import RateLimitBackend
+from app.rate_limit.memory_backend import MemoryBackend
+
+_backend: Optional[RateLimitBackend] = None
+
+
+def _sqlite_path() -> str:
+    if settings.rate_limit_sqlite_path:
+        return settings.rate_limit_sqlite_path
+    shared_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(shared_dir, "oaas-rate-limit.sqlite3")
+
+
+def create_rate_limit_backend(backend_type: Optional[str] = None) -> RateLimitBackend:
+    """Build the rate limit backend selected by RATE_LIMIT_BACKEND"""
+    backend_type = backend_type or settings.rate_limit_backend
+    if backend_type == "memory":
+        return MemoryBackend(settings.rate_limit_max_keys)
+    elif backend_type == "redis":
+        from app.rate_limit.redis_backend import RedisBackend, aioredis
+        if aioredis is None:
+            print("⚠️  redis package not installed; rate limiting falls back to SQLite")
+            return create_rate_limit_backend("sqlite")
+        return RedisBackend(
+            settings.redis_url,
+            prefix=settings.rate_limit_redis_prefix,
+            timeout=settings.rate_limit_redis_timeout,
+            retry_seconds=settings.rate_limit_redis_retry_seconds,
+            fallback_capacity=settings.rate_limit_max_keys
+        )
+    elif backend_type == "sqlite":
+        from app.rate_limit.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(_sqlite_path(), fallback_capacity=settings.rate_limit_max_keys)
+    else:
+        raise ValueError(f"Unsupported rate limit backend: {backend_type}")
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Get the process-wide rate limit backend"""
+    global _backend
+    if _backend is None:
+        _backend = create_rate_limit_backend()
+    return _backend
+
+
+def set_rate_limit_backend(backend: Optional[RateLimitBackend]) -> None:
+    """Replace the process-wide backend (benchmarks and tests)"""
+    global _backend
+    _backend = backend
+
+
+async def close_rate_limit_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import sys
+from app.rate_limit.base import RateLimitBackend, RateLimitResult, evaluate_sliding_window
+
+
+class WindowCounter:
+    """Request counts for the current and previous fixed window of one key"""
+    __slots__ = ("window_index", "current", "previous", "window", "last_seen")
+    
+    def __init__(self, window_index: int, window: int = 60, last_seen: float = 0.0):
+        self.window_index = window_index
+        self.current = 0
+        self.previous = 0
+        self.window = window
+        self.last_seen = last_seen
+    
+    def roll(self, now: float) -> None:
+        """Advance to the fixed window containing now"""
+        window_index = int(now // self.window)
+        if window_index != self.window_index:
+            # Anything older than one full window no longer counts
+            self.previous = self.current if window_index - self.window_index == 1 else 0
+            self.current = 0
+            self.window_index = window_index
+    
+    def is_idle(self, now: float) -> bool:
+        """Both counted windows have passed, so the counter no longer limits anything"""
+        return now - self.last_seen >= 2 * self.window
+
+
+class RateLimitStore:
+    """Capacity-bounded LRU of window counters.
+    
+    Keys come from client-supplied tokens, so the store must not grow with
+    every token ever seen: the least recently used key is dropped when full,
+    and a background sweeper removes idle keys.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._counters: "OrderedDict[str, WindowCounter]" = OrderedDict()
+        self.evicted_capacity = 0
+        self.evicted_idle = 0
+    
+    def __len__(self) -> int:
+        return len(self._counters)
+    
+    def get(self, key: str) -> Optional[WindowCounter]:
+        return self._counters.get(key)
+    
+    def get_or_create(self, key: str, window: int, now: float) -> WindowCounter:
+        counter = self._counters.get(key)
+        if counter is None:
+            if len(self._counters) >= self.capacity:
+                self._counters.popitem(last=False)
+                self.evicted_capacity += 1
+            counter = self._counters[key] = WindowCounter(int(now // window), window, now)
+        else:
+            self._counters.move_to_end(key)
+            counter.last_seen = now
+        return counter
+    
+    def sweep(self, now: float, max_keys: int = 10000) -> int:
+        """Evict idle keys from the LRU end; bounded work per call"""
+        evicted = 0
+        while self._counters and evicted < max_keys:
+            key, counter = next(iter(self._counters.items()))
+            if not counter.is_idle(now):
+                break
+            del self._counters[key]
+            evicted += 1
+        self.evicted_idle += evicted
+        return evicted
+    
+    def clear(self) -> None:
+        self._counters.clear()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Key count, eviction counters and an estimate of memory held"""
+        keys = len(self._counters)
+        sample = next(iter(self._counters.items()), None)
+        per_key = (sys.getsizeof(sample[0]) + sys.getsizeof(sample[1])) if sample else 0
+        return {
+            "keys": keys,
+            "capacity": self.capacity,
+            "evicted_capacity": self.evicted_capacity,
+            "evicted_idle": self.evicted_idle,
+            "approx_memory_bytes": sys.getsizeof(self._counters) + keys * per_key,
+        }
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process counters; limits are per worker"""
+    
+    name = "memory"
+    
+    def __init__(self, capacity: int):
+        self.store = RateLimitStore(capacity)
+    
+    def hit_now(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        """Synchronous hit, also used as the fallback path of remote backends"""
+        counter = self.store.get_or_create(key, window, now)
+        counter.roll(now)
+        result = evaluate_sliding_window(counter.previous, counter.current, limit, window, now)
+        if result.allowed:
+            counter.current += 1
+        return result
+    
+    async def hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        return self.hit_now(key, limit, window, now)
+    
+    def sweep(self, now: float) -> int:
+        return self.store.sweep(now)
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.store.metrics()}
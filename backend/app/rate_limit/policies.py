@@ -0,0 +1,183 @@
+"""
+Rate limit policies declared per route template.
+
+A request is matched against the application's routes once (the same
+matching the router does), and the matched route is cached per method and
+path shape (ids and tokens replaced by a placeholder), so picking a policy
+costs a dict lookup and one route regex on the hot path. Limits for each policy
+come from DEFAULT_POLICIES, overridden by RATE_LIMIT_POLICIES.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import re
+from starlette.routing import Match
+from app.config import settings
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # FastAPI versions with a flat route list
+    iter_route_contexts = list
+
+# Policy name -> limit per window (seconds)
+DEFAULT_POLICIES: Dict[str, Dict[str, int]] = {
+    # Onboarding portal, limited per new hire
+    "session_validation": {"requests": 10, "window": 60},
+    "progress_updates": {"requests": 30, "window": 60},
+    "file_uploads": {"requests": 5, "window": 60},
+    "upload_chunks": {"requests": 60, "window": 60},
+    "general": {"requests": 100, "window": 60},
+    # Authentication, limited per client IP
+    "auth": {"requests": 20, "window": 60},
+    # Admin API, limited per user
+    "admin_read": {"requests": 300, "window": 60},
+    "admin_write": {"requests": 60, "window": 60},
+    "admin_expensive": {"requests": 10, "window": 60},
+}
+
+# "METHOD /route/template" -> policy name. Routes not listed fall back to
+# _default_policy; a value of None exempts the route.
+ROUTE_POLICIES: Dict[str, Optional[str]] = {
+    "GET /api/onboarding/{session_token}": "session_validation",
+    "POST /api/onboarding/{session_token}/start": "progress_updates",
+    "POST /api/onboarding/{session_token}/stages/{stage_id}/content-blocks/{content_block_id}/complete": "progress_updates",
+    "POST /api/onboarding/{session_token}/stages/{stage_id}/complete": "progress_updates",
+    "POST /api/onboarding/{session_token}/complete": "progress_updates",
+    "POST /api/onboarding/{session_token}/uploads": "file_uploads",
+    "POST /api/onboarding/{session_token}/uploads/sign": "file_uploads",
+    "POST /api/onboarding/{session_token}/uploads/resumable": "file_uploads",
+    "PATCH /api/onboarding/{session_token}/uploads/resumable/{upload_id}": "upload_chunks",
+    "POST /api/onboarding/{session_token}/uploads/resumable/{upload_id}/finalize": "file_uploads",
+    "POST /api/companies/me/logo": "file_uploads",
+    "POST /api/companies/me/logo/sign": "file_uploads",
+    "PUT /files/uploads/{upload_token}": "file_uploads",
+    "GET /api/companies/me/stats": "admin_expensive",
+    "GET /api/flows/{flow_id}/stats": "admin_expensive",
+    "GET /api/flows/{flow_id}/pipeline": "admin_expensive",
+    "POST /api/new-hires/{new_hire_id}/resend-invitation": "admin_expensive",
+}
+
+# Who a request is counted against, by route prefix
+SUBJECT_SESSION = "session"  # the {session_token} path parameter
+SUBJECT_IP = "ip"
+SUBJECT_USER = "user"  # the bearer token's subject, else the client IP
+SUBJECT_UPLOAD = "upload"  # the owner named in the signed {upload_token}, else the client IP
+
+
+# Path segments that are ids or tokens rather than literals: numbers, UUIDs,
+# and long values containing a digit (session and upload tokens)
+_VARIABLE_SEGMENT = re.compile(r"\d+|[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}|(?=.*\d)[^/]{20,}")
+
+
+def path_shape(path: str) -> str:
+    """The path with id and token segments replaced by "*", the route cache key"""
+    return "/".join("*" if _VARIABLE_SEGMENT.fullmatch(segment) else segment for segment in path.split("/"))
+
+
+class RoutePolicy(NamedTuple):
+    template: str
+    policy: Optional[str]
+    subject: str
+    path_params: Dict[str, Any]
+
+
+def load_policies() -> Dict[str, Dict[str, int]]:
+    """Default policies with RATE_LIMIT_POLICIES applied on top"""
+    policies = {name: dict(limits) for name, limits in DEFAULT_POLICIES.items()}
+    for name, limits in (settings.rate_limit_policies or {}).items():
+        policies[name] = {**policies.get(name, {"requests": 100, "window": 60}), **limits}
+    return policies
+
+
+def _subject_for(template: str) -> str:
+    if template.startswith("/api/onboarding/"):
+        return SUBJECT_SESSION
+    if template.startswith("/api/auth/"):
+        return SUBJECT_IP
+    if template.startswith("/files/uploads/"):
+        return SUBJECT_UPLOAD
+    return SUBJECT_USER
+
+
+def _default_policy(method: str, template: str) -> Optional[str]:
+    if template.startswith("/api/onboarding/"):
+        return "general"
+    if template.startswith("/api/auth/"):
+        return "auth"
+    if template.startswith("/api/"):
+        return "admin_read" if method in ("GET", "HEAD") else "admin_write"
+    return None  # docs, health, metrics and static files
+
+
+class RoutePolicyResolver:
+    """Maps a request to the policy of the route that will serve it.
+
+    Bounded LRU of matched routes keyed by method and path shape, so paths
+    that differ only in ids or tokens share an entry; the path parameters
+    are re-read from the cached route for each request. Only used from the
+    event loop, so it takes no lock.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._routes: Optional[List[Any]] = None
+        self._cache: "OrderedDict[Tuple[str, str], Optional[Tuple[Any, Match]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, scope: Dict[str, Any]) -> Optional[RoutePolicy]:
+        key = (scope["method"], path_shape(scope["path"]))
+        try:
+            cached = self._cache[key]
+        except KeyError:
+            pass
+        else:
+            if cached is None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return None
+            route, expected = cached
+            match, child_scope = route.matches(scope)
+            if match == expected:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._policy_for(scope["method"], route, child_scope)
+            # Another route shares this shape; match from scratch
+
+        self.misses += 1
+        found = self._find(scope)
+        self._cache[key] = None if found is None else (found[0], found[1])
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return None if found is None else self._policy_for(scope["method"], found[0], found[2])
+
+    def _find(self, scope: Dict[str, Any]) -> Optional[Tuple[Any, Match, Dict[str, Any]]]:
+        """The route serving scope, how it matched, and its child scope"""
+        if self._routes is None:
+            # Routes are complete once the app serves requests
+            self._routes = list(iter_route_contexts(scope["app"].routes))
+
+        partial = None
+        for route in self._routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, match, child_scope
+            if match == Match.PARTIAL and partial is None:
+                partial = (route, match, child_scope)
+        # Wrong method (405): still counted against the route's bucket
+        return partial
+
+    @staticmethod
+    def _policy_for(method: str, route: Any, child_scope: Dict[str, Any]) -> RoutePolicy:
+        template = route.path_format
+        policy = ROUTE_POLICIES.get(f"{method} {template}", _default_policy(method, template))
+        return RoutePolicy(template, policy, _subject_for(template), child_scope.get("path_params", {}))
+
+    def clear(self) -> None:
+        self._routes = None
+        self._cache.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+route_policy_resolver = RoutePolicyResolver(settings.rate_limit_route_cache_size)
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Optional
+import time
+from app.rate_limit.base import RateLimitBackend, RateLimitResult, evaluate_sliding_window
+from app.rate_limit.memory_backend import MemoryBackend
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional dependency
+    aioredis = None
+
+
+class RedisBackend(RateLimitBackend):
+    """Counters shared by all workers in any Redis-protocol server.
+    
+    Each check is one pipelined round trip: INCR the current window's key,
+    refresh its TTL and GET the previous window's count. A rejected request
+    is un-counted with a DECR. If the server is unreachable the request is
+    decided by a per-process fallback instead of failing, and Redis is not
+    tried again for `retry_seconds`, so an outage costs one timeout per
+    interval rather than one per request.
+    """
+    
+    name = "redis"
+    
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "rl:",
+        timeout: float = 0.25,
+        fallback_capacity: int = 10000,
+        retry_seconds: float = 5.0
+    ):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for RATE_LIMIT_BACKEND=redis")
+        self.prefix = prefix
+        self._client = aioredis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            health_check_interval=30
+        )
+        self._fallback = MemoryBackend(fallback_capacity)
+        self.retry_seconds = retry_seconds
+        self._open_until = 0.0  # circuit open (fallback only) until this monotonic time
+        self.errors = 0
+        self.last_error: Optional[str] = None
+    
+    async def hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        window_index = int(now // window)
+        current_key = f"{self.prefix}{key}:{window_index}"
+        previous_key = f"{self.prefix}{key}:{window_index - 1}"
+        if time.monotonic() < self._open_until:
+            return self._fallback.hit_now(key, limit, window, now)
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.incr(current_key)
+                pipe.expire(current_key, window * 2)
+                pipe.get(previous_key)
+                current, _, previous = await pipe.execute()
+            
+            result = evaluate_sliding_window(int(previous or 0), int(current) - 1, limit, window, now)
+            if not result.allowed:
+                await self._client.decr(current_key)
+            return result
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            self._open_until = time.monotonic() + self.retry_seconds
+            return self._fallback.hit_now(key, limit, window, now)
+    
+    def sweep(self, now: float) -> int:
+        # Redis expires keys itself; only the fallback needs sweeping
+        return self._fallback.sweep(now)
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "circuit_open": time.monotonic() < self._open_until,
+            "fallback": self._fallback.store.metrics(),
+        }
+    
+    async def close(self) -> None:
+        await self._client.aclose()
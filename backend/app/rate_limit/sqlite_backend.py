@@ -0,0 +1,122 @@
+from typing import Any, Dict, List, Optional
+import sqlite3
+import threading
+from starlette.concurrency import run_in_threadpool
+from app.rate_limit.base import RateLimitBackend, RateLimitResult, evaluate_sliding_window
+from app.rate_limit.memory_backend import MemoryBackend
+
+
+class SQLiteBackend(RateLimitBackend):
+    """Counters in a local SQLite file shared by the workers of one host.
+    
+    Used when no Redis is available. Point the path at a tmpfs such as
+    /dev/shm to keep it in shared memory. Each check is a single short
+    IMMEDIATE transaction (upsert + read), well under a millisecond in WAL
+    mode, run in the threadpool so a busy file never blocks the event loop.
+    If the file stays locked or is unusable, the request is decided by a
+    per-process fallback instead of failing. Every method but close() blocks
+    and belongs in the threadpool.
+    """
+    
+    name = "sqlite"
+    
+    def __init__(self, path: str, fallback_capacity: int = 10000):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []  # one per thread, for close()
+        self._connections_lock = threading.Lock()
+        self._fallback = MemoryBackend(fallback_capacity)
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+                " key TEXT NOT NULL, window_index INTEGER NOT NULL, count INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (key, window_index)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_counters_expires_at"
+                " ON rate_limit_counters (expires_at)"
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # counters are disposable
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    async def hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        try:
+            return await run_in_threadpool(self._hit, key, limit, window, now)
+        except sqlite3.Error as e:
+            # "database is locked" past the busy timeout, a full or missing tmpfs...
+            self.errors += 1
+            self.last_error = str(e)
+            return self._fallback.hit_now(key, limit, window, now)
+    
+    def _hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        window_index = int(now // window)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = dict(conn.execute(
+                "SELECT window_index, count FROM rate_limit_counters"
+                " WHERE key = ? AND window_index IN (?, ?)",
+                (key, window_index - 1, window_index)
+            ).fetchall())
+            result = evaluate_sliding_window(
+                rows.get(window_index - 1, 0), rows.get(window_index, 0), limit, window, now
+            )
+            if result.allowed:
+                conn.execute(
+                    "INSERT INTO rate_limit_counters (key, window_index, count, expires_at)"
+                    " VALUES (?, ?, 1, ?)"
+                    " ON CONFLICT (key, window_index) DO UPDATE SET count = count + 1",
+                    (key, window_index, (window_index + 2) * window)
+                )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    
+    def sweep(self, now: float) -> int:
+        removed = self._fallback.sweep(now)
+        try:
+            removed += self._connect().execute(
+                "DELETE FROM rate_limit_counters WHERE expires_at < ?", (now,)
+            ).rowcount
+        except sqlite3.Error as e:
+            self.errors += 1
+            self.last_error = str(e)
+        return removed
+    
+    def metrics(self) -> Dict[str, Any]:
+        try:
+            keys = self._connect().execute("SELECT COUNT(*) FROM rate_limit_counters").fetchone()[0]
+        except sqlite3.Error as e:
+            self.errors += 1
+            self.last_error = str(e)
+            keys = None
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "rows": keys,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "fallback": self._fallback.store.metrics(),
+        }
+    
+    async def close(self) -> None:
+        # Threadpool threads each opened their own connection
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
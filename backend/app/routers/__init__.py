@@ -1 +1 @@
-from . import auth, companies, flows, stages, content_types, content_blocks, stage_templates, new_hires, onboarding 
\ No newline at end of file
+from . import auth, companies, flows, stages, content_types, content_blocks, stage_templates, new_hires, onboarding, deletion_jobs 
\ No newline at end of file
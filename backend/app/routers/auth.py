@@ -1,27 +1,83 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
+from typing import Dict
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+import uuid
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.company import Company
-from app.auth.jwt import verify_password, get_password_hash, create_access_token, create_refresh_token, verify_token
+from app.auth.jwt import create_token_pair, verify_token
+from app.auth.revocation import revocation_store
+from app.auth.dependencies import invalidate_principal
+from app.auth.hashing import hash_password_async, verify_password_async
+from app.auth.login_throttle import login_keys, login_throttle
 from app.schemas.auth import UserCreate, UserLogin, TokenResponse, RefreshTokenRequest
 
 router = APIRouter()
 
 
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _check_throttle(keys: Dict[str, int]) -> None:
+    """Reject a locked-out IP or account before any lookup or hashing"""
+    retry_after = login_throttle.retry_after(list(keys))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+async def _authenticate(request: Request, email: str, password: str, db: Session) -> User:
+    """Check credentials, counting failures against the client IP and the account"""
+    keys = login_keys(_client_ip(request), email)
+    _check_throttle(keys)
+    
+    user = db.query(User).filter(User.email == email).first()
+    
+    if not user or not await verify_password_async(password, user.password_hash):
+        login_throttle.record(keys)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User account is inactive",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # The account owner got in; the IP keeps its count
+    login_throttle.reset(next(key for key in keys if key.startswith("email:")))
+    return user
+
+
 @router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, request: Request, db: Session = Depends(get_db)):
     """Register a new company and admin user"""
+    keys = login_keys(_client_ip(request), user_data.email, action="register")
+    _check_throttle(keys)
+    
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
+        login_throttle.record(keys)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
     
+    # Hash before opening the write transaction
+    password_hash = await hash_password_async(user_data.password)
+    
     # Create company
     company = Company(
         name=user_data.company_name,
@@ -42,16 +98,19 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         email=user_data.email,
         first_name=user_data.first_name,
         last_name=user_data.last_name,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=password_hash,
         role="admin"
     )
     db.add(user)
     db.commit()
     db.refresh(user)
     
-    # Create tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    # Every registration counts against the IP, so sign-up bursts back off too
+    ip_key = next(key for key in keys if key.startswith("ip:"))
+    login_throttle.record({ip_key: keys[ip_key]})
+    
+    # Create tokens (a new token family per login)
+    access_token, refresh_token = create_token_pair(str(user.id))
     
     return TokenResponse(
         access_token=access_token,
@@ -61,27 +120,12 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Login user and return tokens (JSON format)"""
-    user = db.query(User).filter(User.email == login_data.email).first()
-    
-    if not user or not verify_password(login_data.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User account is inactive",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = await _authenticate(request, login_data.email, login_data.password, db)
     
-    # Create tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    # Create tokens (a new token family per login)
+    access_token, refresh_token = create_token_pair(str(user.id))
     
     return TokenResponse(
         access_token=access_token,
@@ -91,27 +135,16 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/login/oauth2", response_model=TokenResponse)
-async def login_oauth2(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_oauth2(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
     """Login user and return tokens (OAuth2 format for compatibility)"""
-    user = db.query(User).filter(User.email == form_data.username).first()
-    
-    if not user or not verify_password(form_data.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User account is inactive",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = await _authenticate(request, form_data.username, form_data.password, db)
     
-    # Create tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    # Create tokens (a new token family per login)
+    access_token, refresh_token = create_token_pair(str(user.id))
     
     return TokenResponse(
         access_token=access_token,
@@ -120,9 +153,36 @@ async def login_oauth2(form_data: OAuth2PasswordRequestForm = Depends(), db: Ses
     )
 
 
+def _refresh_token_expiry(payload: dict) -> datetime:
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        return datetime.utcfromtimestamp(exp)
+    return datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+
+
+def _family_expiry() -> datetime:
+    """How long a family revocation must be kept: until its newest possible token expires"""
+    return datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+
+
+def _parse_user_id(user_id) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(user_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_data: RefreshTokenRequest):
-    """Refresh access token using refresh token"""
+async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Rotate a refresh token: the presented token is spent and a new pair is issued.
+    
+    Presenting a spent token again means it leaked, so the whole token family
+    is revoked and the user has to log in again.
+    """
     payload = verify_token(refresh_data.refresh_token)
     
     if not payload or payload.get("type") != "refresh":
@@ -140,11 +200,63 @@ async def refresh_token(refresh_data: RefreshTokenRequest):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create new access token
-    access_token = create_access_token(data={"sub": user_id})
+    jti = payload.get("jti")
+    family_id = payload.get("fam")
+    expires_at = _refresh_token_expiry(payload)
+    user_uuid = _parse_user_id(user_id)
+    
+    if jti and family_id:
+        if revocation_store.is_revoked(db, family_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # Spending the jti is an insert; a duplicate means the token was already used
+        if not revocation_store.revoke(db, jti, "rotated", expires_at, user_id=user_uuid):
+            revocation_store.revoke(db, family_id, "reuse", _family_expiry(), kind="family", user_id=user_uuid)
+            invalidate_principal(user_uuid)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token reuse detected, please log in again",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    else:
+        # Tokens issued before rotation existed start a new family
+        family_id = None
+    
+    access_token, new_refresh_token = create_token_pair(user_id, family_id)
     
     return TokenResponse(
         access_token=access_token,
-        refresh_token=refresh_data.refresh_token,  # Return same refresh token
+        refresh_token=new_refresh_token,
         token_type="bearer"
-    ) 
\ No newline at end of file
+    )
+
+
+@router.post("/logout")
+async def logout(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoke the refresh token family, ending the session on every device that shares it"""
+    payload = verify_token(refresh_data.refresh_token)
+    
+    if not payload or payload.get("type") != "refresh" or not payload.get("fam"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_id = payload.get("sub")
+    revocation_store.revoke(
+        db,
+        payload["fam"],
+        "logout",
+        _family_expiry(),
+        kind="family",
+        user_id=_parse_user_id(user_id) if user_id else None
+    )
+    if user_id:
+        invalidate_principal(user_id)
+    
+    return {"message": "Logged out successfully"}
@@ -1,21 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.user import User
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, invalidate_company_principals, TenantContext
 from app.services.company_service import CompanyService
+from app.services.image_service import ImageService
 from app.schemas.company import CompanyUpdate, CompanyResponse
+from app.schemas.file import SignedUploadComplete, SignedUploadRequest, SignedUploadResponse
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=CompanyResponse)
 async def get_company_info(
-    current_user: User = Depends(get_current_user), 
+    tenant: TenantContext = Depends(get_tenant_context), 
     db: Session = Depends(get_db)
 ):
     """Get current user's company information"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -31,6 +34,7 @@ async def get_company_info(
         secondary_color=company.secondary_color,
         accent_color=company.accent_color,
         logo_url=company.logo_url,
+        logo_variants=company.logo_variants,
         created_at=company.created_at,
         updated_at=company.updated_at
     )
@@ -39,11 +43,11 @@ async def get_company_info(
 @router.patch("/me", response_model=CompanyResponse)
 async def update_company_info(
     company_data: CompanyUpdate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update current user's company information"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -52,6 +56,7 @@ async def update_company_info(
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
+    invalidate_company_principals(company.id)
     
     updated_company = result["company"]
     return CompanyResponse(
@@ -65,28 +70,88 @@ async def update_company_info(
         secondary_color=updated_company.secondary_color,
         accent_color=updated_company.accent_color,
         logo_url=updated_company.logo_url,
+        logo_variants=updated_company.logo_variants,
         created_at=updated_company.created_at,
         updated_at=updated_company.updated_at
     )
 
 
+@router.get("/me/logo")
+async def get_company_logo(
+    w: Optional[int] = Query(None, ge=1, description="Display width in pixels"),
+    h: Optional[int] = Query(None, ge=1, description="Display height in pixels"),
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Redirect to the smallest logo variant covering w x h"""
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
+    
+    if not company or not company.logo_url:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    
+    url = ImageService.select_variant(company.logo_url, company.logo_variants, w, h)
+    return RedirectResponse(url, headers={"Cache-Control": "private, max-age=300"})
+
+
 @router.post("/me/logo")
 async def upload_company_logo(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Upload company logo; resized variants are rendered in the background"""
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
+    
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    result = await CompanyService.upload_logo(db, str(company.id), file)
+    
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    background_tasks.add_task(ImageService.generate_logo_variants, company.id)
+    return {
+        "message": "Logo uploaded successfully",
+        "logo_url": result["logo_url"]
+    }
+
+
+@router.post("/me/logo/sign", response_model=SignedUploadResponse)
+async def sign_company_logo_upload(
+    upload: SignedUploadRequest,
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Get a short-lived URL to upload a logo to directly, bypassing the API"""
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
+    
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    return CompanyService.create_logo_upload(company, upload)
+
+
+@router.post("/me/logo/complete")
+async def complete_company_logo_upload(
+    upload: SignedUploadComplete,
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
-    """Upload company logo"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
+    """Use a logo uploaded through a signed URL"""
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    result = CompanyService.upload_logo(db, str(company.id), file)
+    result = await CompanyService.complete_logo_upload(db, company, upload.upload_token)
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
     
+    background_tasks.add_task(ImageService.generate_logo_variants, company.id)
     return {
         "message": "Logo uploaded successfully",
         "logo_url": result["logo_url"]
@@ -95,11 +160,11 @@ async def upload_company_logo(
 
 @router.get("/me/stats")
 async def get_company_stats(
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get company statistics and analytics"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
+    company = CompanyService.get_company_by_id(db, str(tenant.company_id))
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -1,18 +1,19 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import uuid
 from app.database import get_db
-from app.models.user import User
 from app.models.stage import Stage
 from app.models.onboarding_flow import OnboardingFlow
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, TenantContext
 from app.services.content_service import ContentService
+from app.services.image_service import ImageService
 from app.schemas.content import (
     ContentBlockCreate,
     ContentBlockUpdate,
     ContentBlockResponse,
-    ContentBlockReorder
+    ContentBlockReorder,
+    ContentBlockMove
 )
 
 router = APIRouter()
@@ -21,7 +22,7 @@ router = APIRouter()
 @router.get("/stages/{stage_id}/content-blocks", response_model=List[ContentBlockResponse])
 async def list_content_blocks(
     stage_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """List all content blocks for a stage"""
@@ -29,7 +30,7 @@ async def list_content_blocks(
     stage_uuid = uuid.UUID(stage_id)
     stage = db.query(Stage).join(OnboardingFlow).filter(
         Stage.id == stage_uuid,
-        OnboardingFlow.company_id == current_user.company_id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not stage:
@@ -43,7 +44,8 @@ async def list_content_blocks(
 async def create_content_block(
     stage_id: str,
     content_block_data: ContentBlockCreate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Create a new content block in a stage"""
@@ -51,7 +53,7 @@ async def create_content_block(
     stage_uuid = uuid.UUID(stage_id)
     stage = db.query(Stage).join(OnboardingFlow).filter(
         Stage.id == stage_uuid,
-        OnboardingFlow.company_id == current_user.company_id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not stage:
@@ -66,6 +68,8 @@ async def create_content_block(
             content=content_block_data.content,
             order_index=content_block_data.order_index
         )
+        if content_block.type == "media":
+            background_tasks.add_task(ImageService.generate_media_variants, content_block.id)
         return content_block
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -74,7 +78,7 @@ async def create_content_block(
 @router.get("/content-blocks/{content_block_id}", response_model=ContentBlockResponse)
 async def get_content_block(
     content_block_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get a specific content block"""
@@ -87,20 +91,21 @@ async def get_content_block(
     stage_uuid = uuid.UUID(str(content_block.stage_id))
     stage = db.query(Stage).join(OnboardingFlow).filter(
         Stage.id == stage_uuid,
-        OnboardingFlow.company_id == current_user.company_id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not stage:
         raise HTTPException(status_code=404, detail="Content block not found")
     
-    return content_block
+    return ContentService.with_position(db, content_block)
 
 
 @router.put("/content-blocks/{content_block_id}", response_model=ContentBlockResponse)
 async def update_content_block(
     content_block_id: str,
     content_block_data: ContentBlockUpdate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update a content block"""
@@ -112,7 +117,7 @@ async def update_content_block(
     # content_block.stage_id is already a UUID object from SQLAlchemy
     stage = db.query(Stage).join(OnboardingFlow).filter(
         Stage.id == content_block.stage_id,
-        OnboardingFlow.company_id == current_user.company_id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not stage:
@@ -128,13 +133,15 @@ async def update_content_block(
     if not updated_block:
         raise HTTPException(status_code=404, detail="Content block not found")
     
+    if updated_block.type == "media" and updated_block.media_variants is None:
+        background_tasks.add_task(ImageService.generate_media_variants, updated_block.id)
     return updated_block
 
 
 @router.delete("/content-blocks/{content_block_id}")
 async def delete_content_block(
     content_block_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Delete a content block"""
@@ -146,7 +153,7 @@ async def delete_content_block(
     # content_block.stage_id is already a UUID object from SQLAlchemy
     stage = db.query(Stage).join(OnboardingFlow).filter(
         Stage.id == content_block.stage_id,
-        OnboardingFlow.company_id == current_user.company_id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not stage:
@@ -164,7 +171,7 @@ async def delete_content_block(
 async def reorder_content_blocks(
     stage_id: str,
     reorder_data: ContentBlockReorder,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Reorder content blocks within a stage"""
@@ -172,7 +179,7 @@ async def reorder_content_blocks(
     stage_uuid = uuid.UUID(stage_id)
     stage = db.query(Stage).join(OnboardingFlow).filter(
         Stage.id == stage_uuid,
-        OnboardingFlow.company_id == current_user.company_id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not stage:
@@ -184,4 +191,39 @@ async def reorder_content_blocks(
         content_block_orders=reorder_data.content_blocks
     )
     
-    return content_blocks 
\ No newline at end of file
+    return content_blocks
+
+
+@router.post("/stages/{stage_id}/content-blocks/{content_block_id}/move", response_model=ContentBlockResponse)
+async def move_content_block(
+    stage_id: str,
+    content_block_id: str,
+    move_data: ContentBlockMove,
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Move one content block within a stage (drag and drop); only its own sort key changes"""
+    # Verify stage belongs to user's company
+    stage_uuid = uuid.UUID(stage_id)
+    stage = db.query(Stage).join(OnboardingFlow).filter(
+        Stage.id == stage_uuid,
+        OnboardingFlow.company_id == tenant.company_id
+    ).first()
+    
+    if not stage:
+        raise HTTPException(status_code=404, detail="Stage not found")
+    
+    if move_data.after_id == content_block_id:
+        raise HTTPException(status_code=400, detail="A content block cannot be moved after itself")
+    
+    content_block = ContentService.move_content_block(
+        db=db,
+        stage_id=stage_id,
+        content_block_id=content_block_id,
+        after_id=move_data.after_id
+    )
+    
+    if not content_block:
+        raise HTTPException(status_code=404, detail="Content block not found")
+    
+    return content_block
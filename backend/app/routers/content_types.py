@@ -2,8 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.user import User
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, TenantContext
 from app.services.content_type_service import ContentTypeService
 from app.services.content_service import ContentService
 from app.schemas.content import (
@@ -17,7 +16,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[ContentTypeResponse])
 async def list_content_types(
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """List all available content types"""
@@ -28,7 +27,7 @@ async def list_content_types(
 @router.get("/{name}", response_model=ContentTypeResponse)
 async def get_content_type(
     name: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get a specific content type by name"""
@@ -43,7 +42,7 @@ async def get_content_type(
 @router.get("/{name}/config")
 async def get_content_type_config(
     name: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get the default configuration for a content type"""
@@ -62,7 +61,7 @@ async def get_content_type_config(
 @router.post("/validate", response_model=ContentValidationResponse)
 async def validate_content(
     validation_data: ContentValidationRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Validate content against a content type"""
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.auth.dependencies import get_tenant_context, TenantContext
+from app.services.deletion_service import DeletionService
+from app.schemas.deletion_job import DeletionJobResponse
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=DeletionJobResponse)
+async def get_deletion_job(
+    job_id: str,
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Get the status of a background deletion job"""
+    job = DeletionService.get_job(db, job_id, tenant.company_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    
+    return job
@@ -0,0 +1,102 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+import os
+import stat
+from starlette.concurrency import run_in_threadpool
+from app.database import get_db
+from app.auth.dependencies import get_optional_tenant_context, TenantContext
+from app.services.file_service import FileService
+from app.services.onboarding_service import OnboardingSessionService
+from app.storage.base import StorageError
+from app.storage.factory import get_storage
+from app.storage.serving import CACHE_IMMUTABLE, CACHE_REVALIDATE, file_etag, file_response
+from app.storage.signed_urls import verify_download
+
+router = APIRouter()
+
+
+def _can_read(
+    db: Session,
+    access: dict,
+    tenant: Optional[TenantContext],
+    session_token: Optional[str]
+) -> bool:
+    if access["public"]:
+        return True
+    if tenant is not None and tenant.company_id in access["company_ids"]:
+        return True
+    if session_token:
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        return (
+            new_hire is not None
+            and not new_hire.is_session_token_expired()
+            and new_hire.id in access["new_hire_ids"]
+        )
+    return False
+
+
+@router.put("/uploads/{upload_token}", include_in_schema=False)
+async def receive_upload(upload_token: str, request: Request):
+    """Storage endpoint for signed uploads: streams the body into the blob store.
+
+    Authorized by the token alone, without a database session; the response's
+    upload_token completes the upload through the API.
+    """
+    return await FileService.receive_signed_upload(upload_token, request.stream())
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_file(
+    file_path: str,
+    request: Request,
+    session_token: Optional[str] = Query(None),
+    expires: Optional[int] = Query(None),
+    signature: Optional[str] = Query(None),
+    tenant: Optional[TenantContext] = Depends(get_optional_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Serve a stored file with ETag, Cache-Control and Range support.
+
+    Private files (onboarding uploads) need a signed URL, an admin token of
+    the owning company or the uploading new hire's session_token; to
+    everyone else they do not exist.
+    """
+    storage = get_storage()
+    if not hasattr(storage, "local_path"):
+        # Remote backends serve their own URLs
+        raise HTTPException(status_code=404, detail="File not found")
+
+    try:
+        path = storage.local_path(file_path)
+    except StorageError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if verify_download(file_path, expires, signature):
+        access = FileService.signed_access(file_path)
+    else:
+        access = FileService.resolve_access(db, file_path)
+        if access is None or not _can_read(db, access, tenant, session_token):
+            raise HTTPException(status_code=404, detail="File not found")
+
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # Don't hold a pooled connection while a large file streams
+    db.close()
+
+    visibility = "public" if access["public"] else "private"
+    cache_policy = CACHE_IMMUTABLE if access["immutable"] else CACHE_REVALIDATE
+    return file_response(
+        request,
+        path,
+        file_path,
+        stat_result,
+        access["content_type"],
+        access["etag"] or file_etag(stat_result),
+        f"{visibility}, {cache_policy}"
+    )
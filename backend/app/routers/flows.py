@@ -1,12 +1,11 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import uuid
 from app.database import get_db
-from app.models.user import User
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, TenantContext
 from app.services.flow_service import FlowService
-from app.services.company_service import CompanyService
+from app.services.deletion_service import DeletionService
 from app.schemas.flow import FlowCreate, FlowUpdate, FlowResponse
 from app.models.onboarding_flow import OnboardingFlow
 
@@ -15,17 +14,12 @@ router = APIRouter()
 
 @router.get("/", response_model=List[FlowResponse])
 async def list_flows(
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """List all onboarding flows for the current company"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     flows = db.query(OnboardingFlow).filter(
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).all()
     
     return [
@@ -46,16 +40,11 @@ async def list_flows(
 @router.post("/", response_model=FlowResponse)
 async def create_flow(
     flow_data: FlowCreate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Create a new onboarding flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
-    result = FlowService.create_flow(db, str(company.id), flow_data.dict())
+    result = FlowService.create_flow(db, str(tenant.company_id), flow_data.dict())
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -76,19 +65,14 @@ async def create_flow(
 @router.get("/{flow_id}", response_model=FlowResponse)
 async def get_flow(
     flow_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get a specific onboarding flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -110,20 +94,15 @@ async def get_flow(
 async def update_flow(
     flow_id: str,
     flow_data: FlowUpdate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update an onboarding flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -150,48 +129,39 @@ async def update_flow(
 @router.delete("/{flow_id}")
 async def delete_flow(
     flow_id: str,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
-    """Delete an onboarding flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
+    """Delete an onboarding flow; its stages, content and new hires are removed in the background"""
     # Verify flow belongs to company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
         raise HTTPException(status_code=404, detail="Flow not found")
     
-    db.delete(flow)
-    db.commit()
+    job = DeletionService.schedule_flow_deletion(db, flow)
+    background_tasks.add_task(DeletionService.run_job, job.id)
     
-    return {"message": "Flow deleted successfully"}
+    return {"message": "Flow deleted successfully", "deletion_job_id": str(job.id)}
 
 
 @router.get("/{flow_id}/pipeline")
 async def get_flow_pipeline(
     flow_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get pipeline data for a flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -208,20 +178,15 @@ async def get_flow_pipeline(
 @router.get("/{flow_id}/stats")
 async def get_flow_stats(
     flow_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get statistics for a flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
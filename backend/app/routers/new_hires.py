@@ -1,16 +1,17 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import uuid
 from app.database import get_db
-from app.models.user import User
 from app.models.new_hire import NewHire
 from app.models.onboarding_flow import OnboardingFlow
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, TenantContext
 from app.services.new_hire_service import NewHireService
-from app.services.company_service import CompanyService
+from app.services.deletion_service import DeletionService
+from app.services.file_service import FileService, OWNER_ONBOARDING_UPLOAD
 from app.schemas.new_hire import NewHireCreate, NewHireUpdate, NewHireResponse
 from app.schemas.new_hire import StatusUpdate
+from app.schemas.file import SignedDownloadResponse
 from datetime import datetime
 
 router = APIRouter()
@@ -18,16 +19,11 @@ router = APIRouter()
 
 @router.get("/", response_model=List[NewHireResponse])
 async def list_new_hires(
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """List all new hires for the current company"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
-    new_hires = NewHireService.get_new_hires_by_company(db, str(company.id))
+    new_hires = NewHireService.get_new_hires_by_company(db, str(tenant.company_id))
     
     return [
         NewHireResponse(
@@ -52,20 +48,15 @@ async def list_new_hires(
 @router.post("/", response_model=NewHireResponse)
 async def create_new_hire(
     new_hire_data: NewHireCreate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Create a new hire"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(new_hire_data.flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -74,13 +65,13 @@ async def create_new_hire(
     # Check if new hire already exists with this email
     existing = db.query(NewHire).filter(
         NewHire.email == new_hire_data.email,
-        NewHire.company_id == company.id
+        NewHire.company_id == tenant.company_id
     ).first()
     
     if existing:
         raise HTTPException(status_code=400, detail="New hire with this email already exists")
     
-    result = NewHireService.create_new_hire(db, str(company.id), new_hire_data.dict())
+    result = NewHireService.create_new_hire(db, str(tenant.company_id), new_hire_data.dict())
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error creating new hire"])
@@ -106,19 +97,14 @@ async def create_new_hire(
 @router.get("/{new_hire_id}", response_model=NewHireResponse)
 async def get_new_hire(
     new_hire_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get a specific new hire"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     new_hire_uuid = uuid.UUID(new_hire_id)
     new_hire = db.query(NewHire).join(OnboardingFlow).filter(
         NewHire.id == new_hire_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not new_hire:
@@ -146,19 +132,14 @@ async def get_new_hire(
 async def update_new_hire(
     new_hire_id: str,
     new_hire_data: NewHireUpdate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update a new hire"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     new_hire_uuid = uuid.UUID(new_hire_id)
     new_hire = db.query(NewHire).join(OnboardingFlow).filter(
         NewHire.id == new_hire_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not new_hire:
@@ -192,47 +173,38 @@ async def update_new_hire(
 @router.delete("/{new_hire_id}")
 async def delete_new_hire(
     new_hire_id: str,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
-    """Delete a new hire"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
+    """Delete a new hire; their progress is removed in the background"""
     new_hire_uuid = uuid.UUID(new_hire_id)
     new_hire = db.query(NewHire).join(OnboardingFlow).filter(
         NewHire.id == new_hire_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not new_hire:
         raise HTTPException(status_code=404, detail="New hire not found")
     
-    db.delete(new_hire)
-    db.commit()
+    job = DeletionService.schedule_new_hire_deletion(db, new_hire)
+    background_tasks.add_task(DeletionService.run_job, job.id)
     
-    return {"message": "New hire deleted successfully"}
+    return {"message": "New hire deleted successfully", "deletion_job_id": str(job.id)}
 
 
 @router.get("/{new_hire_id}/progress")
 async def get_new_hire_progress(
     new_hire_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get progress for a specific new hire"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify new hire belongs to company
     new_hire_uuid = uuid.UUID(new_hire_id)
     new_hire = db.query(NewHire).join(OnboardingFlow).filter(
         NewHire.id == new_hire_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not new_hire:
@@ -246,23 +218,44 @@ async def get_new_hire_progress(
     return result["progress"]
 
 
+@router.get("/{new_hire_id}/uploads/{file_id}", response_model=SignedDownloadResponse)
+async def get_new_hire_upload_download_url(
+    new_hire_id: str,
+    file_id: str,
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Get a short-lived download URL for a file the new hire uploaded"""
+    # Verify new hire belongs to company
+    new_hire_uuid = uuid.UUID(new_hire_id)
+    new_hire = db.query(NewHire).join(OnboardingFlow).filter(
+        NewHire.id == new_hire_uuid,
+        OnboardingFlow.company_id == tenant.company_id
+    ).first()
+    
+    if not new_hire:
+        raise HTTPException(status_code=404, detail="New hire not found")
+    
+    result = FileService.get_download_url(db, file_id, OWNER_ONBOARDING_UPLOAD, new_hire.id)
+    
+    if not result:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return result
+
+
 @router.post("/{new_hire_id}/resend-invitation")
 async def resend_invitation(
     new_hire_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Resend invitation to a new hire"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify new hire belongs to company
     new_hire_uuid = uuid.UUID(new_hire_id)
     new_hire = db.query(NewHire).join(OnboardingFlow).filter(
         NewHire.id == new_hire_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not new_hire:
@@ -282,19 +275,14 @@ async def resend_invitation(
 async def update_new_hire_status(
     new_hire_id: str,
     status_data: StatusUpdate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update new hire status"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     new_hire_uuid = uuid.UUID(new_hire_id)
     new_hire = db.query(NewHire).join(OnboardingFlow).filter(
         NewHire.id == new_hire_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not new_hire:
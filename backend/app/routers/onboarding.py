@@ -1,5 +1,6 @@
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, status, UploadFile, File
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.new_hire import NewHire
@@ -16,9 +17,37 @@ from app.schemas.onboarding import (
     ProgressOverview,
     FileUpload
 )
+from app.schemas.file import (
+    ResumableUploadCreate,
+    ResumableUploadStatus,
+    SignedDownloadResponse,
+    SignedUploadComplete,
+    SignedUploadRequest,
+    SignedUploadResponse
+)
 
 router = APIRouter()
 
+_RESUMABLE_ERROR_STATUS = {
+    "Onboarding session not found": status.HTTP_404_NOT_FOUND,
+    "Upload not found": status.HTTP_404_NOT_FOUND,
+    "Too many uploads in progress": status.HTTP_429_TOO_MANY_REQUESTS,
+}
+
+
+def _raise_resumable_error(result: Dict[str, Any]):
+    if "offset" in result:
+        # Wrong offset: tell the client where to resume
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": result["error"], "offset": result["offset"]},
+            headers={"Upload-Offset": str(result["offset"])}
+        )
+    raise HTTPException(
+        status_code=_RESUMABLE_ERROR_STATUS.get(result["error"], status.HTTP_400_BAD_REQUEST),
+        detail=result["error"]
+    )
+
 
 @router.get("/{session_token}", response_model=OnboardingSession)
 async def get_onboarding_session(
@@ -121,6 +150,45 @@ async def get_stage_with_content_blocks(
     return stage_data
 
 
+@router.get("/{session_token}/logo")
+async def get_company_logo(
+    session_token: str,
+    w: Optional[int] = Query(None, ge=1, description="Display width in pixels"),
+    h: Optional[int] = Query(None, ge=1, description="Display height in pixels"),
+    db: Session = Depends(get_db)
+):
+    """Redirect to the smallest company logo variant covering w x h"""
+    url = OnboardingSessionService.get_image_url(db, session_token, w, h)
+    
+    if not url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Logo not found"
+        )
+    
+    return RedirectResponse(url, headers={"Cache-Control": "private, max-age=300"})
+
+
+@router.get("/{session_token}/content-blocks/{content_block_id}/media")
+async def get_content_block_media(
+    session_token: str,
+    content_block_id: str,
+    w: Optional[int] = Query(None, ge=1, description="Display width in pixels"),
+    h: Optional[int] = Query(None, ge=1, description="Display height in pixels"),
+    db: Session = Depends(get_db)
+):
+    """Redirect to the smallest variant of a media block's image covering w x h"""
+    url = OnboardingSessionService.get_image_url(db, session_token, w, h, content_block_id)
+    
+    if not url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media not found"
+        )
+    
+    return RedirectResponse(url, headers={"Cache-Control": "private, max-age=300"})
+
+
 @router.get("/{session_token}/stages/{stage_id}/status")
 async def get_stage_status(
     session_token: str,
@@ -187,7 +255,43 @@ async def upload_file(
     db: Session = Depends(get_db)
 ):
     """Upload a file for the onboarding session"""
-    result = OnboardingSessionService.upload_file(db, session_token, file)
+    result = await OnboardingSessionService.upload_file(db, session_token, file)
+    
+    if not result["success"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=result["error"]
+        )
+    
+    return {"message": "File uploaded successfully", "data": result["data"]}
+
+
+@router.post("/{session_token}/uploads/sign", response_model=SignedUploadResponse)
+async def sign_upload(
+    session_token: str,
+    upload: SignedUploadRequest,
+    db: Session = Depends(get_db)
+):
+    """Get a short-lived URL to upload a file to directly, bypassing the API"""
+    result = OnboardingSessionService.create_signed_upload(db, session_token, upload)
+    
+    if not result["success"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=result["error"]
+        )
+    
+    return result
+
+
+@router.post("/{session_token}/uploads/complete")
+async def complete_signed_upload(
+    session_token: str,
+    upload: SignedUploadComplete,
+    db: Session = Depends(get_db)
+):
+    """Record a file uploaded through a signed URL"""
+    result = await OnboardingSessionService.complete_signed_upload(db, session_token, upload.upload_token)
     
     if not result["success"]:
         raise HTTPException(
@@ -198,6 +302,107 @@ async def upload_file(
     return {"message": "File uploaded successfully", "data": result["data"]}
 
 
+@router.post(
+    "/{session_token}/uploads/resumable",
+    response_model=ResumableUploadStatus,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_resumable_upload(
+    session_token: str,
+    upload: ResumableUploadCreate,
+    db: Session = Depends(get_db)
+):
+    """Start a chunked upload: PATCH chunks from `offset`, then finalize"""
+    result = OnboardingSessionService.create_resumable_upload(db, session_token, upload)
+    
+    if not result["success"]:
+        _raise_resumable_error(result)
+    
+    return result["data"]
+
+
+@router.get("/{session_token}/uploads/resumable/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(
+    session_token: str,
+    upload_id: str,
+    db: Session = Depends(get_db)
+):
+    """Offset to resume a chunked upload from after a dropped connection"""
+    result = OnboardingSessionService.get_resumable_upload(db, session_token, upload_id)
+    
+    if not result["success"]:
+        _raise_resumable_error(result)
+    
+    return result["data"]
+
+
+@router.patch("/{session_token}/uploads/resumable/{upload_id}", response_model=ResumableUploadStatus)
+async def append_resumable_upload(
+    session_token: str,
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0, description="Offset of the first byte of the body"),
+    db: Session = Depends(get_db)
+):
+    """Send the next chunk of a chunked upload as the raw request body"""
+    result = await OnboardingSessionService.append_resumable_upload(
+        db, session_token, upload_id, upload_offset, request.stream()
+    )
+    
+    if not result["success"]:
+        _raise_resumable_error(result)
+    
+    return result["data"]
+
+
+@router.post("/{session_token}/uploads/resumable/{upload_id}/finalize")
+async def finalize_resumable_upload(
+    session_token: str,
+    upload_id: str,
+    db: Session = Depends(get_db)
+):
+    """Assemble a fully received chunked upload into a stored file"""
+    result = await OnboardingSessionService.finalize_resumable_upload(db, session_token, upload_id)
+    
+    if not result["success"]:
+        _raise_resumable_error(result)
+    
+    return {"message": "File uploaded successfully", "data": result["data"]}
+
+
+@router.delete("/{session_token}/uploads/resumable/{upload_id}")
+async def abort_resumable_upload(
+    session_token: str,
+    upload_id: str,
+    db: Session = Depends(get_db)
+):
+    """Discard a chunked upload"""
+    result = await OnboardingSessionService.abort_resumable_upload(db, session_token, upload_id)
+    
+    if not result["success"]:
+        _raise_resumable_error(result)
+    
+    return {"message": "Upload discarded"}
+
+
+@router.get("/{session_token}/uploads/{file_id}", response_model=SignedDownloadResponse)
+async def get_upload_download_url(
+    session_token: str,
+    file_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get a short-lived download URL for one of the session's uploads"""
+    result = OnboardingSessionService.get_upload_download_url(db, session_token, file_id)
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    return result
+
+
 @router.post("/{session_token}/complete")
 async def complete_onboarding(
     session_token: str,
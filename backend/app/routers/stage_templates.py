@@ -2,8 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.user import User
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, TenantContext
 from app.services.stage_template_service import StageTemplateService
 from app.schemas.content import (
     StageTemplateCreate,
@@ -16,7 +15,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[StageTemplateResponse])
 async def list_stage_templates(
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """List all available stage templates"""
@@ -27,7 +26,7 @@ async def list_stage_templates(
 @router.get("/{template_id}", response_model=StageTemplateResponse)
 async def get_stage_template(
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get a specific stage template"""
@@ -42,7 +41,7 @@ async def get_stage_template(
 @router.get("/type/{template_type}", response_model=List[StageTemplateResponse])
 async def get_templates_by_type(
     template_type: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get stage templates by type"""
@@ -53,7 +52,7 @@ async def get_templates_by_type(
 @router.post("/", response_model=StageTemplateResponse)
 async def create_stage_template(
     template_data: StageTemplateCreate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Create a new stage template"""
@@ -74,7 +73,7 @@ async def create_stage_template(
 async def update_stage_template(
     template_id: str,
     template_data: StageTemplateUpdate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update a stage template"""
@@ -106,7 +105,7 @@ async def update_stage_template(
 @router.delete("/{template_id}")
 async def delete_stage_template(
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Delete a stage template"""
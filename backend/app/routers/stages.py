@@ -1,16 +1,15 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import uuid
 from app.database import get_db
-from app.models.user import User
 from app.models.stage import Stage
 from app.models.onboarding_flow import OnboardingFlow
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_tenant_context, TenantContext
 from app.services.content_service import ContentService
 from app.services.flow_service import FlowService
-from app.services.company_service import CompanyService
-from app.schemas.stage import StageCreate, StageUpdate, StageResponse
+from app.services.deletion_service import DeletionService
+from app.schemas.stage import StageCreate, StageUpdate, StageResponse, StageMove
 
 router = APIRouter()
 
@@ -18,20 +17,15 @@ router = APIRouter()
 @router.get("/flows/{flow_id}/stages", response_model=List[StageResponse])
 async def list_stages(
     flow_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """List all stages for a specific flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -59,7 +53,7 @@ async def list_stages(
                     "type": cb.type,
                     "config": cb.config,
                     "content": cb.content,
-                    "order_index": cb.order_index
+                    "order_index": cb.position
                 }
                 for cb in content_blocks
             ]
@@ -72,20 +66,15 @@ async def list_stages(
 async def create_stage(
     flow_id: str,
     stage_data: StageCreate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Create a new stage in a flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -114,20 +103,15 @@ async def create_stage(
 async def create_stage_from_template(
     flow_id: str,
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Create a new stage in a flow using a stage template"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -174,32 +158,85 @@ async def create_stage_from_template(
                 "type": cb.type,
                 "config": cb.config,
                 "content": cb.content,
-                "order_index": cb.order_index
+                "order_index": cb.position
             }
             for cb in content_blocks
         ]
     )
 
 
+# Declared before the /stages/{stage_id} routes, which would take "reorder" for a stage id
+@router.patch("/flows/{flow_id}/stages/reorder")
+async def reorder_stages(
+    flow_id: str,
+    stage_order: List[str],
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Reorder stages in a flow"""
+    # Verify flow belongs to user's company
+    flow_uuid = uuid.UUID(flow_id)
+    flow = db.query(OnboardingFlow).filter(
+        OnboardingFlow.id == flow_uuid,
+        OnboardingFlow.company_id == tenant.company_id
+    ).first()
+    
+    if not flow:
+        raise HTTPException(status_code=404, detail="Flow not found")
+    
+    result = FlowService.reorder_stages(db, flow_id, stage_order)
+    
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return {"message": "Stages reordered successfully"}
+
+
+@router.post("/flows/{flow_id}/stages/{stage_id}/move")
+async def move_stage(
+    flow_id: str,
+    stage_id: str,
+    move_data: StageMove,
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: Session = Depends(get_db)
+):
+    """Move one stage within a flow (drag and drop); only its own order changes"""
+    # Verify flow belongs to user's company
+    flow_uuid = uuid.UUID(flow_id)
+    flow = db.query(OnboardingFlow).filter(
+        OnboardingFlow.id == flow_uuid,
+        OnboardingFlow.company_id == tenant.company_id
+    ).first()
+    
+    if not flow:
+        raise HTTPException(status_code=404, detail="Flow not found")
+    
+    if move_data.after_id == stage_id:
+        raise HTTPException(status_code=400, detail="A stage cannot be moved after itself")
+    
+    result = FlowService.move_stage(db, flow_id, stage_id, move_data.after_id)
+    
+    if not result["success"]:
+        status_code = 404 if result["error"] == "Stage not found" else 400
+        raise HTTPException(status_code=status_code, detail=result["error"])
+    
+    return {"message": "Stage moved successfully", "order": result["order"]}
+
+
 @router.get("/flows/{flow_id}/stages/{stage_id}", response_model=StageResponse)
 async def get_stage(
     flow_id: str,
     stage_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Get a specific stage"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(flow_id)
     stage_uuid = uuid.UUID(stage_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -231,7 +268,7 @@ async def get_stage(
                 "type": cb.type,
                 "config": cb.config,
                 "content": cb.content,
-                "order_index": cb.order_index
+                "order_index": cb.position
             }
             for cb in content_blocks
         ]
@@ -243,20 +280,15 @@ async def update_stage(
     flow_id: str,
     stage_id: str,
     stage_data: StageUpdate,
-    current_user: User = Depends(get_current_user),
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
     """Update a stage"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(flow_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -286,7 +318,7 @@ async def update_stage(
                 "type": cb.type,
                 "config": cb.config,
                 "content": cb.content,
-                "order_index": cb.order_index
+                "order_index": cb.position
             }
             for cb in content_blocks
         ]
@@ -297,21 +329,17 @@ async def update_stage(
 async def delete_stage(
     flow_id: str,
     stage_id: str,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_tenant_context),
     db: Session = Depends(get_db)
 ):
-    """Delete a stage"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
+    """Delete a stage; its content blocks and progress are removed in the background"""
     # Verify flow belongs to user's company
     flow_uuid = uuid.UUID(flow_id)
     stage_uuid = uuid.UUID(stage_id)
     flow = db.query(OnboardingFlow).filter(
         OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
+        OnboardingFlow.company_id == tenant.company_id
     ).first()
     
     if not flow:
@@ -325,38 +353,7 @@ async def delete_stage(
     if not stage:
         raise HTTPException(status_code=404, detail="Stage not found")
     
-    db.delete(stage)
-    db.commit()
-    
-    return {"message": "Stage deleted successfully"}
-
-
-@router.patch("/flows/{flow_id}/stages/reorder")
-async def reorder_stages(
-    flow_id: str,
-    stage_order: List[str],
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Reorder stages in a flow"""
-    company = CompanyService.get_company_by_user_id(db, str(current_user.id))
-    
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
-    # Verify flow belongs to user's company
-    flow_uuid = uuid.UUID(flow_id)
-    flow = db.query(OnboardingFlow).filter(
-        OnboardingFlow.id == flow_uuid,
-        OnboardingFlow.company_id == company.id
-    ).first()
-    
-    if not flow:
-        raise HTTPException(status_code=404, detail="Flow not found")
-    
-    result = FlowService.reorder_stages(db, flow_id, stage_order)
-    
-    if not result["success"]:
-        raise HTTPException(status_code=400, detail=result["error"])
+    job = DeletionService.schedule_stage_deletion(db, stage, tenant.company_id)
+    background_tasks.add_task(DeletionService.run_job, job.id)
     
-    return {"message": "Stages reordered successfully"} 
\ No newline at end of file
+    return {"message": "Stage deleted successfully", "deletion_job_id": str(job.id)}
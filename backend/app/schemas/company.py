@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 from pydantic import BaseModel, field_validator
 from datetime import datetime
 import uuid
@@ -29,6 +29,7 @@ class CompanyUpdate(BaseModel):
 class CompanyResponse(CompanyBase):
     id: str
     logo_url: Optional[str] = None
+    logo_variants: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: datetime
     
@@ -54,8 +54,11 @@ class ContentBlockBase(BaseModel):
     order_index: int
 
 class ContentBlockResponse(ContentBlockBase):
+    # The 1-based position, as accepted by create and reorder, not the stored sort key
+    order_index: int = Field(validation_alias="position", description="1-based position in the stage")
     id: str
     stage_id: str
+    media_variants: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: datetime
     
@@ -74,7 +77,7 @@ class ContentBlockCreate(BaseModel):
     type: str = Field(..., description="Content type identifier")
     config: Dict[str, Any]
     content: Dict[str, Any]
-    order_index: Optional[int] = None
+    order_index: Optional[int] = Field(None, description="Position to insert at (1-based); appended when omitted", ge=1)
 
     @root_validator(pre=True)
     @classmethod
@@ -163,6 +166,13 @@ class ContentBlockReorder(BaseModel):
     )
 
 
+class ContentBlockMove(BaseModel):
+    after_id: Optional[str] = Field(
+        default=None,
+        description="Content block to place it after; null moves it to the start"
+    )
+
+
 class ContentValidationRequest(BaseModel):
     type: str
     config: Dict[str, Any]
@@ -0,0 +1,29 @@
+from typing import Optional
+from pydantic import BaseModel, field_validator
+from datetime import datetime
+import uuid
+
+
+class DeletionJobResponse(BaseModel):
+    id: str
+    entity_type: str
+    entity_id: str
+    status: str
+    step: Optional[str] = None
+    deleted_rows: int = 0
+    total_rows: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    @field_validator('id', 'entity_id', mode='before')
+    @classmethod
+    def convert_uuid_to_string(cls, v):
+        if isinstance(v, uuid.UUID):
+            return str(v)
+        return v
+    
+    class Config:
+        from_attributes = True
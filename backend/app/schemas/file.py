@@ -0,0 +1,42 @@
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class SignedUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int = Field(..., gt=0, description="Exact size of the file in bytes")
+    sha256: Optional[str] = Field(None, description="Hex or base64 SHA-256; enables direct uploads to S3")
+
+
+class SignedUploadResponse(BaseModel):
+    upload_url: str
+    method: str
+    headers: Dict[str, str]
+    upload_token: str  # pass to .../complete, or the one returned by the upload_url
+    expires_at: datetime
+
+
+class SignedUploadComplete(BaseModel):
+    upload_token: str
+
+
+class SignedDownloadResponse(BaseModel):
+    download_url: str
+    expires_at: datetime
+
+
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int = Field(..., gt=0, description="Total size of the file in bytes")
+    sha256: Optional[str] = Field(None, description="Hex SHA-256, checked when the upload is finalized")
+
+
+class ResumableUploadStatus(BaseModel):
+    upload_id: str
+    offset: int  # bytes received; send the next chunk from here
+    size: int
+    chunk_size: int  # largest chunk accepted per PATCH
+    expires_at: datetime
@@ -11,6 +11,7 @@ class ContentBlockProgress(BaseModel):
     config: Dict[str, Any]
     content: Dict[str, Any]
     order_index: int
+    media_variants: Optional[Dict[str, Any]] = None
     status: str  # pending, in_progress, completed
     data: Optional[Dict[str, Any]] = None
     started_at: Optional[datetime] = None
@@ -57,6 +58,7 @@ class OnboardingSession(BaseModel):
     flow_name: str
     company_name: str
     company_logo_url: Optional[str] = None
+    company_logo_variants: Optional[Dict[str, Any]] = None
     new_hire_name: str
     new_hire_email: str
     status: str  # pending, active, completed
@@ -21,6 +21,10 @@ class StageUpdate(BaseModel):
     status: Optional[str] = None
 
 
+class StageMove(BaseModel):
+    after_id: Optional[str] = None  # stage to place it after; None moves it to the start
+
+
 class StageResponse(StageBase):
     id: str
     flow_id: str
@@ -4,9 +4,10 @@ from pydantic import BaseModel
 class FileRef(BaseModel):
     """Represents an uploaded file reference"""
     file_url: str
-    file_type: str
-    file_size: int
+    file_type: str  # replaced by the stored file's type for uploads
+    file_size: int  # replaced by the stored file's size for uploads
     file_name: Optional[str] = None
+    file_id: Optional[str] = None  # from the upload response
 
 class UserInputBase(BaseModel):
     """Base model for all user input types"""
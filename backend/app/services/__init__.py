@@ -1 +1 @@
-from . import content_type_service, content_service, stage_template_service, onboarding_service, company_service, flow_service, new_hire_service 
\ No newline at end of file
+from . import content_type_service, content_service, stage_template_service, onboarding_service, company_service, flow_service, new_hire_service, seed_service, deletion_service
\ No newline at end of file
@@ -6,16 +6,20 @@ from app.models.company import Company
 from app.models.user import User
 from app.models.onboarding_flow import OnboardingFlow
 from app.models.new_hire import NewHire
-from app.storage.factory import get_storage
-from app.auth.jwt import get_password_hash
+from app.storage.base import UploadRejected, safe_filename
+from app.services.file_service import FileService, OWNER_COMPANY_LOGO, OWNER_LOGO_VARIANT
+from app.auth.hashing import hash_password_async
 
 
 class CompanyService:
     """Service for managing companies and related operations"""
     
     @staticmethod
-    def create_company(db: Session, company_data: dict, admin_data: dict) -> Dict[str, Any]:
+    async def create_company(db: Session, company_data: dict, admin_data: dict) -> Dict[str, Any]:
         """Create a new company with an admin user"""
+        # PasswordHashingBusy propagates so callers can answer 503
+        password_hash = await hash_password_async(admin_data["password"])
+        
         try:
             # Create company
             company = Company(
@@ -37,7 +41,7 @@ class CompanyService:
                 email=admin_data["email"],
                 first_name=admin_data["first_name"],
                 last_name=admin_data["last_name"],
-                password_hash=get_password_hash(admin_data["password"]),
+                password_hash=password_hash,
                 role="admin"
             )
             db.add(admin_user)
@@ -79,7 +83,7 @@ class CompanyService:
             return {"success": False, "error": str(e)}
     
     @staticmethod
-    def upload_logo(db: Session, company_id: str, file) -> Dict[str, Any]:
+    async def upload_logo(db: Session, company_id: str, file) -> Dict[str, Any]:
         """Upload company logo"""
         try:
             company_uuid = uuid.UUID(company_id)
@@ -88,26 +92,52 @@ class CompanyService:
             if not company:
                 return {"success": False, "error": "Company not found"}
             
-            # Get storage service
-            storage = get_storage()
-            
-            # Generate file path
-            file_path = f"companies/{company_id}/logo/{file.filename}"
-            
-            # Upload file
-            file_url = storage.upload_file(file, file_path)
-            
-            # Update company logo URL
-            company.logo_url = file_url
-            company.updated_at = datetime.utcnow()
-            
-            db.commit()
-            
-            return {
-                "success": True,
-                "logo_url": file_url
-            }
+            # Store by content hash; size and type limits raise UploadRejected
+            stored = await FileService.store_upload(
+                db, file, OWNER_COMPANY_LOGO, company.id, company.id,
+                replace=True, filename=safe_filename(file.filename)
+            )
+            return CompanyService._set_logo(db, company, stored["file_url"])
             
+        except UploadRejected:
+            raise
+        except Exception as e:
+            db.rollback()
+            return {"success": False, "error": f"Logo upload failed: {str(e)}"}
+    
+    @staticmethod
+    def _set_logo(db: Session, company: Company, file_url: str) -> Dict[str, Any]:
+        # Variants of the previous logo are dropped; new ones are rendered in the background
+        company.logo_url = file_url
+        company.logo_variants = None
+        FileService.drop_references(db, OWNER_LOGO_VARIANT, company.id)
+        company.updated_at = datetime.utcnow()
+        
+        db.commit()
+        
+        return {
+            "success": True,
+            "logo_url": file_url
+        }
+    
+    @staticmethod
+    def create_logo_upload(company: Company, upload) -> Dict[str, Any]:
+        """Signed URL for uploading a logo without streaming it through the API"""
+        return FileService.create_signed_upload(
+            OWNER_COMPANY_LOGO, company.id, company.id,
+            safe_filename(upload.filename), upload.content_type, upload.size, upload.sha256
+        )
+    
+    @staticmethod
+    async def complete_logo_upload(db: Session, company: Company, upload_token: str) -> Dict[str, Any]:
+        """Make a logo uploaded through a signed URL the company logo"""
+        try:
+            stored = await FileService.complete_signed_upload(
+                db, upload_token, OWNER_COMPANY_LOGO, company.id, replace=True
+            )
+            if not stored["success"]:
+                return stored
+            return CompanyService._set_logo(db, company, stored["file_url"])
         except Exception as e:
             db.rollback()
             return {"success": False, "error": f"Logo upload failed: {str(e)}"}
@@ -5,6 +5,8 @@ from app.models.content_block import ContentBlock
 from app.models.stage import Stage
 from app.models.content_type import ContentType
 from app.services.content_type_service import ContentTypeService
+from app.services.file_service import FileService, OWNER_MEDIA_VARIANT
+from app.services.ordering_service import OrderingService
 
 
 class ContentService:
@@ -19,22 +21,19 @@ class ContentService:
         content: Dict[str, Any],
         order_index: Optional[int] = None
     ) -> ContentBlock:
-        """Create a new content block"""
+        """Create a new content block.
+        
+        order_index is the 1-based position to insert at, as in
+        reorder_content_blocks; the block is appended when it is omitted or
+        past the end.
+        """
         # Verify content type exists
         content_type = ContentTypeService.get_content_type_by_name(db, content_type_name)
         if not content_type:
             raise ValueError(f"Content type '{content_type_name}' not found")
         
         stage_uuid = uuid.UUID(stage_id)
-        
-        # Get next order index if not provided
-        if order_index is None:
-            max_order = db.query(ContentBlock).filter(
-                ContentBlock.stage_id == stage_uuid
-            ).with_entities(
-                db.func.max(ContentBlock.order_index)
-            ).scalar() or 0
-            order_index = max_order + 1
+        scope = ContentBlock.stage_id == stage_uuid
         
         if hasattr(config, 'dict'):
             config = config.dict()
@@ -46,21 +45,48 @@ class ContentService:
             type=content_type_name,
             config=config,
             content=content,
-            order_index=order_index
+            order_index=OrderingService.next_key(db, ContentBlock.order_index, scope)
         )
-        
         db.add(content_block)
+        
+        if order_index is not None:
+            db.flush()
+            order = [
+                block_uuid
+                for block_uuid in OrderingService.current_order(db, ContentBlock, ContentBlock.order_index, scope)
+                if block_uuid != content_block.id
+            ]
+            if order_index <= len(order):
+                order.insert(max(order_index, 1) - 1, content_block.id)
+                OrderingService.apply_order(db, ContentBlock, ContentBlock.order_index, scope, order)
+        
         db.commit()
         db.refresh(content_block)
-        return content_block
+        return ContentService.with_position(db, content_block)
     
     @staticmethod
     def get_content_blocks_by_stage(db: Session, stage_id: str) -> List[ContentBlock]:
-        """Get all content blocks for a stage, ordered by order_index"""
+        """Get all content blocks for a stage in order, with their positions set"""
         stage_uuid = uuid.UUID(stage_id)
-        return db.query(ContentBlock).filter(
+        content_blocks = db.query(ContentBlock).filter(
             ContentBlock.stage_id == stage_uuid
-        ).order_by(ContentBlock.order_index).all()
+        ).order_by(ContentBlock.order_index, ContentBlock.id).all()
+        for position, content_block in enumerate(content_blocks, 1):
+            content_block.position = position
+        return content_blocks
+    
+    @staticmethod
+    def with_position(db: Session, content_block: ContentBlock) -> ContentBlock:
+        """Set content_block.position, its 1-based place in the stage"""
+        content_block.position = OrderingService.position(
+            db,
+            ContentBlock,
+            ContentBlock.order_index,
+            ContentBlock.stage_id == content_block.stage_id,
+            content_block.order_index,
+            content_block.id
+        )
+        return content_block
     
     @staticmethod
     def get_content_block(db: Session, content_block_id: str) -> Optional[ContentBlock]:
@@ -99,8 +125,13 @@ class ContentService:
             merged_config = _deep_merge(content_block.config or {}, config)
             content_block.config = merged_config
         if content is not None:
+            previous_file_url = (content_block.content or {}).get("file_url")
             merged_content = _deep_merge(content_block.content or {}, content)
             content_block.content = merged_content
+            if merged_content.get("file_url") != previous_file_url:
+                # Re-rendered by the caller's background task
+                content_block.media_variants = None
+                FileService.drop_references(db, OWNER_MEDIA_VARIANT, content_block.id)
 
         # Validate merged result against content type rules before saving
         if config is not None or content is not None:
@@ -119,7 +150,7 @@ class ContentService:
         
         db.commit()
         db.refresh(content_block)
-        return content_block
+        return ContentService.with_position(db, content_block)
     
     @staticmethod
     def delete_content_block(db: Session, content_block_id: str) -> bool:
@@ -128,6 +159,7 @@ class ContentService:
         if not content_block:
             return False
         
+        FileService.drop_references(db, OWNER_MEDIA_VARIANT, content_block.id)
         db.delete(content_block)
         db.commit()
         return True
@@ -138,10 +170,14 @@ class ContentService:
         stage_id: str,
         content_block_orders: List[Dict[str, Any]]
     ) -> List[ContentBlock]:
-        """Reorder content blocks within a stage"""
+        """Reorder content blocks within a stage in a single UPDATE"""
         # content_block_orders should be: [{"id": "uuid", "order_index": 1}, ...]
+        # order_index is the 1-based position; blocks not listed keep their
+        # relative order in the remaining positions
         stage_uuid = uuid.UUID(stage_id)
+        scope = ContentBlock.stage_id == stage_uuid
         
+        positions = {}
         for item in content_block_orders:
             # Handle both dict and Pydantic model
             if hasattr(item, 'id') and hasattr(item, 'order_index'):
@@ -152,22 +188,46 @@ class ContentService:
                 # Dict format
                 block_id = item["id"]
                 order_index = item["order_index"]
-            
-            # Convert string ID to UUID for database query
-            block_uuid = uuid.UUID(block_id)
-            content_block = db.query(ContentBlock).filter(
-                ContentBlock.id == block_uuid,
-                ContentBlock.stage_id == stage_uuid
-            ).first()
-            
-            if content_block:
-                content_block.order_index = order_index
+            positions[uuid.UUID(block_id)] = order_index
         
+        # One SELECT for the current order, then one UPDATE ... CASE
+        current = OrderingService.current_order(db, ContentBlock, ContentBlock.order_index, scope)
+        order = [block_uuid for block_uuid in current if block_uuid not in positions]
+        listed = sorted((positions[block_uuid], block_uuid) for block_uuid in current if block_uuid in positions)
+        for order_index, block_uuid in listed:
+            order.insert(min(order_index, len(order) + 1) - 1, block_uuid)
+        
+        OrderingService.apply_order(db, ContentBlock, ContentBlock.order_index, scope, order)
         db.commit()
         
         # Return updated content blocks
         return ContentService.get_content_blocks_by_stage(db, stage_id)
     
+    @staticmethod
+    def move_content_block(
+        db: Session,
+        stage_id: str,
+        content_block_id: str,
+        after_id: Optional[str] = None
+    ) -> Optional[ContentBlock]:
+        """Move a content block right after another one (first when after_id is None)"""
+        stage_uuid = uuid.UUID(stage_id)
+        block_uuid = uuid.UUID(content_block_id)
+        order_index = OrderingService.move(
+            db,
+            ContentBlock,
+            ContentBlock.order_index,
+            ContentBlock.stage_id == stage_uuid,
+            block_uuid,
+            uuid.UUID(after_id) if after_id else None
+        )
+        if order_index is None:
+            return None
+        
+        db.commit()
+        content_block = ContentService.get_content_block(db, content_block_id)
+        return ContentService.with_position(db, content_block)
+    
     @staticmethod
     def validate_content_block(
         db: Session,
@@ -1,4 +1,5 @@
 from typing import List, Optional, Dict, Any
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from app.models.content_type import ContentType
 
@@ -7,8 +8,8 @@ class ContentTypeService:
     """Service for managing content types"""
     
     @staticmethod
-    def seed_content_types(db: Session) -> List[ContentType]:
-        """Seed the database with default content types"""
+    def get_seed_data() -> List[Dict[str, Any]]:
+        """Default content type catalog"""
         content_types_data = [
             {
                 "name": "header",
@@ -541,18 +542,28 @@ class ContentTypeService:
                 }
             }
         ]
+        return content_types_data
+    
+    @staticmethod
+    def seed_content_types(db: Session, seed_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+        """Bulk upsert the default content types by name (does not commit)"""
+        seed_data = seed_data if seed_data is not None else ContentTypeService.get_seed_data()
+        
+        # One query for every existing name instead of one per seed row
+        existing = dict(db.query(ContentType.name, ContentType.id).all())
+        
+        to_insert = [data for data in seed_data if data["name"] not in existing]
+        to_update = [
+            {"id": existing[data["name"]], **data}
+            for data in seed_data if data["name"] in existing
+        ]
         
-        created_types = []
-        for data in content_types_data:
-            # Check if content type already exists
-            existing = db.query(ContentType).filter(ContentType.name == data["name"]).first()
-            if not existing:
-                content_type = ContentType(**data)
-                db.add(content_type)
-                created_types.append(content_type)
+        if to_insert:
+            db.execute(insert(ContentType), to_insert)
+        if to_update:
+            db.execute(update(ContentType), to_update)
         
-        db.commit()
-        return created_types
+        return {"created": len(to_insert), "updated": len(to_update)}
     
     @staticmethod
     def get_all_content_types(db: Session, active_only: bool = True) -> List[ContentType]:
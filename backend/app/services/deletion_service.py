@@ -0,0 +1,272 @@
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import select, delete, update, func, or_, and_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import asyncio
+import uuid
+from app.config import settings
+from app.database import SessionLocal
+from app.models.deletion_job import DeletionJob
+from app.models.onboarding_flow import OnboardingFlow
+from app.models.stage import Stage
+from app.models.content_block import ContentBlock
+from app.models.new_hire import NewHire
+from app.models.progress import Progress
+from app.models.file_blob import FileReference
+from app.models.resumable_upload import ResumableUpload
+from app.services.file_service import FileService, OWNER_MEDIA_VARIANT, OWNER_ONBOARDING_UPLOAD
+
+# Statements issued by deletion jobs must see soft-deleted rows
+INCLUDE_DELETED = {"include_deleted": True}
+
+
+class DeletionService:
+    """Soft-delete entities in the request and remove their rows in chunked background jobs"""
+    
+    @staticmethod
+    def schedule_flow_deletion(db: Session, flow: OnboardingFlow) -> DeletionJob:
+        """Hide a flow with its stages and new hires, and queue the cascade"""
+        now = datetime.utcnow()
+        flow.deleted_at = now
+        # Two set-based UPDATEs so nothing from the flow stays visible while the job runs
+        db.execute(
+            update(Stage).where(Stage.flow_id == flow.id, Stage.deleted_at.is_(None))
+            .values(deleted_at=now).execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(NewHire).where(NewHire.flow_id == flow.id, NewHire.deleted_at.is_(None))
+            .values(deleted_at=now).execution_options(synchronize_session=False)
+        )
+        return DeletionService._create_job(db, flow.company_id, "flow", flow.id)
+    
+    @staticmethod
+    def schedule_stage_deletion(db: Session, stage: Stage, company_id) -> DeletionJob:
+        """Hide a stage and queue deletion of its blocks and progress"""
+        stage.deleted_at = datetime.utcnow()
+        return DeletionService._create_job(db, company_id, "stage", stage.id)
+    
+    @staticmethod
+    def schedule_new_hire_deletion(db: Session, new_hire: NewHire) -> DeletionJob:
+        """Hide a new hire and queue deletion of their progress"""
+        new_hire.deleted_at = datetime.utcnow()
+        return DeletionService._create_job(db, new_hire.company_id, "new_hire", new_hire.id)
+    
+    @staticmethod
+    def _create_job(db: Session, company_id, entity_type: str, entity_id) -> DeletionJob:
+        job = DeletionJob(
+            company_id=company_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            status="pending",
+            deleted_rows=0,
+            total_rows=0
+        )
+        db.add(job)
+        db.commit()
+        return job
+    
+    @staticmethod
+    def get_job(db: Session, job_id: str, company_id) -> Optional[DeletionJob]:
+        """Get a deletion job owned by a company"""
+        try:
+            job_uuid = uuid.UUID(job_id)
+        except ValueError:
+            return None
+        return db.query(DeletionJob).filter(
+            DeletionJob.id == job_uuid,
+            DeletionJob.company_id == company_id
+        ).first()
+    
+    @staticmethod
+    def _cascade_steps(job: DeletionJob) -> List[Tuple[str, Any, Any]]:
+        """Ordered (step, model, condition) list; children before parents"""
+        entity_id = job.entity_id
+        if job.entity_type == "flow":
+            flow_stages = select(Stage.id).where(Stage.flow_id == entity_id)
+            flow_hires = select(NewHire.id).where(NewHire.flow_id == entity_id)
+            return [
+                ("progress", Progress, or_(
+                    Progress.stage_id.in_(flow_stages),
+                    Progress.new_hire_id.in_(flow_hires)
+                )),
+                ("file_references", FileReference, and_(
+                    FileReference.owner_type == OWNER_ONBOARDING_UPLOAD,
+                    FileReference.owner_id.in_(flow_hires)
+                )),
+                ("resumable_uploads", ResumableUpload, and_(
+                    ResumableUpload.owner_type == OWNER_ONBOARDING_UPLOAD,
+                    ResumableUpload.owner_id.in_(flow_hires)
+                )),
+                ("media_variants", FileReference, and_(
+                    FileReference.owner_type == OWNER_MEDIA_VARIANT,
+                    FileReference.owner_id.in_(
+                        select(ContentBlock.id).where(ContentBlock.stage_id.in_(flow_stages))
+                    )
+                )),
+                ("content_blocks", ContentBlock, ContentBlock.stage_id.in_(flow_stages)),
+                ("stages", Stage, Stage.flow_id == entity_id),
+                ("new_hires", NewHire, NewHire.flow_id == entity_id),
+                ("flow", OnboardingFlow, OnboardingFlow.id == entity_id),
+            ]
+        if job.entity_type == "stage":
+            return [
+                ("progress", Progress, Progress.stage_id == entity_id),
+                ("media_variants", FileReference, and_(
+                    FileReference.owner_type == OWNER_MEDIA_VARIANT,
+                    FileReference.owner_id.in_(
+                        select(ContentBlock.id).where(ContentBlock.stage_id == entity_id)
+                    )
+                )),
+                ("content_blocks", ContentBlock, ContentBlock.stage_id == entity_id),
+                ("stage", Stage, Stage.id == entity_id),
+            ]
+        if job.entity_type == "new_hire":
+            return [
+                ("progress", Progress, Progress.new_hire_id == entity_id),
+                ("file_references", FileReference, and_(
+                    FileReference.owner_type == OWNER_ONBOARDING_UPLOAD,
+                    FileReference.owner_id == entity_id
+                )),
+                ("resumable_uploads", ResumableUpload, and_(
+                    ResumableUpload.owner_type == OWNER_ONBOARDING_UPLOAD,
+                    ResumableUpload.owner_id == entity_id
+                )),
+                ("new_hire", NewHire, NewHire.id == entity_id),
+            ]
+        raise ValueError(f"Unsupported deletion entity type: {job.entity_type}")
+    
+    @staticmethod
+    def _claim_job(db: Session, job_id) -> bool:
+        """Take the job unless another worker holds a live lease on it"""
+        now = datetime.utcnow()
+        lease_expired = now - timedelta(seconds=settings.deletion_job_lease_seconds)
+        claimed = db.execute(
+            update(DeletionJob)
+            .where(
+                DeletionJob.id == job_id,
+                or_(
+                    DeletionJob.status == "pending",
+                    and_(DeletionJob.status == "running", DeletionJob.updated_at < lease_expired)
+                )
+            )
+            .values(status="running", updated_at=now, attempts=DeletionJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.commit()
+        return claimed
+    
+    @staticmethod
+    def run_job(job_id) -> Dict[str, Any]:
+        """Run (or resume) a deletion job to completion in its own session.
+        
+        Each chunk is a bounded SELECT of ids plus a DELETE by primary key,
+        committed on its own so write locks are held briefly. Steps are
+        idempotent, so a job interrupted mid-way resumes from its stored step.
+        """
+        job_uuid = job_id if isinstance(job_id, uuid.UUID) else uuid.UUID(str(job_id))
+        db = SessionLocal()
+        try:
+            if not DeletionService._claim_job(db, job_uuid):
+                return {"success": False, "error": "Job is not runnable or is held by another worker"}
+            
+            job = db.get(DeletionJob, job_uuid)
+            steps = DeletionService._cascade_steps(job)
+            step_names = [name for name, _, _ in steps]
+            start = step_names.index(job.step) if job.step in step_names else 0
+            
+            if not job.total_rows:
+                job.total_rows = sum(
+                    db.execute(
+                        select(func.count()).select_from(model).where(condition),
+                        execution_options=INCLUDE_DELETED
+                    ).scalar() or 0
+                    for _, model, condition in steps[start:]
+                ) + (job.deleted_rows or 0)
+                db.commit()
+            
+            chunk_size = max(1, settings.deletion_chunk_size)
+            for name, model, condition in steps[start:]:
+                job.step = name
+                db.commit()
+                while True:
+                    ids = db.execute(
+                        select(model.id).where(condition).limit(chunk_size),
+                        execution_options=INCLUDE_DELETED
+                    ).scalars().all()
+                    if not ids:
+                        break
+                    
+                    if model is ResumableUpload:
+                        # Stored chunks go first, so a retried step finds them again
+                        asyncio.run(DeletionService._delete_upload_parts(ids))
+                    db.execute(
+                        delete(model).where(model.id.in_(ids)),
+                        execution_options={**INCLUDE_DELETED, "synchronize_session": False}
+                    )
+                    job.deleted_rows = (job.deleted_rows or 0) + len(ids)
+                    job.updated_at = datetime.utcnow()  # heartbeat for the lease
+                    db.commit()
+            
+            job.status = "completed"
+            job.step = None
+            job.completed_at = datetime.utcnow()
+            db.commit()
+            return {"success": True, "deleted_rows": job.deleted_rows}
+        
+        except Exception as e:
+            db.rollback()
+            failed = db.get(DeletionJob, job_uuid)
+            if failed:
+                failed.status = "failed"
+                failed.error = str(e)
+                db.commit()
+            print(f"⚠️  Deletion job {job_uuid} failed: {e}")
+            return {"success": False, "error": str(e)}
+        finally:
+            db.close()
+    
+    @staticmethod
+    async def _delete_upload_parts(upload_ids) -> None:
+        for upload_id in upload_ids:
+            await FileService._delete_parts(upload_id)
+    
+    @staticmethod
+    def resume_pending_jobs(retry_failed: bool = False) -> int:
+        """Run every pending or abandoned job; returns how many completed.
+        
+        Failed jobs are retried while they have fewer than
+        DELETION_JOB_MAX_ATTEMPTS runs; retry_failed retries all of them and
+        resets their attempt count.
+        """
+        db = SessionLocal()
+        try:
+            lease_expired = datetime.utcnow() - timedelta(seconds=settings.deletion_job_lease_seconds)
+            failed = update(DeletionJob).where(DeletionJob.status == "failed")
+            if retry_failed:
+                failed = failed.values(status="pending", attempts=0)
+            else:
+                failed = failed.where(DeletionJob.attempts < settings.deletion_job_max_attempts).values(status="pending")
+            db.execute(failed.execution_options(synchronize_session=False))
+            db.commit()
+            
+            stuck = db.query(func.count(DeletionJob.id)).filter(DeletionJob.status == "failed").scalar()
+            if stuck:
+                print(f"⚠️  {stuck} deletion job(s) failed {settings.deletion_job_max_attempts} times; "
+                      f"retry with: python manage.py deletion-jobs --retry-failed")
+            
+            job_ids = [
+                job_id for (job_id,) in db.query(DeletionJob.id).filter(
+                    or_(
+                        DeletionJob.status == "pending",
+                        and_(DeletionJob.status == "running", DeletionJob.updated_at < lease_expired)
+                    )
+                ).order_by(DeletionJob.created_at).all()
+            ]
+        finally:
+            db.close()
+        
+        completed = 0
+        for job_id in job_ids:
+            if DeletionService.run_job(job_id).get("success"):
+                completed += 1
+        return completed
@@ -0,0 +1,264 @@
+"""
+Incremental garbage collection of stored files.
+
+FileService.collect_garbage only sees blobs recorded in file_blobs. Storage
+also holds files nothing records: name-addressed uploads from before blobs
+existed whose logo, block or new hire is gone, blobs of signed uploads that
+were never completed, and leftovers of interrupted uploads. And an
+onboarding upload stays referenced even when no answer uses it any more.
+
+Each run examines at most FILE_GC_MAX_KEYS storage keys and upload
+references, in pages, starting where the previous run stopped (cursors in
+app_metadata), so memory and run time stay bounded however large storage
+grows; a full pass over storage may take several runs.
+"""
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import Text, cast, delete, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import re
+import time
+import uuid
+from app.config import settings
+from app.models.app_metadata import AppMetadata
+from app.models.company import Company
+from app.models.content_block import ContentBlock
+from app.models.file_blob import FileBlob, FileReference
+from app.models.progress import Progress
+from app.models.resumable_upload import ResumableUpload
+from app.services.file_service import FileService, OWNER_ONBOARDING_UPLOAD, RESUMABLE_PREFIX
+from app.services.inspection_service import file_entries
+from app.storage.base import StoredFile
+from app.storage.factory import get_storage
+
+STORAGE_CURSOR_KEY = "files_gc_storage_cursor"
+REFERENCE_CURSOR_KEY = "files_gc_reference_cursor"
+PAGE_SIZE = 500
+
+INCLUDE_DELETED = {"include_deleted": True}
+
+
+def _normalize_url(url: str) -> str:
+    """A file URL without its query (signatures) or fragment"""
+    return url.split("#", 1)[0].split("?", 1)[0]
+
+
+class FileGCService:
+    """Finds and deletes stored files nothing refers to, a page at a time"""
+
+    @staticmethod
+    def _get_cursor(db: Session, key: str) -> str:
+        row = db.get(AppMetadata, key)
+        return row.value if row else ""
+
+    @staticmethod
+    def _set_cursor(db: Session, key: str, value: str) -> None:
+        row = db.get(AppMetadata, key)
+        if row:
+            row.value = value
+        else:
+            db.add(AppMetadata(key=key, value=value))
+        db.commit()
+
+    @staticmethod
+    async def run(
+        db: Session,
+        grace_seconds: Optional[int] = None,
+        max_keys: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """One files-gc run: stale upload references, unreferenced blobs, then a slice of storage"""
+        max_keys = settings.file_gc_max_keys if max_keys is None else max_keys
+        references = FileGCService.drop_abandoned_uploads(db, max_keys)
+        blobs = await FileService.collect_garbage(db, grace_seconds)
+        sweep = await FileGCService.sweep_storage(db, grace_seconds, max_keys)
+        return {
+            "success": True,
+            "dropped_references": references["dropped_references"],
+            "deleted_blobs": blobs["deleted_blobs"],
+            "expired_uploads": blobs["expired_uploads"],
+            "deleted_files": sweep["deleted_files"],
+            "scanned_keys": sweep["scanned_keys"],
+            "pass_complete": sweep["pass_complete"],
+            "reclaimed_bytes": blobs["reclaimed_bytes"] + sweep["reclaimed_bytes"],
+        }
+
+    @staticmethod
+    def drop_abandoned_uploads(db: Session, max_references: int) -> Dict[str, Any]:
+        """Drop onboarding upload references that no answer of their new hire uses.
+
+        An answer uses an upload when one of its files (file_entries) names
+        it by file_id or by its URL, ignoring any query string.
+
+        Only references older than FILE_GC_UPLOAD_GRACE_SECONDS are examined,
+        so an upload not submitted yet is left alone; the blob itself goes
+        with the next collect_garbage once nothing else references it.
+        """
+        storage = get_storage()
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.file_gc_upload_grace_seconds)
+        cursor = FileGCService._get_cursor(db, REFERENCE_CURSOR_KEY)
+        examined = 0
+        dropped = 0
+
+        while examined < max_references:
+            limit = min(PAGE_SIZE, max_references - examined)
+            query = select(FileReference.id, FileReference.owner_id, FileBlob.storage_path).join(
+                FileBlob, FileBlob.digest == FileReference.blob_digest
+            ).where(
+                FileReference.owner_type == OWNER_ONBOARDING_UPLOAD,
+                FileReference.created_at < cutoff
+            ).order_by(FileReference.id).limit(limit)
+            if cursor:
+                query = query.where(FileReference.id > uuid.UUID(cursor))
+            rows = db.execute(query).all()
+            examined += len(rows)
+
+            # The file ids and URLs each new hire's answers use
+            used: Dict[Any, Set[str]] = {}
+            owner_ids = {owner_id for _, owner_id, _ in rows}
+            if owner_ids:
+                for new_hire_id, data in db.execute(
+                    select(Progress.new_hire_id, Progress.data)
+                    .where(Progress.new_hire_id.in_(owner_ids))
+                    .execution_options(**INCLUDE_DELETED)
+                ):
+                    values = used.setdefault(new_hire_id, set())
+                    for entry in file_entries(data):
+                        if entry.get("file_id") is not None:
+                            values.add(str(entry["file_id"]))
+                        if isinstance(entry.get("file_url"), str):
+                            values.add(_normalize_url(entry["file_url"]))
+
+            unused = [
+                reference_id for reference_id, owner_id, path in rows
+                if str(reference_id) not in used.get(owner_id, set())
+                and _normalize_url(storage.get_file_url(path)) not in used.get(owner_id, set())
+            ]
+            if unused:
+                dropped += db.execute(
+                    delete(FileReference)
+                    .where(FileReference.id.in_(unused))
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+
+            if len(rows) < limit:
+                cursor = ""  # wrap around next run
+                break
+            cursor = str(rows[-1][0])
+            FileGCService._set_cursor(db, REFERENCE_CURSOR_KEY, cursor)
+
+        FileGCService._set_cursor(db, REFERENCE_CURSOR_KEY, cursor)
+        return {"success": True, "examined_references": examined, "dropped_references": dropped}
+
+    @staticmethod
+    async def sweep_storage(
+        db: Session,
+        grace_seconds: Optional[int] = None,
+        max_keys: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Delete stored files nothing refers to that are older than the grace period.
+
+        Pages through storage in key order from the saved cursor; the cursor
+        is saved after every page, so an interrupted run loses at most one.
+        """
+        grace_seconds = settings.file_gc_grace_seconds if grace_seconds is None else grace_seconds
+        max_keys = settings.file_gc_max_keys if max_keys is None else max_keys
+        cutoff = time.time() - grace_seconds
+        storage = get_storage()
+        cursor = FileGCService._get_cursor(db, STORAGE_CURSOR_KEY)
+        stats = {"scanned_keys": 0, "deleted_files": 0, "reclaimed_bytes": 0, "pass_complete": False}
+        referenced: Dict[str, Set[str]] = {}  # filled on the first page with named files
+
+        while stats["scanned_keys"] < max_keys:
+            limit = min(PAGE_SIZE, max_keys - stats["scanned_keys"])
+            page = await storage.scan_files(cursor, limit)
+            stats["scanned_keys"] += len(page)
+
+            old_files = [stored for stored in page if stored.modified_at < cutoff]
+            for stored in FileGCService._orphans(db, old_files, referenced):
+                if await storage.delete_file(stored.path):
+                    stats["deleted_files"] += 1
+                    stats["reclaimed_bytes"] += stored.size
+
+            if len(page) < limit:
+                cursor = ""
+                stats["pass_complete"] = True
+                break
+            cursor = page[-1].path
+            FileGCService._set_cursor(db, STORAGE_CURSOR_KEY, cursor)
+
+        FileGCService._set_cursor(db, STORAGE_CURSOR_KEY, cursor)
+        return {"success": True, **stats}
+
+    @staticmethod
+    def _orphans(db: Session, files: List[StoredFile], referenced: Dict[str, Set[str]]) -> List[StoredFile]:
+        """The files of one page that nothing refers to.
+
+        referenced caches the URLs in use for the whole run (key "urls").
+        """
+        orphans: List[StoredFile] = []
+        blobs: Dict[str, List[StoredFile]] = {}
+        uploads: Dict[uuid.UUID, List[StoredFile]] = {}
+        named: List[StoredFile] = []
+        for stored in files:
+            parts = stored.path.split("/")
+            if parts[-1].startswith(".upload-") or parts[0] == "tmp":
+                # Interrupted uploads: local temp files, S3 multipart staging keys
+                orphans.append(stored)
+            elif parts[0] == "blobs":
+                blobs.setdefault(parts[-1].split(".", 1)[0], []).append(stored)
+            elif stored.path.startswith(RESUMABLE_PREFIX):
+                try:
+                    uploads.setdefault(uuid.UUID(parts[1]), []).append(stored)
+                except (IndexError, ValueError):
+                    orphans.append(stored)
+            else:
+                named.append(stored)
+
+        if blobs:
+            # Recorded blobs are collect_garbage's; unrecorded ones were never completed
+            recorded = set(db.scalars(select(FileBlob.digest).where(FileBlob.digest.in_(blobs))))
+            orphans.extend(stored for digest, group in blobs.items() if digest not in recorded for stored in group)
+        if uploads:
+            active = set(db.scalars(select(ResumableUpload.id).where(ResumableUpload.id.in_(uploads))))
+            orphans.extend(stored for upload_id, group in uploads.items() if upload_id not in active for stored in group)
+        if named:
+            storage = get_storage()
+            if "urls" not in referenced:
+                referenced["urls"] = FileGCService._referenced_urls(db)
+            orphans.extend(
+                stored for stored in named
+                if _normalize_url(storage.get_file_url(stored.path)) not in referenced["urls"]
+            )
+        return orphans
+
+    @staticmethod
+    def _referenced_urls(db: Session) -> Set[str]:
+        """URLs of stored files, other than blobs, that a logo, a content block or an answer refers to.
+
+        Read once per run: content blocks and answers are scanned as raw JSON
+        text in keyset pages, so only one page and the (small) set of
+        name-addressed URLs in use are held at a time.
+        """
+        url_prefix = get_storage().get_file_url("")
+        blob_prefix = url_prefix + "blobs/"
+        found = {
+            _normalize_url(url) for url in db.scalars(
+                select(Company.logo_url).where(Company.logo_url.is_not(None)).execution_options(**INCLUDE_DELETED)
+            )
+        }
+        pattern = re.compile(re.escape(url_prefix) + r'[^"\s\\?#]+')
+
+        for model, column in ((ContentBlock, ContentBlock.content), (Progress, Progress.data)):
+            last_id = None
+            while True:
+                query = select(model.id, cast(column, Text)).order_by(model.id).limit(PAGE_SIZE)
+                if last_id is not None:
+                    query = query.where(model.id > last_id)
+                rows = db.execute(query.execution_options(**INCLUDE_DELETED)).all()
+                for _, text in rows:
+                    if text:
+                        found.update(url for url in pattern.findall(text) if not url.startswith(blob_prefix))
+                if len(rows) < PAGE_SIZE:
+                    break
+                last_id = rows[-1][0]
+        return found
@@ -0,0 +1,782 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import func, select, delete, exists, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import base64
+import binascii
+import dataclasses
+import json
+import mimetypes
+import time
+import uuid
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.models.company import Company
+from app.models.file_blob import FileBlob, FileReference
+from app.models.new_hire import NewHire
+from app.models.progress import Progress
+from app.models.resumable_upload import ResumableUpload
+from app.models.revoked_token import RevokedToken
+from app.storage.base import (
+    StorageError,
+    StoredBlob,
+    UploadNotAuthorized,
+    UploadRejected,
+    iter_chunks
+)
+from app.storage.factory import get_storage
+from app.storage.signed_urls import (
+    UploadClaims,
+    decode_upload_token,
+    expires_at,
+    issue_upload_token,
+    sign_download
+)
+from app.storage.validation import UploadValidator
+
+OWNER_COMPANY_LOGO = "company_logo"
+OWNER_ONBOARDING_UPLOAD = "onboarding_upload"
+OWNER_LOGO_VARIANT = "company_logo_variant"
+OWNER_MEDIA_VARIANT = "media_variant"
+# Blobs referenced as one of these may be served to anyone
+PUBLIC_OWNER_TYPES = (OWNER_COMPANY_LOGO, OWNER_LOGO_VARIANT, OWNER_MEDIA_VARIANT)
+# Chunks of unfinished resumable uploads; never served
+RESUMABLE_PREFIX = "resumable/"
+# Direct-to-storage signed uploads land here until completed; GC removes leftovers
+SIGNED_UPLOAD_PREFIX = "tmp/signed/"
+
+
+async def _iter_parts(storage, paths):
+    """The parts of a resumable upload as one stream, a chunk at a time"""
+    for path in paths:
+        source = await storage.download_file(path)
+        if source is None:
+            raise StorageError(f"Upload part {path} is missing")
+        try:
+            async for chunk in iter_chunks(source, settings.upload_chunk_size):
+                yield chunk
+        finally:
+            source.close()
+
+
+class FileService:
+    """Content-addressed files: one blob per distinct content, shared through references"""
+
+    @staticmethod
+    def _record_blob(db: Session, blob: StoredBlob) -> FileBlob:
+        """Insert the blob row, or refresh last_stored_at so GC leaves it alone"""
+        now = datetime.utcnow()
+        row = db.get(FileBlob, blob.digest)
+        if row is not None:
+            row.last_stored_at = now
+            return row
+        try:
+            with db.begin_nested():
+                row = FileBlob(
+                    digest=blob.digest,
+                    size=blob.size,
+                    content_type=blob.content_type,
+                    storage_path=blob.path,
+                    created_at=now,
+                    last_stored_at=now
+                )
+                db.add(row)
+        except IntegrityError:
+            # Stored concurrently by another request
+            row = db.get(FileBlob, blob.digest)
+            row.last_stored_at = now
+        return row
+
+    @staticmethod
+    def _touch_blob(digest: str) -> bool:
+        """Refresh a blob row's last_stored_at in a session of its own; False if there is no row"""
+        db = SessionLocal()
+        try:
+            touched = db.execute(
+                update(FileBlob)
+                .where(FileBlob.digest == digest)
+                .values(last_stored_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            return touched == 1
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _keep_stored_blob(digest: str) -> bool:
+        # Waits for a garbage collection holding the row; once the row is gone
+        # its file may be too, and the storage writes it again
+        return await run_in_threadpool(FileService._touch_blob, digest)
+
+    @staticmethod
+    async def store_blob(file, content_type: Optional[str] = None, **options) -> StoredBlob:
+        """get_storage().store_blob, rewriting a stored copy garbage collection may be removing"""
+        return await get_storage().store_blob(
+            file, content_type, reuse_existing=FileService._keep_stored_blob, **options
+        )
+
+    @staticmethod
+    def drop_references(db: Session, owner_type: str, owner_id) -> None:
+        """Remove an owner's references of one type; orphaned blobs are left to GC"""
+        db.execute(
+            delete(FileReference)
+            .where(FileReference.owner_type == owner_type, FileReference.owner_id == owner_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def store_upload(
+        db: Session,
+        file,
+        owner_type: str,
+        owner_id,
+        company_id,
+        replace: bool = False,
+        filename: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Store an upload as a blob and reference it from its owner.
+
+        With replace=True the owner's previous references of this type are
+        dropped (e.g. a new logo); their blobs are left to garbage collection.
+        UploadRejected propagates so routers can answer 413/415.
+        """
+        blob = await FileService.store_blob(file)
+        return FileService._reference_blob(
+            db, blob, owner_type, owner_id, company_id, replace, filename or getattr(file, "filename", None)
+        )
+
+    @staticmethod
+    def _reference_blob(
+        db: Session,
+        blob: StoredBlob,
+        owner_type: str,
+        owner_id,
+        company_id,
+        replace: bool,
+        filename: Optional[str]
+    ) -> Dict[str, Any]:
+        row = FileService._record_blob(db, blob)
+        if replace:
+            FileService.drop_references(db, owner_type, owner_id)
+        reference = FileReference(
+            blob_digest=blob.digest,
+            company_id=company_id,
+            owner_type=owner_type,
+            owner_id=owner_id,
+            filename=filename
+        )
+        db.add(reference)
+        db.commit()
+
+        if row.inspected_at is None:
+            # Imported here: the inspection service builds on this module
+            from app.services.inspection_service import inspection_queue
+            inspection_queue.enqueue(blob.digest)
+
+        return {
+            "success": True,
+            "reference": reference,
+            "blob": blob,
+            "file_url": get_storage().get_file_url(blob.path)
+        }
+
+    @staticmethod
+    def create_signed_upload(
+        owner_type: str,
+        owner_id,
+        company_id,
+        filename: Optional[str],
+        content_type: str,
+        size: int,
+        sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Authorize an upload that bypasses the API workers.
+
+        With a SHA-256 (hex or base64) and a backend that signs uploads
+        natively (S3) the client PUTs straight to a staging key of its own,
+        moved into the blob store on completion; otherwise it PUTs to the
+        /files/uploads storage endpoint. Either way it then completes with the
+        last upload_token it was given. Types and sizes the upload limits
+        refuse raise UploadRejected here already.
+        """
+        content_type = UploadValidator(content_type, declared_size=size).content_type
+        storage = get_storage()
+        expires = expires_at()
+        claims = UploadClaims(
+            owner_type=owner_type,
+            owner_id=str(owner_id),
+            company_id=str(company_id),
+            content_type=content_type,
+            size=size,
+            filename=filename,
+            expires_at=expires,
+            nonce=uuid.uuid4().hex
+        )
+
+        upload = None
+        if sha256:
+            try:
+                raw = bytes.fromhex(sha256) if len(sha256) == 64 else base64.b64decode(sha256, validate=True)
+            except (binascii.Error, ValueError):
+                raw = b""
+            if len(raw) != 32:
+                raise UploadRejected("sha256 must be a hex or base64 SHA-256 digest")
+            path = f"{SIGNED_UPLOAD_PREFIX}{claims.nonce}"
+            upload = storage.presign_upload(
+                path, content_type, size, base64.b64encode(raw).decode(), expires - int(time.time())
+            )
+            if upload is not None:
+                claims = dataclasses.replace(claims, digest=raw.hex(), path=path)
+
+        token = issue_upload_token(claims)
+        if upload is None:
+            upload = {
+                "url": f"/files/uploads/{token}",
+                "method": "PUT",
+                "headers": {"Content-Type": content_type},
+            }
+        return {
+            "success": True,
+            "upload_url": upload["url"],
+            "method": upload["method"],
+            "headers": upload["headers"],
+            "upload_token": token,
+            "expires_at": datetime.utcfromtimestamp(expires)
+        }
+
+    @staticmethod
+    async def receive_signed_upload(token: str, body) -> Dict[str, Any]:
+        """Store the body of a signed upload (the /files/uploads endpoint).
+
+        The token carries the owner and limits, and the returned upload_token
+        records the stored blob for completion. The only database access is
+        spending the token's nonce, in a session of its own before the body
+        is read, so a token stores at most one body.
+        """
+        claims = decode_upload_token(token)
+        if claims is None or claims.is_expired() or claims.stored or not claims.nonce:
+            raise UploadNotAuthorized("Invalid or expired upload URL")
+        if not await run_in_threadpool(FileService._spend_upload_nonce, claims):
+            raise UploadNotAuthorized("Upload URL has already been used")
+
+        storage = get_storage()
+        blob = await FileService.store_blob(
+            body, claims.content_type, allowed_types=[claims.content_type], max_size=claims.size
+        )
+        if blob.size != claims.size or (claims.digest and blob.digest != claims.digest):
+            if blob.created:
+                await storage.delete_file(blob.path)
+            raise UploadRejected("Upload does not match the signed size or checksum")
+
+        # A fresh nonce, spent when the receipt is completed
+        receipt = dataclasses.replace(
+            claims, digest=blob.digest, path=blob.path, stored=True, expires_at=expires_at(), nonce=uuid.uuid4().hex
+        )
+        return {"success": True, "upload_token": issue_upload_token(receipt), "size": blob.size}
+
+    @staticmethod
+    def _spend_upload_nonce(claims: UploadClaims, reason: str = "uploaded") -> bool:
+        """Record a signed upload's nonce; False if it was spent already"""
+        db = SessionLocal()
+        try:
+            db.add(RevokedToken(
+                token_id=claims.nonce,
+                kind="upload",
+                reason=reason,
+                revoked_at=datetime.utcnow(),
+                expires_at=datetime.utcfromtimestamp(claims.expires_at)
+            ))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    async def complete_signed_upload(
+        db: Session,
+        token: str,
+        owner_type: str,
+        owner_id,
+        replace: bool = False
+    ) -> Dict[str, Any]:
+        """Reference a blob uploaded through a signed URL from its owner.
+        
+        Each token completes once. A direct upload is checked against the
+        signed size and digest before it is moved from its staging key into
+        the blob store, so knowing a blob's hash does not grant access to it.
+        """
+        claims = decode_upload_token(token)
+        if (
+            claims is None or claims.is_expired() or not claims.owned_by(owner_type, owner_id)
+            or not claims.path or not claims.digest or not claims.nonce
+        ):
+            return {"success": False, "error": "Invalid or expired upload token"}
+
+        storage = get_storage()
+        if not claims.stored:
+            if not claims.path.startswith(SIGNED_UPLOAD_PREFIX):
+                return {"success": False, "error": "Invalid or expired upload token"}
+            size = await storage.file_size(claims.path)
+            if size is None:
+                return {"success": False, "error": "File has not been uploaded"}
+            if size != claims.size:
+                return {"success": False, "error": "Uploaded file does not match the signed size"}
+
+        if not await run_in_threadpool(FileService._spend_upload_nonce, claims, "completed"):
+            return {"success": False, "error": "Upload has already been completed"}
+
+        if claims.stored:
+            blob = StoredBlob(claims.digest, claims.size, claims.content_type, claims.path, False)
+        else:
+            try:
+                blob = await storage.promote_blob(
+                    claims.path, claims.digest, claims.content_type, claims.size, FileService._keep_stored_blob
+                )
+            except UploadRejected as e:
+                return {"success": False, "error": str(e)}
+            if blob is None:
+                return {"success": False, "error": "File has not been uploaded"}
+        return FileService._reference_blob(
+            db, blob, owner_type, owner_id, uuid.UUID(claims.company_id), replace, claims.filename
+        )
+
+    @staticmethod
+    def create_resumable_upload(
+        db: Session,
+        owner_type: str,
+        owner_id,
+        company_id,
+        filename: Optional[str],
+        content_type: str,
+        size: int,
+        sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Start an upload that is sent in chunks and can resume after a dropped connection.
+
+        Types and sizes the upload limits refuse raise UploadRejected here
+        already; an owner may have RESUMABLE_UPLOADS_PER_OWNER in progress.
+        """
+        content_type = UploadValidator(content_type, declared_size=size).content_type
+        if sha256 is not None:
+            try:
+                valid = len(bytes.fromhex(sha256)) == 32
+            except ValueError:
+                valid = False
+            if not valid:
+                raise UploadRejected("sha256 must be a hex SHA-256 digest")
+
+        now = datetime.utcnow()
+        in_progress = db.query(func.count(ResumableUpload.id)).filter(
+            ResumableUpload.owner_type == owner_type,
+            ResumableUpload.owner_id == owner_id,
+            ResumableUpload.expires_at > now
+        ).scalar()
+        if in_progress >= settings.resumable_uploads_per_owner:
+            return {"success": False, "error": "Too many uploads in progress"}
+
+        upload = ResumableUpload(
+            company_id=company_id,
+            owner_type=owner_type,
+            owner_id=owner_id,
+            filename=filename,
+            content_type=content_type,
+            size=size,
+            sha256=sha256.lower() if sha256 else None,
+            received=0,
+            parts=[],
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.resumable_upload_expire_seconds)
+        )
+        db.add(upload)
+        db.commit()
+        return {"success": True, "upload": upload}
+
+    @staticmethod
+    def get_resumable_upload(db: Session, upload_id: str, owner_type: str, owner_id) -> Optional[ResumableUpload]:
+        """One of an owner's unexpired resumable uploads"""
+        try:
+            upload_uuid = uuid.UUID(upload_id)
+        except ValueError:
+            return None
+        return db.query(ResumableUpload).filter(
+            ResumableUpload.id == upload_uuid,
+            ResumableUpload.owner_type == owner_type,
+            ResumableUpload.owner_id == owner_id,
+            ResumableUpload.expires_at > datetime.utcnow()
+        ).first()
+
+    @staticmethod
+    async def append_resumable_upload(db: Session, upload: ResumableUpload, offset: int, body) -> Dict[str, Any]:
+        """Store the chunk starting at offset as a part and advance the upload.
+
+        The chunk is streamed to storage without holding a database
+        connection; the offset is then advanced with a compare-and-set, so of
+        two requests sending the same offset only one is kept. A wrong
+        offset answers with the one expected. upload is detached from db.
+        """
+        if offset != upload.received:
+            return {"success": False, "error": "Upload offset mismatch", "offset": upload.received}
+
+        upload_id, parts = upload.id, list(upload.parts)
+        max_size = min(settings.resumable_chunk_max_size, upload.size - offset)
+        path = f"{RESUMABLE_PREFIX}{upload_id}/{offset:012d}-{uuid.uuid4().hex[:8]}"
+        FileService._release_connection(db, upload)
+
+        storage = get_storage()
+        size = await storage.write_part(path, body, max_size)
+        if size == 0:
+            await storage.delete_file(path)
+            return {"success": True, "offset": offset}
+
+        advanced = db.execute(
+            update(ResumableUpload)
+            .where(ResumableUpload.id == upload_id, ResumableUpload.received == offset)
+            .values(
+                received=offset + size,
+                parts=parts + [{"offset": offset, "size": size, "path": path}],
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.resumable_upload_expire_seconds)
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if not advanced:
+            await storage.delete_file(path)
+            received = db.query(ResumableUpload.received).filter(ResumableUpload.id == upload_id).scalar()
+            return {"success": False, "error": "Upload offset mismatch", "offset": received}
+        return {"success": True, "offset": offset + size}
+
+    @staticmethod
+    async def finalize_resumable_upload(db: Session, upload: ResumableUpload, replace: bool = False) -> Dict[str, Any]:
+        """Assemble the parts into a blob and reference it from the upload's owner.
+
+        The parts are streamed into store_blob, so the whole file is validated
+        and hashed like a single upload without being held in memory, and
+        without a transaction open; the blob is recorded afterwards.
+        upload is detached from db.
+        """
+        if upload.received != upload.size:
+            return {"success": False, "error": f"Upload incomplete: {upload.received} of {upload.size} bytes received"}
+
+        upload_id, owner_type, owner_id = upload.id, upload.owner_type, upload.owner_id
+        company_id, filename = upload.company_id, upload.filename
+        FileService._release_connection(db, upload)
+
+        storage = get_storage()
+        blob = await FileService.store_blob(
+            _iter_parts(storage, [part["path"] for part in upload.parts]),
+            upload.content_type,
+            max_size=upload.size
+        )
+        if blob.size != upload.size or (upload.sha256 and blob.digest != upload.sha256):
+            if blob.created:
+                await storage.delete_file(blob.path)
+            return {"success": False, "error": "Uploaded file does not match the declared size or checksum"}
+
+        # Claim the upload so a concurrent finalize doesn't reference it twice
+        claimed = db.execute(
+            delete(ResumableUpload)
+            .where(ResumableUpload.id == upload_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.rollback()
+            return {"success": False, "error": "Upload already finalized"}
+        stored = FileService._reference_blob(db, blob, owner_type, owner_id, company_id, replace, filename)
+        await FileService._delete_parts(upload_id)
+        return stored
+
+    @staticmethod
+    def _release_connection(db: Session, upload: ResumableUpload) -> None:
+        """End db's transaction before a long transfer; upload keeps its loaded state, detached"""
+        db.expunge(upload)
+        db.commit()
+
+    @staticmethod
+    async def abort_resumable_upload(db: Session, upload: ResumableUpload) -> None:
+        upload_id = upload.id
+        db.delete(upload)
+        db.commit()
+        await FileService._delete_parts(upload_id)
+
+    @staticmethod
+    async def _delete_parts(upload_id) -> None:
+        # Listed rather than taken from the row: losers of an offset race may have left parts
+        storage = get_storage()
+        for path in await storage.list_files(f"{RESUMABLE_PREFIX}{upload_id}/"):
+            await storage.delete_file(path)
+
+    @staticmethod
+    async def expire_resumable_uploads(db: Session, batch_size: int = 500) -> int:
+        """Discard resumable uploads nobody sent a chunk to within RESUMABLE_UPLOAD_EXPIRE_SECONDS"""
+        expired = 0
+        while True:
+            upload_ids = db.execute(
+                select(ResumableUpload.id)
+                .where(ResumableUpload.expires_at <= datetime.utcnow())
+                .limit(batch_size)
+            ).scalars().all()
+            for upload_id in upload_ids:
+                db.execute(
+                    delete(ResumableUpload)
+                    .where(ResumableUpload.id == upload_id)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                await FileService._delete_parts(upload_id)
+                expired += 1
+            if len(upload_ids) < batch_size:
+                break
+        return expired
+
+    @staticmethod
+    def signed_download_url(path: str) -> Dict[str, Any]:
+        """Short-lived URL reading a stored file without other credentials"""
+        storage = get_storage()
+        expires = expires_at()
+        url = storage.presign_download(path, expires - int(time.time()))
+        if url is None:
+            url = f"{storage.get_file_url(path)}?expires={expires}&signature={sign_download(path, expires)}"
+        return {"download_url": url, "expires_at": datetime.utcfromtimestamp(expires)}
+
+    @staticmethod
+    def get_download_url(db: Session, reference_id: str, owner_type: str, owner_id) -> Optional[Dict[str, Any]]:
+        """Signed download URL for one of an owner's files; None if it has no such file"""
+        try:
+            reference_uuid = uuid.UUID(reference_id)
+        except ValueError:
+            return None
+        path = db.query(FileBlob.storage_path).join(
+            FileReference, FileReference.blob_digest == FileBlob.digest
+        ).filter(
+            FileReference.id == reference_uuid,
+            FileReference.owner_type == owner_type,
+            FileReference.owner_id == owner_id
+        ).scalar()
+        if path is None:
+            return None
+        return FileService.signed_download_url(path)
+
+    @staticmethod
+    def signed_access(path: str) -> Dict[str, Any]:
+        """Access for a request with a valid download signature; resolved without the database"""
+        parts = path.split("/")
+        immutable = parts[0] == "blobs"
+        return {
+            "immutable": immutable,
+            "etag": f'"{parts[-1].split(".", 1)[0]}"' if immutable else None,
+            "content_type": mimetypes.guess_type(path)[0],
+            "public": False,
+            "company_ids": set(),
+            "new_hire_ids": set(),
+        }
+
+    @staticmethod
+    def resolve_access(db: Session, path: str) -> Optional[Dict[str, Any]]:
+        """Who may read a stored file and whether it can be cached forever.
+
+        Blobs are public when referenced as a logo or media variant, otherwise
+        readable by the owning companies' admins and the uploading new hires.
+        Files stored by name before blobs existed are public, except
+        onboarding uploads. None means the file is not served.
+        """
+        parts = path.split("/")
+        if parts[0] == "blobs":
+            digest = parts[-1].split(".", 1)[0]
+            rows = db.query(
+                FileBlob.content_type, FileReference.owner_type, FileReference.owner_id, FileReference.company_id
+            ).outerjoin(
+                FileReference, FileReference.blob_digest == FileBlob.digest
+            ).filter(FileBlob.digest == digest).all()
+            references = [row for row in rows if row.owner_type is not None]
+            if not references:
+                return None  # unknown or waiting for garbage collection
+            return {
+                "immutable": True,
+                "etag": f'"{digest}"',
+                "content_type": rows[0].content_type,
+                "public": any(row.owner_type in PUBLIC_OWNER_TYPES for row in references),
+                "company_ids": {row.company_id for row in references},
+                "new_hire_ids": {row.owner_id for row in references if row.owner_type == OWNER_ONBOARDING_UPLOAD},
+            }
+
+        if path.startswith(RESUMABLE_PREFIX):
+            return None
+
+        access = {
+            "immutable": False,
+            "etag": None,
+            "content_type": mimetypes.guess_type(path)[0],
+            "public": True,
+            "company_ids": set(),
+            "new_hire_ids": set(),
+        }
+        if parts[0] == "onboarding":
+            # onboarding/{new_hire_id}/{filename}
+            try:
+                new_hire_id = uuid.UUID(parts[1])
+            except (IndexError, ValueError):
+                return None
+            new_hire = db.query(NewHire).filter(NewHire.id == new_hire_id).first()
+            if not new_hire:
+                return None
+            access.update(public=False, company_ids={new_hire.company_id}, new_hire_ids={new_hire.id})
+        return access
+
+    @staticmethod
+    async def collect_garbage(db: Session, grace_seconds: Optional[int] = None, batch_size: int = 500) -> Dict[str, Any]:
+        """Delete blobs nobody references that were last stored before the grace period,
+        and resumable uploads that expired.
+
+        The row is removed with a NOT EXISTS guard, so a reference added in
+        the meantime keeps the blob, and the file is deleted before that
+        transaction commits: an upload of the same content refreshes the row
+        first (FileService.store_blob), so it either keeps the blob alive or
+        waits for the row lock, finds the row gone and writes the file again.
+        """
+        grace_seconds = settings.file_gc_grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        storage = get_storage()
+        unreferenced = ~exists().where(FileReference.blob_digest == FileBlob.digest)
+
+        deleted = 0
+        reclaimed = 0
+        while True:
+            candidates = db.execute(
+                select(FileBlob.digest, FileBlob.storage_path, FileBlob.size)
+                .where(FileBlob.last_stored_at < cutoff, unreferenced)
+                .limit(batch_size)
+            ).all()
+            if not candidates:
+                break
+            for digest, path, size in candidates:
+                removed = db.execute(
+                    delete(FileBlob)
+                    .where(FileBlob.digest == digest, FileBlob.last_stored_at < cutoff, unreferenced)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not removed:
+                    db.rollback()
+                    continue
+                try:
+                    await storage.delete_file(path)
+                except Exception:
+                    db.rollback()
+                    raise
+                db.commit()
+                deleted += 1
+                reclaimed += size or 0
+            if len(candidates) < batch_size:
+                break
+
+        expired_uploads = await FileService.expire_resumable_uploads(db, batch_size)
+        return {
+            "success": True,
+            "deleted_blobs": deleted,
+            "reclaimed_bytes": reclaimed,
+            "expired_uploads": expired_uploads
+        }
+
+    @staticmethod
+    async def _migrate_file(db: Session, path: str) -> Optional[StoredBlob]:
+        storage = get_storage()
+        source = await storage.download_file(path)
+        if source is None:
+            return None
+        try:
+            blob = await FileService.store_blob(source, mimetypes.guess_type(path)[0])
+        finally:
+            source.close()
+        FileService._record_blob(db, blob)
+        return blob
+
+    @staticmethod
+    async def migrate_legacy_files(db: Session, delete_legacy: bool = False) -> Dict[str, Any]:
+        """Move files stored by name (company logos, onboarding uploads) into the blob store.
+
+        Logo URLs and file URLs recorded in progress data are rewritten to
+        the blob URLs. Files that break the current upload limits are
+        skipped and left in place.
+        """
+        storage = get_storage()
+        url_prefix = storage.get_file_url("")
+        stats = {"migrated": 0, "skipped": 0, "missing": 0, "deduplicated": 0}
+        migrated_paths = []
+
+        async def _migrate(path: str) -> Optional[StoredBlob]:
+            try:
+                blob = await FileService._migrate_file(db, path)
+            except UploadRejected:
+                stats["skipped"] += 1
+                return None
+            if blob is None:
+                stats["missing"] += 1
+                return None
+            stats["migrated"] += 1
+            stats["deduplicated"] += 0 if blob.created else 1
+            migrated_paths.append(path)
+            return blob
+
+        # Company logos
+        companies = db.query(Company).filter(Company.logo_url.isnot(None)).all()
+        for company in companies:
+            if not company.logo_url.startswith(url_prefix):
+                continue
+            path = company.logo_url[len(url_prefix):]
+            if path.startswith("blobs/"):
+                continue
+            blob = await _migrate(path)
+            if blob is None:
+                continue
+            db.add(FileReference(
+                blob_digest=blob.digest,
+                company_id=company.id,
+                owner_type=OWNER_COMPANY_LOGO,
+                owner_id=company.id,
+                filename=path.rsplit("/", 1)[-1]
+            ))
+            company.logo_url = storage.get_file_url(blob.path)
+            db.commit()
+
+        # Onboarding uploads, stored as onboarding/{new_hire_id}/{filename}
+        for path in await storage.list_files("onboarding/"):
+            parts = path.split("/")
+            try:
+                new_hire_id = uuid.UUID(parts[1])
+            except (IndexError, ValueError):
+                stats["skipped"] += 1
+                continue
+            new_hire = db.query(NewHire).execution_options(include_deleted=True).filter(
+                NewHire.id == new_hire_id
+            ).first()
+            if not new_hire:
+                stats["skipped"] += 1
+                continue
+            blob = await _migrate(path)
+            if blob is None:
+                continue
+            db.add(FileReference(
+                blob_digest=blob.digest,
+                company_id=new_hire.company_id,
+                owner_type=OWNER_ONBOARDING_UPLOAD,
+                owner_id=new_hire.id,
+                filename=parts[-1]
+            ))
+            # Point recorded answers at the blob
+            old_url, new_url = storage.get_file_url(path), storage.get_file_url(blob.path)
+            for progress in db.query(Progress).filter(Progress.new_hire_id == new_hire.id).all():
+                serialized = json.dumps(progress.data)
+                if old_url in serialized:
+                    progress.data = json.loads(serialized.replace(old_url, new_url))
+            db.commit()
+
+        if delete_legacy:
+            for path in migrated_paths:
+                await storage.delete_file(path)
+
+        return {"success": True, **stats}
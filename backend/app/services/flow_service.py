@@ -1,6 +1,5 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime
 import uuid
 from app.models.onboarding_flow import OnboardingFlow
@@ -8,6 +7,7 @@ from app.models.stage import Stage
 from app.models.new_hire import NewHire
 from app.models.progress import Progress
 from app.models.content_block import ContentBlock
+from app.services.ordering_service import OrderingService
 from app.services.stage_template_service import StageTemplateService
 
 
@@ -74,11 +74,8 @@ class FlowService:
             if not flow:
                 return {"success": False, "error": "Flow not found"}
             
-            # Get the next order number
-            max_order = db.query(Stage).filter(Stage.flow_id == flow_uuid).with_entities(
-                func.max(Stage.order)
-            ).scalar()
-            next_order = (max_order or 0) + 1
+            # Append after the last stage
+            next_order = OrderingService.next_key(db, Stage.order, Stage.flow_id == flow_uuid)
             
             # Create stage
             stage = Stage(
@@ -143,19 +140,17 @@ class FlowService:
     
     @staticmethod
     def reorder_stages(db: Session, flow_id: str, stage_order: List[str]) -> Dict[str, Any]:
-        """Reorder stages in an onboarding flow"""
+        """Reorder stages in an onboarding flow in a single UPDATE.
+
+        Listed stages come first in the given order, the others follow in
+        their current order.
+        """
         try:
             flow_uuid = uuid.UUID(flow_id)
-            # Update order for each stage
-            for index, stage_id in enumerate(stage_order, 1):
-                stage_uuid = uuid.UUID(stage_id)
-                stage = db.query(Stage).filter(
-                    Stage.id == stage_uuid,
-                    Stage.flow_id == flow_uuid
-                ).first()
-                
-                if stage:
-                    stage.order = index
+            scope = Stage.flow_id == flow_uuid
+            current = OrderingService.current_order(db, Stage, Stage.order, scope)
+            order = OrderingService.merge_order(current, [uuid.UUID(stage_id) for stage_id in stage_order])
+            OrderingService.apply_order(db, Stage, Stage.order, scope, order)
             
             db.commit()
             
@@ -165,6 +160,30 @@ class FlowService:
             db.rollback()
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def move_stage(db: Session, flow_id: str, stage_id: str, after_id: Optional[str] = None) -> Dict[str, Any]:
+        """Move a stage right after another one (first when after_id is None)"""
+        try:
+            flow_uuid = uuid.UUID(flow_id)
+            order = OrderingService.move(
+                db,
+                Stage,
+                Stage.order,
+                Stage.flow_id == flow_uuid,
+                uuid.UUID(stage_id),
+                uuid.UUID(after_id) if after_id else None
+            )
+            if order is None:
+                return {"success": False, "error": "Stage not found"}
+            
+            db.commit()
+            
+            return {"success": True, "order": order}
+        
+        except Exception as e:
+            db.rollback()
+            return {"success": False, "error": str(e)}
+    
     @staticmethod
     def get_pipeline_data(db: Session, flow_id: str) -> Dict[str, Any]:
         """Get pipeline data showing new hires and their progress through stages"""
@@ -291,14 +310,13 @@ class FlowService:
             
             # Apply template content blocks
             if template.default_content and template.default_config:
-                for i, content_block in enumerate(template.default_content):
+                for content_block in template.default_content:
                     ContentService.create_content_block(
                         db=db,
                         stage_id=stage_id,
                         content_type_name=content_block.get("type"),
                         config=content_block.get("config", {}),
-                        content=content_block.get("content", {}),
-                        order_index=i + 1
+                        content=content_block.get("content", {})
                     )
             
             return {"success": True}
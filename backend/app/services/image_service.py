@@ -0,0 +1,292 @@
+"""
+Resized WebP variants of uploaded images.
+
+The portal used to download full-size logos and media images on every page.
+After an upload, variants are rendered in a small process pool (resizing is
+CPU-bound and holds the GIL), stored as blobs and recorded on the company or
+content block, and image requests are redirected to the smallest variant
+that covers the requested size.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+import asyncio
+import io
+import multiprocessing
+import os
+import threading
+import time
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.models.company import Company
+from app.models.content_block import ContentBlock
+from app.models.file_blob import FileBlob, FileReference
+from app.models.onboarding_flow import OnboardingFlow
+from app.models.stage import Stage
+from app.services.file_service import FileService, OWNER_LOGO_VARIANT, OWNER_MEDIA_VARIANT
+from app.storage.factory import get_storage
+from app.storage.images import RESIZABLE_TYPES, VARIANT_CONTENT_TYPE, RenderedVariant, render_variants
+
+# Variant name -> (max width, max height); images are scaled to fit, never up
+LOGO_VARIANTS: Dict[str, Tuple[int, int]] = {
+    "thumbnail": (128, 128),
+    "header": (480, 160),
+    "retina": (960, 320),
+}
+MEDIA_VARIANTS: Dict[str, Tuple[int, int]] = {
+    "thumbnail": (320, 320),
+    "header": (960, 540),
+    "retina": (1920, 1080),
+}
+
+
+class ImageProcessor:
+    """Process pool rendering image variants, with timing metrics"""
+
+    def __init__(self, max_workers: int, quality: int):
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.quality = min(100, max(1, quality))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "render_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a process that runs an event loop and
+                    # DB connections is not safe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    async def render(self, data: bytes, boxes: Dict[str, Tuple[int, int]]) -> Dict[str, RenderedVariant]:
+        """Render the variants of an encoded image on the pool"""
+        with self._lock:
+            self._stats["submitted"] += 1
+        started_at = time.perf_counter()
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            variants = await loop.run_in_executor(executor, render_variants, data, boxes, self.quality)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool next time
+            with self._lock:
+                self._stats["failed"] += 1
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["render_seconds"] += time.perf_counter() - started_at
+        return variants
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.max_workers,
+                "running": self._executor is not None,
+                **self._stats,
+                "avg_render_ms": round(self._stats["render_seconds"] * 1000 / completed, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_processor = ImageProcessor(
+    max_workers=settings.image_workers,
+    quality=settings.image_variant_quality
+)
+
+
+class ImageService:
+    """Generates, records and selects image variants"""
+
+    @staticmethod
+    def select_variant(
+        original_url: Optional[str],
+        variants: Optional[Dict[str, Any]],
+        width: Optional[int] = None,
+        height: Optional[int] = None
+    ) -> Optional[str]:
+        """URL of the smallest variant covering width x height.
+
+        Falls back to the original when no variant is large enough (or
+        none was rendered yet), since variants are never larger than it.
+        """
+        if not variants or (not width and not height):
+            return original_url
+        fitting = [
+            variant for variant in variants.values()
+            if variant["width"] >= (width or 0) and variant["height"] >= (height or 0)
+        ]
+        if not fitting:
+            return original_url
+        return min(fitting, key=lambda variant: variant["width"] * variant["height"])["url"]
+
+    @staticmethod
+    async def _render_and_store(
+        db: Session,
+        source_url: Optional[str],
+        boxes: Dict[str, Tuple[int, int]],
+        owner_type: str,
+        owner_id,
+        company_id
+    ) -> Optional[Dict[str, Any]]:
+        """Render variants of a stored image and reference them from the owner.
+
+        Returns None when source_url is not an image in the blob store (e.g.
+        an external link or a PDF). The caller commits.
+        """
+        storage = get_storage()
+        url_prefix = storage.get_file_url("")
+        if not source_url or not source_url.startswith(url_prefix + "blobs/"):
+            return None
+        path = source_url[len(url_prefix):]
+        digest = path.rsplit("/", 1)[-1].split(".", 1)[0]
+        blob = db.get(FileBlob, digest)
+        if blob is None or blob.content_type not in RESIZABLE_TYPES:
+            return None
+        db.commit()  # don't hold a transaction open while rendering
+
+        source = await storage.download_file(path)
+        if source is None:
+            return None
+        try:
+            data = await run_in_threadpool(source.read)
+        finally:
+            source.close()
+
+        rendered = await image_processor.render(data, boxes)
+
+        variants = {}
+        for name, variant in rendered.items():
+            stored = await FileService.store_blob(
+                io.BytesIO(variant.data), VARIANT_CONTENT_TYPE, allowed_types=[VARIANT_CONTENT_TYPE]
+            )
+            FileService._record_blob(db, stored)
+            variants[name] = {
+                "url": storage.get_file_url(stored.path),
+                "width": variant.width,
+                "height": variant.height,
+                "size": stored.size,
+                "digest": stored.digest,
+            }
+
+        FileService.drop_references(db, owner_type, owner_id)
+        # Small sources give identical variants; reference each blob once
+        names = {}
+        for name, variant in variants.items():
+            names.setdefault(variant["digest"], name)
+        for digest, name in names.items():
+            db.add(FileReference(
+                blob_digest=digest,
+                company_id=company_id,
+                owner_type=owner_type,
+                owner_id=owner_id,
+                filename=f"{name}.webp"
+            ))
+        for variant in variants.values():
+            del variant["digest"]
+        return variants
+
+    @staticmethod
+    async def generate_logo_variants(company_id) -> Dict[str, Any]:
+        """Render the variants of a company logo in a session of its own (background task)"""
+        db = SessionLocal()
+        try:
+            company = db.get(Company, company_id)
+            if not company:
+                return {"success": False, "error": "Company not found"}
+            source_url = company.logo_url
+            variants = await ImageService._render_and_store(
+                db, source_url, LOGO_VARIANTS, OWNER_LOGO_VARIANT, company.id, company.id
+            )
+            if variants is None:
+                return {"success": False, "error": "Logo is not a stored image"}
+
+            db.refresh(company)
+            if company.logo_url != source_url:
+                # Replaced while rendering; the newer upload renders its own
+                db.rollback()
+                return {"success": False, "error": "Logo changed while rendering"}
+            company.logo_variants = variants
+            db.commit()
+            return {"success": True, "variants": variants}
+        except Exception as e:
+            db.rollback()
+            return {"success": False, "error": f"Logo variants failed: {str(e)}"}
+        finally:
+            db.close()
+
+    @staticmethod
+    async def generate_media_variants(content_block_id) -> Dict[str, Any]:
+        """Render the variants of a media block's image in a session of its own (background task)"""
+        db = SessionLocal()
+        try:
+            content_block = db.get(ContentBlock, content_block_id)
+            if not content_block or content_block.type != "media":
+                return {"success": False, "error": "Media content block not found"}
+            company_id = db.query(OnboardingFlow.company_id).join(
+                Stage, Stage.flow_id == OnboardingFlow.id
+            ).filter(Stage.id == content_block.stage_id).scalar()
+            source_url = (content_block.content or {}).get("file_url")
+            variants = await ImageService._render_and_store(
+                db, source_url, MEDIA_VARIANTS, OWNER_MEDIA_VARIANT, content_block.id, company_id
+            )
+            if variants is None:
+                return {"success": False, "error": "Media file is not a stored image"}
+
+            db.refresh(content_block)
+            if (content_block.content or {}).get("file_url") != source_url:
+                db.rollback()
+                return {"success": False, "error": "Media file changed while rendering"}
+            content_block.media_variants = variants
+            db.commit()
+            return {"success": True, "variants": variants}
+        except Exception as e:
+            db.rollback()
+            return {"success": False, "error": f"Media variants failed: {str(e)}"}
+        finally:
+            db.close()
+
+    @staticmethod
+    async def generate_missing_variants(db: Session) -> Dict[str, Any]:
+        """Render variants for logos and media blocks that have none (e.g. uploaded before variants existed)"""
+        stats = {"logos": 0, "media": 0, "skipped": 0}
+        company_ids = db.query(Company.id).filter(
+            Company.logo_url.isnot(None),
+            Company.logo_variants.is_(None)
+        ).all()
+        block_ids = db.query(ContentBlock.id).filter(
+            ContentBlock.type == "media",
+            ContentBlock.media_variants.is_(None)
+        ).all()
+        db.commit()
+
+        for (company_id,) in company_ids:
+            result = await ImageService.generate_logo_variants(company_id)
+            stats["logos" if result["success"] else "skipped"] += 1
+        for (block_id,) in block_ids:
+            result = await ImageService.generate_media_variants(block_id)
+            stats["media" if result["success"] else "skipped"] += 1
+        return {"success": True, **stats}
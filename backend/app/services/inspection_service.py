@@ -0,0 +1,337 @@
+"""
+Background inspection of uploaded files.
+
+Uploads only measure size and hash the content on the request path; the
+rest (real MIME type, checksum verification of the stored copy, image
+dimensions, PDF page counts) is done by a few worker tasks draining a
+bounded queue. New blobs are queued when they are first referenced, and
+blobs that were never inspected (queue full, restart, older uploads) are
+picked up from the database whenever the queue runs dry. Results are stored
+on the blob and written into the answers that reference it.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Set
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from datetime import datetime
+import asyncio
+import copy
+import threading
+import time
+import uuid
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.models.file_blob import FileBlob, FileReference
+from app.models.progress import Progress
+from app.services.file_service import OWNER_ONBOARDING_UPLOAD
+from app.storage.factory import get_storage
+from app.storage.inspection import inspect_file
+
+
+def file_entries(data: Any) -> Iterator[Dict[str, Any]]:
+    """File objects in a content block answer: file_upload files and visual_audio recordings"""
+    user_input = data.get("data") if isinstance(data, dict) else None
+    if not isinstance(user_input, dict):
+        return
+    files = user_input.get("files")
+    if isinstance(files, list):
+        for entry in files:
+            if isinstance(entry, dict):
+                yield entry
+    recording = user_input.get("recording")
+    if isinstance(recording, dict):
+        yield recording
+
+
+def _apply_blob(entry: Dict[str, Any], blob: FileBlob, file_url: str) -> None:
+    """Replace client-declared file facts with the stored blob's"""
+    entry["file_url"] = file_url
+    entry["file_type"] = blob.content_type
+    entry["file_size"] = blob.size
+    entry["sha256"] = blob.digest
+    entry["inspection"] = blob.inspection  # None until inspected
+
+
+class InspectionQueue:
+    """Bounded queue of blob digests drained by INSPECTION_WORKERS tasks.
+
+    Lives on the event loop; enqueue() may be called from any thread.
+    """
+
+    def __init__(self, workers: int, max_size: int, poll_seconds: int):
+        self.workers = max(0, workers)
+        self.max_size = max(1, max_size)
+        self.poll_seconds = max(1, poll_seconds)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Set[str] = set()
+        self._failed: Set[str] = set()  # not retried by this process
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "inspect_seconds": 0.0,
+        }
+
+    def start(self) -> None:
+        """Start the workers on the running event loop"""
+        if self._tasks or self.workers == 0:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [self._loop.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(self._loop.create_task(self._refill_forever()))
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+        self._queued.clear()
+
+    def enqueue(self, digest: str) -> None:
+        """Queue a blob for inspection; a no-op when the workers don't run here (CLI)"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._put(digest)
+        else:
+            loop.call_soon_threadsafe(self._put, digest)
+
+    def _put(self, digest: str) -> None:
+        if self._queue is None or digest in self._queued or digest in self._failed:
+            return
+        try:
+            self._queue.put_nowait(digest)
+        except asyncio.QueueFull:
+            # Picked up from the database once the queue drains
+            with self._lock:
+                self._stats["dropped"] += 1
+            return
+        self._queued.add(digest)
+        with self._lock:
+            self._stats["submitted"] += 1
+
+    async def _work(self) -> None:
+        queue = self._queue
+        while True:
+            digest = await queue.get()
+            started_at = time.perf_counter()
+            try:
+                await InspectionService.inspect_blob(digest)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed.add(digest)
+                with self._lock:
+                    self._stats["failed"] += 1
+                print(f"⚠️  File inspection failed for {digest}: {e}")
+            else:
+                with self._lock:
+                    self._stats["completed"] += 1
+                    self._stats["inspect_seconds"] += time.perf_counter() - started_at
+            finally:
+                self._queued.discard(digest)
+                queue.task_done()
+
+    async def _refill_forever(self) -> None:
+        while True:
+            if self._queue is not None and self._queue.empty():
+                try:
+                    # Failed blobs stay pending in the database; look past them
+                    # so newer blobs are still picked up
+                    digests = await run_in_threadpool(
+                        InspectionService.pending_digests, self.max_size + len(self._failed)
+                    )
+                except Exception as e:
+                    print(f"⚠️  File inspection lookup failed: {e}")
+                    digests = []
+                for digest in digests:
+                    self._put(digest)
+            await asyncio.sleep(self.poll_seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.workers,
+                "running": bool(self._tasks),
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                **self._stats,
+                "avg_inspect_ms": round(self._stats["inspect_seconds"] * 1000 / completed, 2) if completed else 0.0,
+            }
+
+
+inspection_queue = InspectionQueue(
+    workers=settings.inspection_workers,
+    max_size=settings.inspection_queue_size,
+    poll_seconds=settings.inspection_poll_seconds
+)
+
+
+class InspectionService:
+    """Inspects stored files and makes answers use the server's file facts"""
+
+    @staticmethod
+    def pending_digests(limit: int) -> List[str]:
+        """Blobs that were never inspected, oldest first"""
+        db = SessionLocal()
+        try:
+            rows = db.query(FileBlob.digest).filter(
+                FileBlob.inspected_at.is_(None)
+            ).order_by(FileBlob.created_at).limit(limit).all()
+            return [digest for (digest,) in rows]
+        finally:
+            db.close()
+
+    @staticmethod
+    async def inspect_blob(digest: str) -> Dict[str, Any]:
+        """Inspect one blob in a session of its own and record the result"""
+        db = SessionLocal()
+        try:
+            blob = db.get(FileBlob, digest)
+            if blob is None or blob.inspected_at is not None:
+                return {"success": False, "error": "Blob not found or already inspected"}
+            path, size = blob.storage_path, blob.size
+            db.commit()  # don't hold a transaction open while reading the file
+
+            storage = get_storage()
+            source = await storage.download_file(path)
+            if source is None:
+                inspection = {"error": "File is missing from storage"}
+            else:
+                try:
+                    result = await run_in_threadpool(inspect_file, source, settings.upload_chunk_size)
+                finally:
+                    source.close()
+                inspection = {
+                    key: value for key, value in result.items() if key not in ("sha256", "size")
+                }
+                # The stored copy must still be what was hashed on upload
+                inspection["checksum_ok"] = result["sha256"] == digest and result["size"] == size
+
+            blob = db.get(FileBlob, digest)
+            if blob is None:
+                return {"success": False, "error": "Blob was deleted while inspecting"}
+            blob.inspection = inspection
+            blob.inspected_at = datetime.utcnow()
+            InspectionService._write_back(db, blob)
+            db.commit()
+            return {"success": True, "inspection": inspection}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    async def inspect_pending(batch_size: int = 100) -> Dict[str, Any]:
+        """Inspect every blob that was never inspected, in this process (manage.py files-inspect)"""
+        stats = {"inspected": 0, "failed": 0}
+        failed: Set[str] = set()
+        while True:
+            digests = [
+                digest for digest in InspectionService.pending_digests(batch_size + len(failed))
+                if digest not in failed
+            ]
+            if not digests:
+                break
+            for digest in digests:
+                try:
+                    await InspectionService.inspect_blob(digest)
+                    stats["inspected"] += 1
+                except Exception:
+                    failed.add(digest)
+                    stats["failed"] += 1
+        return {"success": True, **stats}
+
+    @staticmethod
+    def _write_back(db: Session, blob: FileBlob) -> None:
+        """Record an inspection in the answers of the new hires who uploaded the blob"""
+        new_hire_ids = [
+            owner_id for (owner_id,) in db.query(FileReference.owner_id).filter(
+                FileReference.blob_digest == blob.digest,
+                FileReference.owner_type == OWNER_ONBOARDING_UPLOAD
+            ).distinct()
+        ]
+        if not new_hire_ids:
+            return
+        file_url = get_storage().get_file_url(blob.storage_path)
+        for progress in db.query(Progress).filter(Progress.new_hire_id.in_(new_hire_ids)).all():
+            data = copy.deepcopy(progress.data)
+            matches = [entry for entry in file_entries(data) if entry.get("file_url") == file_url]
+            if matches:
+                for entry in matches:
+                    _apply_blob(entry, blob, file_url)
+                progress.data = data  # JSONField only notices reassignment
+
+    @staticmethod
+    def apply_trusted_file_data(db: Session, new_hire_id, data: Dict[str, Any]) -> List[str]:
+        """Overwrite declared file_type/file_size in an answer with the uploaded blob's.
+
+        Files are matched by file_id, or by a blob file_url; they must be the
+        new hire's own uploads. Other URLs (external links, files stored
+        before blobs existed) keep their declared values. Returns errors.
+        """
+        entries = list(file_entries(data))
+        if not entries:
+            return []
+
+        storage = get_storage()
+        url_prefix = storage.get_file_url("")
+        reference_ids, paths = set(), set()
+        keys = []
+        for entry in entries:
+            file_id, file_url = entry.get("file_id"), entry.get("file_url")
+            key = None
+            if file_id is not None:
+                try:
+                    key = ("id", uuid.UUID(str(file_id)))
+                except ValueError:
+                    key = ("id", None)
+                else:
+                    reference_ids.add(key[1])
+            elif isinstance(file_url, str) and file_url.startswith(url_prefix + "blobs/"):
+                key = ("path", file_url[len(url_prefix):])
+                paths.add(key[1])
+            keys.append(key)
+        if not any(keys):
+            return []
+
+        conditions = []
+        if reference_ids:
+            conditions.append(FileReference.id.in_(reference_ids))
+        if paths:
+            conditions.append(FileBlob.storage_path.in_(paths))
+        by_key = {}
+        if conditions:
+            rows = db.query(FileReference.id, FileBlob).join(
+                FileBlob, FileBlob.digest == FileReference.blob_digest
+            ).filter(
+                FileReference.owner_type == OWNER_ONBOARDING_UPLOAD,
+                FileReference.owner_id == new_hire_id,
+                or_(*conditions)
+            ).all()
+            for reference_id, blob in rows:
+                by_key[("id", reference_id)] = blob
+                by_key[("path", blob.storage_path)] = blob
+
+        errors = []
+        for entry, key in zip(entries, keys):
+            if key is None:
+                continue
+            blob = by_key.get(key)
+            if blob is None:
+                errors.append(f"file '{entry.get('file_id') or entry.get('file_url')}' was not uploaded in this session")
+                continue
+            _apply_blob(entry, blob, storage.get_file_url(blob.storage_path))
+        return errors
@@ -2,7 +2,6 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import uuid
-import secrets
 from app.models.new_hire import NewHire
 from app.models.stage import Stage
 from app.models.content_block import ContentBlock
@@ -18,9 +17,6 @@ class NewHireService:
     def create_new_hire(db: Session, company_id: str, new_hire_data: dict) -> Dict[str, Any]:
         """Create a new hire"""
         try:
-            # Generate unique session token
-            session_token = secrets.token_urlsafe(32)
-            
             # Set token expiration (7 days from now)
             token_expires_at = datetime.utcnow() + timedelta(days=7)
             
@@ -34,10 +30,10 @@ class NewHireService:
                 first_name=new_hire_data["first_name"],
                 last_name=new_hire_data["last_name"],
                 status="pending",
-                session_token=session_token,
-                session_token_expires_at=token_expires_at,
                 invited_at=datetime.utcnow()
             )
+            # Signed token: onboarding requests are validated without a lookup
+            session_token = new_hire.issue_session_token(token_expires_at)
             
             db.add(new_hire)
             db.commit()
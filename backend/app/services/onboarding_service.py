@@ -2,6 +2,7 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import uuid
+from app.config import settings
 from app.models.new_hire import NewHire
 from app.models.stage import Stage
 from app.models.content_block import ContentBlock
@@ -9,17 +10,40 @@ from app.models.progress import Progress
 from app.models.onboarding_flow import OnboardingFlow
 from app.models.company import Company
 from app.services.content_service import ContentService
-from app.storage.factory import get_storage
-import secrets
+from app.storage.base import UploadRejected, safe_filename
+from app.services.file_service import FileService, OWNER_ONBOARDING_UPLOAD
+from app.services.image_service import ImageService
+from app.services.inspection_service import InspectionService
+from app.auth.session_tokens import decode_session_token, is_signed_session_token
 
 
 class OnboardingSessionService:
     """Service for managing onboarding sessions and progress tracking"""
     
+    @staticmethod
+    def resolve_new_hire(db: Session, session_token: str) -> Optional[NewHire]:
+        """Find the new hire a session token belongs to.
+        
+        Signed tokens are verified without touching the database and the new
+        hire is loaded by primary key, which later calls in the same request
+        serve from the session identity map. A stale generation means the
+        token was revoked. Opaque tokens use the indexed token lookup.
+        """
+        if is_signed_session_token(session_token):
+            claims = decode_session_token(session_token)
+            if not claims:
+                return None
+            new_hire = db.get(NewHire, claims.new_hire_id)
+            if not new_hire or new_hire.session_generation != claims.generation:
+                return None
+            return new_hire
+        
+        return db.query(NewHire).filter(NewHire.session_token == session_token).first()
+    
     @staticmethod
     def get_session_data(db: Session, session_token: str) -> Optional[Dict[str, Any]]:
         """Get complete onboarding session data"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return None
@@ -67,7 +91,8 @@ class OnboardingSessionService:
                     "type": cb.type,
                     "config": cb.config,
                     "content": cb.content,
-                    "order_index": cb.order_index,
+                    "order_index": cb.position,
+                    "media_variants": cb.media_variants,
                     "status": progress.status if progress else "pending",
                     "data": progress.data if progress else None,
                     "started_at": progress.started_at if progress else None,
@@ -97,6 +122,7 @@ class OnboardingSessionService:
             "flow_name": flow.name,
             "company_name": company.name,
             "company_logo_url": company.logo_url,
+            "company_logo_variants": company.logo_variants,
             "new_hire_name": f"{new_hire.first_name} {new_hire.last_name}",
             "new_hire_email": new_hire.email,
             "status": new_hire.status,
@@ -109,7 +135,7 @@ class OnboardingSessionService:
     @staticmethod
     def start_onboarding(db: Session, session_token: str) -> Dict[str, Any]:
         """Start the onboarding process"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return {"success": False, "error": "Onboarding session not found"}
@@ -134,7 +160,7 @@ class OnboardingSessionService:
     @staticmethod
     def get_progress_overview(db: Session, session_token: str) -> Optional[Dict[str, Any]]:
         """Get overall progress for the onboarding session"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return None
@@ -157,7 +183,7 @@ class OnboardingSessionService:
         current_stage_id = OnboardingSessionService.get_current_stage_id(db, session_token)
         current_stage_name = None
         if current_stage_id:
-            current_stage = db.query(Stage).filter(Stage.id == current_stage_id).first()
+            current_stage = db.query(Stage).filter(Stage.id == uuid.UUID(current_stage_id)).first()
             current_stage_name = current_stage.name if current_stage else None
         
         return {
@@ -181,7 +207,7 @@ class OnboardingSessionService:
         if not current_stage_id:
             return None
         
-        stage = db.query(Stage).filter(Stage.id == current_stage_id).first()
+        stage = db.query(Stage).filter(Stage.id == uuid.UUID(current_stage_id)).first()
         
         if not stage:
             return None
@@ -197,12 +223,17 @@ class OnboardingSessionService:
     @staticmethod
     def get_stage_with_content_blocks(db: Session, session_token: str, stage_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific stage with all its content blocks and progress"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return None
         
-        stage = db.query(Stage).filter(Stage.id == stage_id).first()
+        try:
+            stage_uuid = uuid.UUID(stage_id)
+        except ValueError:
+            return None
+        
+        stage = db.query(Stage).filter(Stage.id == stage_uuid, Stage.flow_id == new_hire.flow_id).first()
         
         if not stage:
             return None
@@ -222,7 +253,8 @@ class OnboardingSessionService:
                 "type": cb.type,
                 "config": cb.config,
                 "content": cb.content,
-                "order_index": cb.order_index,
+                "order_index": cb.position,
+                "media_variants": cb.media_variants,
                 "status": progress.status if progress else "pending",
                 "data": progress.data if progress else None,
                 "started_at": progress.started_at if progress else None,
@@ -238,10 +270,46 @@ class OnboardingSessionService:
             "content_blocks": content_block_progress
         }
     
+    @staticmethod
+    def get_image_url(
+        db: Session,
+        session_token: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        content_block_id: Optional[str] = None
+    ) -> Optional[str]:
+        """URL of the company logo, or of a media block's image, sized for width x height"""
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        
+        if not new_hire or new_hire.is_session_token_expired():
+            return None
+        
+        if content_block_id is None:
+            company = db.get(Company, new_hire.company_id)
+            if not company:
+                return None
+            return ImageService.select_variant(company.logo_url, company.logo_variants, width, height)
+        
+        try:
+            content_block_uuid = uuid.UUID(content_block_id)
+        except ValueError:
+            return None
+        
+        content_block = db.query(ContentBlock).join(Stage).filter(
+            ContentBlock.id == content_block_uuid,
+            ContentBlock.type == "media",
+            Stage.flow_id == new_hire.flow_id
+        ).first()
+        if not content_block:
+            return None
+        return ImageService.select_variant(
+            (content_block.content or {}).get("file_url"), content_block.media_variants, width, height
+        )
+    
     @staticmethod
     def is_stage_complete(db: Session, session_token: str, stage_id: str) -> bool:
         """Check if a stage is complete"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return False
@@ -273,7 +341,7 @@ class OnboardingSessionService:
         data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Complete a specific content block with collected data"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return {"success": False, "error": "Onboarding session not found"}
@@ -283,16 +351,20 @@ class OnboardingSessionService:
         if not content_block:
             return {"success": False, "error": "Content block not found"}
         
+        # Uploaded files are described by what was stored, not by the client
+        data = data or {}
+        file_errors = InspectionService.apply_trusted_file_data(db, new_hire.id, data)
+        
         # Validate user-submitted input against this block's type and config (not admin config validation)
         validation = OnboardingSessionService.validate_user_input_data(
             content_block=content_block,
-            data=data or {}
+            data=data
         )
-        if not validation.get("valid", False):
+        if file_errors or not validation.get("valid", False):
             return {
                 "success": False,
                 "error": "Validation failed",
-                "details": validation.get("errors", [])
+                "details": file_errors + validation.get("errors", [])
             }
         
         # Create or update progress
@@ -339,34 +411,162 @@ class OnboardingSessionService:
         return {"success": True}
     
     @staticmethod
-    def upload_file(db: Session, session_token: str, file) -> Dict[str, Any]:
+    async def upload_file(db: Session, session_token: str, file) -> Dict[str, Any]:
         """Upload a file for the onboarding session"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return {"success": False, "error": "Onboarding session not found"}
         
         try:
-            # Get storage service
-            storage = get_storage()
-            
-            # Generate file path
-            file_path = f"onboarding/{new_hire.id}/{file.filename}"
-            
-            # Upload file
-            file_url = storage.upload_file(file, file_path)
+            # Store by content hash; size and type limits raise UploadRejected
+            stored = await FileService.store_upload(
+                db, file, OWNER_ONBOARDING_UPLOAD, new_hire.id, new_hire.company_id,
+                filename=safe_filename(file.filename)
+            )
             
-            return {
-                "success": True,
-                "file_url": file_url
-            }
+            return {"success": True, "data": OnboardingSessionService._upload_data(stored)}
+        except UploadRejected:
+            raise
         except Exception as e:
             return {"success": False, "error": f"File upload failed: {str(e)}"}
     
+    @staticmethod
+    def _upload_data(stored: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "file_id": str(stored["reference"].id),
+            "file_url": stored["file_url"],
+            "content_type": stored["blob"].content_type,
+            "size": stored["blob"].size
+        }
+    
+    @staticmethod
+    def create_signed_upload(db: Session, session_token: str, upload) -> Dict[str, Any]:
+        """Signed URL for uploading a file without streaming it through the API"""
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        
+        if not new_hire or new_hire.is_session_token_expired():
+            return {"success": False, "error": "Onboarding session not found"}
+        
+        return FileService.create_signed_upload(
+            OWNER_ONBOARDING_UPLOAD, new_hire.id, new_hire.company_id,
+            safe_filename(upload.filename), upload.content_type, upload.size, upload.sha256
+        )
+    
+    @staticmethod
+    async def complete_signed_upload(db: Session, session_token: str, upload_token: str) -> Dict[str, Any]:
+        """Record a file uploaded through a signed URL"""
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        
+        if not new_hire or new_hire.is_session_token_expired():
+            return {"success": False, "error": "Onboarding session not found"}
+        
+        stored = await FileService.complete_signed_upload(db, upload_token, OWNER_ONBOARDING_UPLOAD, new_hire.id)
+        if not stored["success"]:
+            return stored
+        return {"success": True, "data": OnboardingSessionService._upload_data(stored)}
+    
+    @staticmethod
+    def _resumable_status(upload, offset: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "upload_id": str(upload.id),
+            "offset": upload.received if offset is None else offset,
+            "size": upload.size,
+            "chunk_size": settings.resumable_chunk_max_size,
+            "expires_at": upload.expires_at
+        }
+    
+    @staticmethod
+    def _resolve_resumable_upload(db: Session, session_token: str, upload_id: str) -> Dict[str, Any]:
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        
+        if not new_hire or new_hire.is_session_token_expired():
+            return {"success": False, "error": "Onboarding session not found"}
+        
+        upload = FileService.get_resumable_upload(db, upload_id, OWNER_ONBOARDING_UPLOAD, new_hire.id)
+        if not upload:
+            return {"success": False, "error": "Upload not found"}
+        return {"success": True, "upload": upload}
+    
+    @staticmethod
+    def create_resumable_upload(db: Session, session_token: str, upload) -> Dict[str, Any]:
+        """Start a chunked upload that can resume after a dropped connection"""
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        
+        if not new_hire or new_hire.is_session_token_expired():
+            return {"success": False, "error": "Onboarding session not found"}
+        
+        result = FileService.create_resumable_upload(
+            db, OWNER_ONBOARDING_UPLOAD, new_hire.id, new_hire.company_id,
+            safe_filename(upload.filename), upload.content_type, upload.size, upload.sha256
+        )
+        if not result["success"]:
+            return result
+        return {"success": True, "data": OnboardingSessionService._resumable_status(result["upload"])}
+    
+    @staticmethod
+    def get_resumable_upload(db: Session, session_token: str, upload_id: str) -> Dict[str, Any]:
+        """Offset to resume a chunked upload from"""
+        result = OnboardingSessionService._resolve_resumable_upload(db, session_token, upload_id)
+        if not result["success"]:
+            return result
+        return {"success": True, "data": OnboardingSessionService._resumable_status(result["upload"])}
+    
+    @staticmethod
+    async def append_resumable_upload(
+        db: Session,
+        session_token: str,
+        upload_id: str,
+        offset: int,
+        body
+    ) -> Dict[str, Any]:
+        """Store the next chunk of a chunked upload"""
+        result = OnboardingSessionService._resolve_resumable_upload(db, session_token, upload_id)
+        if not result["success"]:
+            return result
+        
+        upload = result["upload"]
+        appended = await FileService.append_resumable_upload(db, upload, offset, body)
+        if not appended["success"]:
+            return appended
+        return {"success": True, "data": OnboardingSessionService._resumable_status(upload, appended["offset"])}
+    
+    @staticmethod
+    async def finalize_resumable_upload(db: Session, session_token: str, upload_id: str) -> Dict[str, Any]:
+        """Assemble a fully received chunked upload into a stored file"""
+        result = OnboardingSessionService._resolve_resumable_upload(db, session_token, upload_id)
+        if not result["success"]:
+            return result
+        
+        stored = await FileService.finalize_resumable_upload(db, result["upload"])
+        if not stored["success"]:
+            return stored
+        return {"success": True, "data": OnboardingSessionService._upload_data(stored)}
+    
+    @staticmethod
+    async def abort_resumable_upload(db: Session, session_token: str, upload_id: str) -> Dict[str, Any]:
+        """Discard a chunked upload and the chunks received so far"""
+        result = OnboardingSessionService._resolve_resumable_upload(db, session_token, upload_id)
+        if not result["success"]:
+            return result
+        
+        await FileService.abort_resumable_upload(db, result["upload"])
+        return {"success": True}
+    
+    @staticmethod
+    def get_upload_download_url(db: Session, session_token: str, file_id: str) -> Optional[Dict[str, Any]]:
+        """Signed download URL for one of the new hire's uploads"""
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
+        
+        if not new_hire or new_hire.is_session_token_expired():
+            return None
+        
+        return FileService.get_download_url(db, file_id, OWNER_ONBOARDING_UPLOAD, new_hire.id)
+    
     @staticmethod
     def complete_onboarding(db: Session, session_token: str) -> Dict[str, Any]:
         """Complete the entire onboarding process"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return {"success": False, "error": "Onboarding session not found"}
@@ -395,7 +595,7 @@ class OnboardingSessionService:
         """Get the ID of the current stage (first incomplete stage).
         Returns None when all stages are complete.
         """
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return None
@@ -414,7 +614,7 @@ class OnboardingSessionService:
     @staticmethod
     def renew_session_token(db: Session, session_token: str) -> Dict[str, Any]:
         """Renew an expired session token"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return {"success": False, "error": "Session not found"}
@@ -423,13 +623,9 @@ class OnboardingSessionService:
         if not new_hire.is_session_token_expired():
             return {"success": False, "error": "Token is not expired"}
         
-        # Generate new session token
-        new_session_token = secrets.token_urlsafe(32)
+        # Generate new session token; this also revokes the previous signed token
         new_expires_at = datetime.utcnow() + timedelta(days=7)  # 7 days expiration
-        
-        # Update new hire with new token
-        new_hire.session_token = new_session_token
-        new_hire.session_token_expires_at = new_expires_at
+        new_session_token = new_hire.issue_session_token(new_expires_at)
         new_hire.updated_at = datetime.utcnow()
         
         db.commit()
@@ -452,7 +648,7 @@ class OnboardingSessionService:
     @staticmethod
     def validate_session_token(db: Session, session_token: str) -> Dict[str, Any]:
         """Validate session token and return status"""
-        new_hire = db.query(NewHire).filter(NewHire.session_token == session_token).first()
+        new_hire = OnboardingSessionService.resolve_new_hire(db, session_token)
         
         if not new_hire:
             return {"valid": False, "error": "session_not_found"}
@@ -0,0 +1,107 @@
+"""
+Sparse ordering keys for stages and content blocks.
+
+Keys are spaced ORDER_GAP apart, so moving one item only rewrites its own key
+(a value between its new neighbours). A scope (the stages of a flow, the
+blocks of a stage) is renumbered in a single UPDATE ... CASE, when a full
+order is given or when two neighbours have no room left between them.
+"""
+from typing import Any, List, Optional
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+ORDER_GAP = 1024
+
+
+class OrderingService:
+    """Ordering keys of the rows of one scope, e.g. Stage.flow_id == flow_id"""
+
+    @staticmethod
+    def next_key(db: Session, column, scope) -> int:
+        """Key that places a new row after every existing one"""
+        return (db.scalar(select(func.max(column)).where(scope)) or 0) + ORDER_GAP
+
+    @staticmethod
+    def apply_order(db: Session, model, column, scope, ids: List[Any]) -> int:
+        """Give ids the keys ORDER_GAP, 2 * ORDER_GAP, ... in one statement; returns rows updated"""
+        if not ids:
+            return 0
+        keys = {item_id: position * ORDER_GAP for position, item_id in enumerate(ids, 1)}
+        return db.execute(
+            update(model)
+            .where(scope, model.id.in_(keys))
+            .values({column: case(keys, value=model.id)})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def merge_order(current: List[Any], requested: List[Any]) -> List[Any]:
+        """Requested ids first in the given order, then the others in their current order"""
+        known = set(current)
+        requested = [item_id for item_id in dict.fromkeys(requested) if item_id in known]
+        chosen = set(requested)
+        return requested + [item_id for item_id in current if item_id not in chosen]
+
+    @staticmethod
+    def current_order(db: Session, model, column, scope) -> List[Any]:
+        return list(db.scalars(select(model.id).where(scope).order_by(column, model.id)))
+
+    @staticmethod
+    def position(db: Session, model, column, scope, key: int, item_id) -> int:
+        """1-based place of the row (key, item_id) in the scope, ordered as current_order"""
+        before = or_(column < key, and_(column == key, model.id < item_id))
+        return db.scalar(select(func.count()).select_from(model).where(scope, before)) + 1
+
+    @staticmethod
+    def move(db: Session, model, column, scope, item_id, after_id=None) -> Optional[int]:
+        """Place item_id right after after_id (first when None) and return its new key.
+
+        Normally writes only the moved row; returns None when either row is
+        not in the scope. Does not commit.
+        """
+        wanted = [item_id] if after_id is None else [item_id, after_id]
+        found = dict(db.execute(select(model.id, column).where(scope, model.id.in_(wanted))).all())
+        if item_id not in found or (after_id is not None and after_id not in found) or item_id == after_id:
+            return None
+
+        key = found[item_id]
+        low = None if after_id is None else found[after_id]
+        others = select(model.id, column).where(scope, model.id != item_id)
+        if low is not None:
+            others = others.where(column >= low)
+        neighbours = db.execute(others.order_by(column, model.id).limit(2)).all()
+
+        high = None
+        room = True
+        if low is None:
+            high = neighbours[0][1] if neighbours else None
+        elif neighbours[0][0] != after_id or (len(neighbours) > 1 and neighbours[1][1] == low):
+            room = False  # another row shares the anchor's key
+        elif len(neighbours) > 1:
+            high = neighbours[1][1]
+
+        if room:
+            if (low is None or key > low) and (high is None or key < high):
+                return key  # already there
+            if low is None:
+                key = high - ORDER_GAP
+            elif high is None:
+                key = low + ORDER_GAP
+            elif high - low > 1:
+                key = (low + high) // 2
+            else:
+                room = False
+        if room:
+            db.execute(
+                update(model)
+                .where(model.id == item_id)
+                .values({column: key})
+                .execution_options(synchronize_session=False)
+            )
+            return key
+
+        # No room between the neighbours: renumber the scope
+        order = [other for other in OrderingService.current_order(db, model, column, scope) if other != item_id]
+        order.insert(0 if after_id is None else order.index(after_id) + 1, item_id)
+        OrderingService.apply_order(db, model, column, scope, order)
+        return (order.index(item_id) + 1) * ORDER_GAP
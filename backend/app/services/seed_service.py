@@ -0,0 +1,75 @@
+from typing import Dict, Any
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import hashlib
+import json
+from app.models.app_metadata import AppMetadata
+from app.services.content_type_service import ContentTypeService
+from app.services.stage_template_service import StageTemplateService
+
+SEED_FINGERPRINT_KEY = "seed_catalog_fingerprint"
+
+
+class SeedService:
+    """Service for seeding the built-in content type and stage template catalog"""
+    
+    @staticmethod
+    def catalog_fingerprint(content_types: list, stage_templates: list) -> str:
+        """Stable SHA-256 of the seed catalog"""
+        payload = json.dumps(
+            {"content_types": content_types, "stage_templates": stage_templates},
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def seed_catalog(db: Session) -> Dict[str, Any]:
+        """Seed the catalog only if it changed since the last successful seed.
+        
+        The common path is a single primary-key read. When the fingerprint
+        differs, the worker that wins the compare-and-set on the metadata row
+        runs the bulk upsert in the same transaction; concurrent workers see
+        the row already updated (or hit the primary key) and skip.
+        """
+        content_types = ContentTypeService.get_seed_data()
+        stage_templates = StageTemplateService.get_seed_data()
+        fingerprint = SeedService.catalog_fingerprint(content_types, stage_templates)
+        
+        stored = db.get(AppMetadata, SEED_FINGERPRINT_KEY)
+        if stored and stored.value == fingerprint:
+            return {"changed": False, "fingerprint": fingerprint}
+        
+        try:
+            if stored:
+                claimed = db.execute(
+                    update(AppMetadata)
+                    .where(AppMetadata.key == SEED_FINGERPRINT_KEY, AppMetadata.value == stored.value)
+                    .values(value=fingerprint)
+                    .execution_options(synchronize_session=False)
+                ).rowcount == 1
+                if not claimed:
+                    db.rollback()
+                    return {"changed": False, "fingerprint": fingerprint}
+            else:
+                db.add(AppMetadata(key=SEED_FINGERPRINT_KEY, value=fingerprint))
+                db.flush()
+            
+            content_type_counts = ContentTypeService.seed_content_types(db, content_types)
+            template_counts = StageTemplateService.seed_stage_templates(db, stage_templates)
+            db.commit()
+        except IntegrityError:
+            # Another worker seeded the same catalog concurrently
+            db.rollback()
+            return {"changed": False, "fingerprint": fingerprint}
+        except Exception:
+            db.rollback()
+            raise
+        
+        return {
+            "changed": True,
+            "fingerprint": fingerprint,
+            "content_types": content_type_counts,
+            "stage_templates": template_counts
+        }
@@ -1,4 +1,5 @@
 from typing import List, Optional, Dict, Any
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import uuid
 from app.models.stage_template import StageTemplate
@@ -9,8 +10,8 @@ class StageTemplateService:
     """Service for managing stage templates"""
     
     @staticmethod
-    def seed_stage_templates(db: Session) -> List[StageTemplate]:
-        """Seed the database with default stage templates"""
+    def get_seed_data() -> List[Dict[str, Any]]:
+        """Default stage template catalog"""
         templates_data = [
             {
                 "name": "Welcome Introduction",
@@ -554,18 +555,23 @@ class StageTemplateService:
                 }
             }
         ]
+        return templates_data
+    
+    @staticmethod
+    def seed_stage_templates(db: Session, seed_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+        """Bulk insert default stage templates that are missing by name (does not commit).
         
-        created_templates = []
-        for data in templates_data:
-            # Check if template already exists
-            existing = db.query(StageTemplate).filter(StageTemplate.name == data["name"]).first()
-            if not existing:
-                template = StageTemplate(**data)
-                db.add(template)
-                created_templates.append(template)
+        Existing templates are left alone since admins can edit them through the API.
+        """
+        seed_data = seed_data if seed_data is not None else StageTemplateService.get_seed_data()
         
-        db.commit()
-        return created_templates
+        existing_names = {name for (name,) in db.query(StageTemplate.name).all()}
+        to_insert = [data for data in seed_data if data["name"] not in existing_names]
+        
+        if to_insert:
+            db.execute(insert(StageTemplate), to_insert)
+        
+        return {"created": len(to_insert), "updated": 0}
     
     @staticmethod
     def get_all_templates(db: Session, public_only: bool = True) -> List[StageTemplate]:
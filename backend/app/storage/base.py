@@ -1,16 +1,207 @@
 from abc import ABC, abstractmethod
-from typing import Optional, BinaryIO
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, BinaryIO
 from pathlib import Path
+import inspect
+import mimetypes
+from starlette.concurrency import run_in_threadpool
+
+
+class StorageError(Exception):
+    """Base class for storage failures"""
+    pass
+
+
+class UploadRejected(StorageError):
+    """The upload breaks a limit; carries the HTTP status to answer with"""
+    status_code = 400
+
+
+class FileTooLarge(UploadRejected):
+    status_code = 413
+
+
+class FileTypeNotAllowed(UploadRejected):
+    status_code = 415
+
+
+class UploadNotAuthorized(UploadRejected):
+    status_code = 403
+
+
+async def iter_chunks(file_data: Any, chunk_size: int) -> AsyncIterator[bytes]:
+    """Read an UploadFile (async read), a plain binary file or a request body stream in chunks without blocking the loop"""
+    if hasattr(file_data, "__aiter__"):
+        # Body streams arrive in arbitrary pieces; regroup so the first chunk
+        # is large enough to sniff the content type
+        buffer = bytearray()
+        async for piece in file_data:
+            buffer += piece
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+        return
+    
+    read = file_data.read
+    is_async = inspect.iscoroutinefunction(read)  # UploadFile
+    while True:
+        chunk = await read(chunk_size) if is_async else await run_in_threadpool(read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def safe_filename(filename: Optional[str], default: str = "upload") -> str:
+    """Strip directories from a client-supplied filename"""
+    name = Path((filename or "").replace("\\", "/")).name
+    return name if name not in ("", ".", "..") else default
+
+
+class StoredBlob(NamedTuple):
+    digest: str  # SHA-256 hex of the content
+    size: int
+    content_type: Optional[str]
+    path: str  # storage path, see blob_path
+    created: bool  # False when an identical blob was already stored
+
+
+# Called with the digest of a blob that is already stored: True if that copy
+# may be kept, False to write it again (e.g. its row was garbage collected)
+ReuseCheck = Callable[[str], Awaitable[bool]]
+
+
+class StoredFile(NamedTuple):
+    path: str
+    size: int
+    modified_at: float  # unix seconds
+
+
+def blob_path(digest: str, content_type: Optional[str] = None) -> str:
+    """Storage path of a content-addressed blob; the extension keeps static serving types right"""
+    extension = mimetypes.guess_extension(content_type or "") or ""
+    if extension == ".jpe":
+        extension = ".jpg"
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
 
 
 class StorageInterface(ABC):
     """Abstract base class for file storage implementations"""
     
     @abstractmethod
-    async def upload_file(self, file_data: BinaryIO, filename: str, folder: str = "") -> str:
-        """Upload a file and return the URL/path"""
+    async def upload_file(
+        self,
+        file_data: BinaryIO,
+        filename: str,
+        folder: str = "",
+        content_type: Optional[str] = None
+    ) -> str:
+        """Upload a file and return its storage path.
+        
+        file_data may be an UploadFile or a binary file object; it is read in
+        chunks. Raises FileTooLarge / FileTypeNotAllowed (see
+        app.storage.validation) without leaving a partial file behind.
+        """
+        pass
+    
+    @abstractmethod
+    async def store_blob(
+        self,
+        file_data: BinaryIO,
+        content_type: Optional[str] = None,
+        allowed_types: Optional[List[str]] = None,
+        max_size: Optional[int] = None,
+        reuse_existing: Optional[ReuseCheck] = None
+    ) -> StoredBlob:
+        """Store a file under its content hash (see blob_path), once per distinct content.
+        
+        Validated and hashed while streaming like upload_file; allowed_types
+        and max_size override ALLOWED_FILE_TYPES and MAX_FILE_SIZE (files the
+        server generates itself, signed uploads of a declared size).
+        Blobs are immutable; when the content is already stored the new copy
+        is discarded, unless reuse_existing says the stored one may be
+        deleted and the file is written again.
+        """
+        pass
+    
+    @abstractmethod
+    async def write_part(self, file_path: str, file_data: Any, max_size: int) -> int:
+        """Store raw bytes, e.g. one chunk of a resumable upload; returns the size.
+        
+        No type checks (the assembled file is validated). Raises FileTooLarge
+        past max_size without leaving a partial file.
+        """
+        pass
+    
+    @abstractmethod
+    async def list_files(self, prefix: str = "") -> List[str]:
+        """Storage paths under a prefix"""
         pass
     
+    @abstractmethod
+    async def scan_files(self, start_after: str = "", limit: int = 1000) -> List[StoredFile]:
+        """Up to limit stored files whose paths sort after start_after, in path order.
+        
+        Unlike list_files this includes leftovers of interrupted uploads, and
+        a full pass can be split into pages that each hold limit entries.
+        """
+        pass
+    
+    @abstractmethod
+    async def file_size(self, file_path: str) -> Optional[int]:
+        """Size in bytes of a stored file, None if it does not exist"""
+        pass
+    
+    async def promote_blob(
+        self,
+        staging_path: str,
+        digest: str,
+        content_type: str,
+        max_size: int,
+        reuse_existing: Optional[ReuseCheck] = None
+    ) -> Optional[StoredBlob]:
+        """Move a file a client uploaded to staging_path into the blob store.
+        
+        The content must hash to digest (UploadRejected otherwise); the
+        staged file is removed either way. None when nothing was uploaded.
+        Backends that verify checksums on upload can avoid re-reading it.
+        """
+        source = await self.download_file(staging_path)
+        if source is None:
+            return None
+        try:
+            blob = await self.store_blob(
+                source, content_type, allowed_types=[content_type], max_size=max_size, reuse_existing=reuse_existing
+            )
+        finally:
+            source.close()
+            await self.delete_file(staging_path)
+        if blob.digest != digest:
+            if blob.created:
+                await self.delete_file(blob.path)
+            raise UploadRejected("Upload does not match the signed size or checksum")
+        return blob
+    
+    def presign_upload(
+        self,
+        file_path: str,
+        content_type: str,
+        size: int,
+        sha256: str,
+        expires_in: int
+    ) -> Optional[Dict[str, Any]]:
+        """Let a client PUT a file straight into storage.
+        
+        Returns {"url", "method", "headers"}; the storage verifies the size
+        and SHA-256 (base64) itself. None when the backend has no native
+        signed uploads and clients use the /files/uploads endpoint instead.
+        """
+        return None
+    
+    def presign_download(self, file_path: str, expires_in: int) -> Optional[str]:
+        """Native signed download URL, or None when files are served by /files"""
+        return None
+    
     @abstractmethod
     async def download_file(self, file_path: str) -> Optional[BinaryIO]:
         """Download a file and return file-like object"""
@@ -29,4 +220,4 @@ class StorageInterface(ABC):
     @abstractmethod
     def get_file_url(self, file_path: str) -> str:
         """Get the public URL for a file"""
-        pass 
\ No newline at end of file
+        pass
@@ -1,16 +1,21 @@
+from typing import Optional
 from app.config import settings
 from app.storage.local import LocalStorage
 from app.storage.base import StorageInterface
 
+# The S3 client holds a connection pool, so it is shared by all requests
+_s3_storage: Optional[StorageInterface] = None
+
 
 def get_storage() -> StorageInterface:
     """Get the appropriate storage backend based on configuration"""
+    global _s3_storage
     if settings.file_storage_type == "local":
         return LocalStorage()
     elif settings.file_storage_type == "s3":
-        # TODO: Implement S3 storage
-        # from app.storage.s3 import S3Storage
-        # return S3Storage()
-        raise NotImplementedError("S3 storage not yet implemented")
+        if _s3_storage is None:
+            from app.storage.s3 import S3Storage
+            _s3_storage = S3Storage()
+        return _s3_storage
     else:
-        raise ValueError(f"Unsupported storage type: {settings.file_storage_type}") 
\ No newline at end of file
+        raise ValueError(f"Unsupported storage type: {settings.file_storage_type}")
@@ -0,0 +1,46 @@
+"""
+Image variant rendering.
+
+Runs in worker processes (see app.services.image_service), so this module
+only depends on Pillow and must stay cheap to import.
+"""
+from typing import Dict, NamedTuple, Tuple
+import io
+from PIL import Image, ImageOps
+
+# Refuse decompression bombs well before they exhaust a worker's memory
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+RESIZABLE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+VARIANT_CONTENT_TYPE = "image/webp"
+
+
+class RenderedVariant(NamedTuple):
+    data: bytes
+    width: int
+    height: int
+
+
+def render_variants(data: bytes, boxes: Dict[str, Tuple[int, int]], quality: int = 80) -> Dict[str, RenderedVariant]:
+    """Resize an image to fit each (width, height) box and encode it as WebP.
+
+    Images are never upscaled, so a small source yields variants at its own
+    size. EXIF orientation is applied first; animated images keep their first
+    frame.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.seek(0)
+        source = ImageOps.exif_transpose(image)
+        has_alpha = source.mode in ("RGBA", "LA", "PA") or (
+            source.mode == "P" and "transparency" in source.info
+        )
+        source = source.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for name, (width, height) in boxes.items():
+        resized = source.copy()
+        resized.thumbnail((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, format="WEBP", quality=quality, method=4)
+        variants[name] = RenderedVariant(output.getvalue(), resized.width, resized.height)
+    return variants
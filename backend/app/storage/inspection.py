@@ -0,0 +1,97 @@
+"""
+Content inspection of stored files: real type, checksum and metadata.
+
+Runs off the request path (see app.services.inspection_service). The file is
+read once, in chunks: it is hashed, its first bytes are sniffed with
+libmagic (python-magic, falling back to the upload signatures when it is not
+installed) and image dimensions or PDF page counts are extracted on the way.
+"""
+from typing import Any, BinaryIO, Dict, Optional
+import hashlib
+import io
+import re
+from PIL import Image
+from app.storage.validation import sniff_content_type
+
+try:
+    import magic
+except ImportError:  # optional dependency, needs libmagic
+    magic = None
+
+# Bytes kept for type sniffing and image headers
+HEAD_SIZE = 64 * 1024
+
+# Page tree root: /Type /Pages ... /Count N, in either order
+_PDF_PAGE_COUNT = re.compile(
+    rb"/Type\s*/Pages\b[^>]{0,4096}?/Count\s+(\d+)|/Count\s+(\d+)[^>]{0,4096}?/Type\s*/Pages\b"
+)
+# Page objects, for files whose page tree is not readable
+_PDF_PAGE = re.compile(rb"/Type\s*/Page\b")
+_PDF_OVERLAP = 8192  # longer than any match
+
+
+def detect_content_type(head: bytes) -> Optional[str]:
+    """MIME type recognized from the first bytes of a file"""
+    if magic is not None:
+        try:
+            return magic.from_buffer(head, mime=True)
+        except Exception:
+            pass
+    return sniff_content_type(head[:16])
+
+
+def _image_size(head: bytes) -> Optional[Dict[str, int]]:
+    try:
+        with Image.open(io.BytesIO(head)) as image:
+            width, height = image.size
+    except Exception:
+        return None  # header beyond HEAD_SIZE or not an image Pillow reads
+    return {"width": width, "height": height}
+
+
+def inspect_file(source: BinaryIO, chunk_size: int) -> Dict[str, Any]:
+    """Inspect a stored file (blocking; run in the threadpool).
+
+    Returns detected_type, size and sha256, plus width/height for images
+    and pages for PDFs when they can be read.
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    head = bytearray()
+    is_pdf = False
+    tail = b""
+    page_count: Optional[int] = None
+    page_objects = 0
+
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        sha256.update(chunk)
+        size += len(chunk)
+        if len(head) < HEAD_SIZE:
+            head += chunk[:HEAD_SIZE - len(head)]
+            is_pdf = head.startswith(b"%PDF-")
+        if is_pdf:
+            window = tail + chunk
+            for match in _PDF_PAGE_COUNT.finditer(window):
+                if match.end() > len(tail):  # matches inside the tail were seen already
+                    count = int(match.group(1) or match.group(2))
+                    page_count = max(page_count or 0, count)
+            page_objects += sum(1 for match in _PDF_PAGE.finditer(window) if match.end() > len(tail))
+            tail = window[-_PDF_OVERLAP:]
+
+    head = bytes(head)
+    result: Dict[str, Any] = {
+        "detected_type": detect_content_type(head),
+        "size": size,
+        "sha256": sha256.hexdigest(),
+    }
+    if (result["detected_type"] or "").startswith("image/"):
+        dimensions = _image_size(head)
+        if dimensions:
+            result.update(dimensions)
+    if is_pdf:
+        # Object streams (PDF 1.5+) can hide both; None when nothing was found
+        result["pages"] = page_count or page_objects or None
+    return result
@@ -1,37 +1,220 @@
 import os
-import shutil
-from typing import Optional, BinaryIO
+import tempfile
+from typing import Any, List, Optional, BinaryIO
 from pathlib import Path
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
-from app.storage.base import StorageInterface
+from app.storage.base import (
+    FileTooLarge,
+    ReuseCheck,
+    StorageError,
+    StorageInterface,
+    StoredBlob,
+    StoredFile,
+    blob_path,
+    iter_chunks,
+    safe_filename
+)
+from app.storage.validation import UploadValidator
+
+
+def _write_chunk(fd: int, chunk: bytes) -> None:
+    view = memoryview(chunk)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _discard(fd: int, temp_path: str) -> None:
+    try:
+        os.close(fd)
+    except OSError:
+        pass  # already closed by _commit
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _commit(fd: int, temp_path: str, file_path: Path) -> None:
+    os.fsync(fd)
+    os.close(fd)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, file_path)
 
 
 class LocalStorage(StorageInterface):
     """Local file storage implementation"""
     
     def __init__(self):
-        self.base_path = Path(settings.local_storage_path)
+        self.base_path = Path(settings.local_storage_path).resolve()
         self.base_path.mkdir(parents=True, exist_ok=True)
     
-    async def upload_file(self, file_data: BinaryIO, filename: str, folder: str = "") -> str:
-        """Upload a file to local storage"""
-        # Create folder path
-        folder_path = self.base_path / folder
-        folder_path.mkdir(parents=True, exist_ok=True)
+    def _full_path(self, file_path: str) -> Path:
+        full_path = (self.base_path / file_path).resolve()
+        if full_path != self.base_path and self.base_path not in full_path.parents:
+            raise StorageError(f"Path escapes storage root: {file_path}")
+        return full_path
+    
+    async def _stream_to_temp(
+        self,
+        file_data: Any,
+        directory: Path,
+        content_type: Optional[str],
+        allowed_types: Optional[List[str]] = None,
+        max_size: Optional[int] = None
+    ):
+        """Validate, hash and write an upload to a temp file in directory.
+        
+        Returns (fd, temp_path, validator); the caller commits or discards.
+        """
+        validator = UploadValidator(
+            content_type or getattr(file_data, "content_type", None),
+            max_size=max_size,
+            allowed_types=allowed_types,
+            declared_size=getattr(file_data, "size", None)
+        )
+        await run_in_threadpool(directory.mkdir, parents=True, exist_ok=True)
+        fd, temp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-")
         
-        # Create full file path
-        file_path = folder_path / filename
+        try:
+            async for chunk in iter_chunks(file_data, settings.upload_chunk_size):
+                validator.feed(chunk)
+                await run_in_threadpool(_write_chunk, fd, chunk)
+            if validator.size == 0:
+                validator.feed(b"")  # empty files still need a type check
+        except BaseException:
+            await run_in_threadpool(_discard, fd, temp_path)
+            raise
+        return fd, temp_path, validator
+    
+    async def upload_file(
+        self,
+        file_data: BinaryIO,
+        filename: str,
+        folder: str = "",
+        content_type: Optional[str] = None
+    ) -> str:
+        """Stream a file to local storage.
         
-        # Save file
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file_data, f)
+        Chunks are written from the threadpool to a temp file in the target
+        folder, which is renamed into place only once the whole upload passed
+        validation, so readers never see a partial file.
+        """
+        file_path = self._full_path(os.path.join(folder, safe_filename(filename)))
+        fd, temp_path, _ = await self._stream_to_temp(file_data, file_path.parent, content_type)
+        try:
+            await run_in_threadpool(_commit, fd, temp_path, file_path)
+        except BaseException:
+            await run_in_threadpool(_discard, fd, temp_path)
+            raise
         
         # Return relative path
         return str(file_path.relative_to(self.base_path))
     
+    async def store_blob(
+        self,
+        file_data: BinaryIO,
+        content_type: Optional[str] = None,
+        allowed_types: Optional[List[str]] = None,
+        max_size: Optional[int] = None,
+        reuse_existing: Optional[ReuseCheck] = None
+    ) -> StoredBlob:
+        """Stream a file into the blob store, keeping one copy per digest"""
+        fd, temp_path, validator = await self._stream_to_temp(
+            file_data, self.base_path / "blobs", content_type, allowed_types, max_size
+        )
+        path = blob_path(validator.digest, validator.content_type)
+        file_path = self._full_path(path)
+        try:
+            created = not await run_in_threadpool(file_path.exists)
+            if not created and reuse_existing is not None:
+                # Renaming over the old copy is atomic, so readers never miss it
+                created = not await reuse_existing(validator.digest)
+            if created:
+                await run_in_threadpool(file_path.parent.mkdir, parents=True, exist_ok=True)
+                await run_in_threadpool(_commit, fd, temp_path, file_path)
+            else:
+                await run_in_threadpool(_discard, fd, temp_path)
+        except BaseException:
+            await run_in_threadpool(_discard, fd, temp_path)
+            raise
+        return StoredBlob(validator.digest, validator.size, validator.content_type, path, created)
+    
+    async def write_part(self, file_path: str, file_data: Any, max_size: int) -> int:
+        """Stream raw bytes to a file, renamed into place once complete"""
+        target = self._full_path(file_path)
+        await run_in_threadpool(target.parent.mkdir, parents=True, exist_ok=True)
+        fd, temp_path = await run_in_threadpool(tempfile.mkstemp, dir=target.parent, prefix=".upload-")
+        size = 0
+        try:
+            async for chunk in iter_chunks(file_data, settings.upload_chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLarge(f"Part exceeds the {max_size} byte limit")
+                await run_in_threadpool(_write_chunk, fd, chunk)
+            await run_in_threadpool(_commit, fd, temp_path, target)
+        except BaseException:
+            await run_in_threadpool(_discard, fd, temp_path)
+            raise
+        return size
+    
+    async def list_files(self, prefix: str = "") -> List[str]:
+        """Storage paths under a prefix, skipping in-progress temp files"""
+        def _walk() -> List[str]:
+            root = self._full_path(prefix)
+            if not root.is_dir():
+                return []
+            return sorted(
+                str(path.relative_to(self.base_path))
+                for path in root.rglob("*")
+                if path.is_file() and not path.name.startswith(".upload-")
+            )
+        return await run_in_threadpool(_walk)
+    
+    async def scan_files(self, start_after: str = "", limit: int = 1000) -> List[StoredFile]:
+        """Stored files after start_after in path order, skipping directories that sort before it"""
+        def _scan() -> List[StoredFile]:
+            found: List[StoredFile] = []
+            
+            def _walk(directory: Path, relative: str) -> None:
+                try:
+                    entries = list(os.scandir(directory))
+                except FileNotFoundError:
+                    return
+                # "a/b-c" sorts before "a/b/c": order directories by name + "/"
+                entries.sort(key=lambda entry: entry.name + ("/" if entry.is_dir(follow_symlinks=False) else ""))
+                for entry in entries:
+                    if len(found) >= limit:
+                        return
+                    path = relative + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        subtree = path + "/"
+                        if start_after < subtree or start_after.startswith(subtree):
+                            _walk(Path(entry.path), subtree)
+                    elif entry.is_file(follow_symlinks=False) and path > start_after:
+                        stat_result = entry.stat(follow_symlinks=False)
+                        found.append(StoredFile(path, stat_result.st_size, stat_result.st_mtime))
+            
+            _walk(self.base_path, "")
+            return found
+        return await run_in_threadpool(_scan)
+    
+    def local_path(self, file_path: str) -> Path:
+        """Filesystem path of a stored file, for serving it directly"""
+        return self._full_path(file_path)
+    
+    async def file_size(self, file_path: str) -> Optional[int]:
+        """Size of a stored file, None if it does not exist"""
+        full_path = self._full_path(file_path)
+        try:
+            return (await run_in_threadpool(full_path.stat)).st_size
+        except FileNotFoundError:
+            return None
+    
     async def download_file(self, file_path: str) -> Optional[BinaryIO]:
         """Download a file from local storage"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         
         if not full_path.exists():
             return None
@@ -40,7 +223,7 @@ class LocalStorage(StorageInterface):
     
     async def delete_file(self, file_path: str) -> bool:
         """Delete a file from local storage"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         
         if full_path.exists():
             full_path.unlink()
@@ -49,10 +232,10 @@ class LocalStorage(StorageInterface):
     
     async def file_exists(self, file_path: str) -> bool:
         """Check if a file exists in local storage"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         return full_path.exists()
     
     def get_file_url(self, file_path: str) -> str:
         """Get the local file URL (for development)"""
         # In production, this would be a CDN or static file server URL
-        return f"/files/{file_path}" 
\ No newline at end of file
+        return f"/files/{file_path}"
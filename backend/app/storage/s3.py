@@ -0,0 +1,342 @@
+from typing import Any, Dict, List, Optional, BinaryIO
+import base64
+import uuid
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.storage.base import (
+    FileTooLarge,
+    ReuseCheck,
+    StorageError,
+    StorageInterface,
+    StoredBlob,
+    StoredFile,
+    UploadRejected,
+    blob_path,
+    iter_chunks,
+    safe_filename
+)
+from app.storage.validation import UploadValidator
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # optional dependency
+    boto3 = None
+
+# S3 rejects multipart parts smaller than this (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3Storage(StorageInterface):
+    """S3-compatible storage (AWS, MinIO, ...).
+    
+    One boto3 client per process with a connection pool of
+    S3_MAX_POOL_CONNECTIONS; boto3 calls are blocking and run in the
+    threadpool. Uploads up to S3_MULTIPART_CHUNK_SIZE are a single PUT;
+    larger ones are sent as a multipart upload while they are still being
+    read, and aborted if validation fails midway.
+    """
+    
+    def __init__(self):
+        if boto3 is None:
+            raise StorageError("The boto3 package is required for FILE_STORAGE_TYPE=s3")
+        if not settings.s3_bucket:
+            raise StorageError("S3_BUCKET must be set for FILE_STORAGE_TYPE=s3")
+        
+        self.bucket = settings.s3_bucket
+        self.part_size = max(MIN_PART_SIZE, settings.s3_multipart_chunk_size)
+        self.client = boto3.session.Session().client(
+            "s3",
+            endpoint_url=settings.s3_endpoint_url,
+            region_name=settings.s3_region,
+            aws_access_key_id=settings.s3_access_key,
+            aws_secret_access_key=settings.s3_secret_key,
+            config=BotoConfig(
+                max_pool_connections=settings.s3_max_pool_connections,
+                signature_version="s3v4",  # presigned URLs sign the checksum header
+                retries={"max_attempts": 3, "mode": "standard"}
+            )
+        )
+    
+    async def _stream_upload(
+        self,
+        file_data: Any,
+        content_type: Optional[str],
+        key: Optional[str],
+        allowed_types: Optional[List[str]] = None,
+        max_size: Optional[int] = None,
+        reuse_existing: Optional[ReuseCheck] = None
+    ):
+        """Validate, hash and upload a file; returns (stored key, validator, created).
+        
+        With key=None the object is content-addressed: a file that fits in one
+        part is PUT straight to its blob key (skipped when that blob exists
+        and reuse_existing agrees), a larger one goes to a temporary key the
+        caller moves into place.
+        """
+        content_type = content_type or getattr(file_data, "content_type", None)
+        validator = UploadValidator(
+            content_type,
+            max_size=max_size,
+            allowed_types=allowed_types,
+            declared_size=getattr(file_data, "size", None)
+        )
+        
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        multipart_key = key or f"tmp/{uuid.uuid4().hex}"
+        parts: List[dict] = []
+        try:
+            async for chunk in iter_chunks(file_data, settings.upload_chunk_size):
+                validator.feed(chunk)
+                buffer += chunk
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = await self._create_multipart(multipart_key, validator.content_type)
+                    parts.append(await self._upload_part(multipart_key, upload_id, len(parts) + 1, bytes(buffer)))
+                    buffer.clear()
+            if validator.size == 0:
+                validator.feed(b"")  # empty files still need a type check
+            
+            if upload_id is None:
+                key = key or blob_path(validator.digest, validator.content_type)
+                if key.startswith("blobs/") and await self._reusable(key, validator.digest, reuse_existing):
+                    return key, validator, False  # already stored
+                await run_in_threadpool(
+                    self.client.put_object,
+                    Bucket=self.bucket, Key=key, Body=bytes(buffer), ContentType=validator.content_type,
+                    **self._object_args(key)
+                )
+                return key, validator, True
+            
+            if buffer:
+                parts.append(await self._upload_part(multipart_key, upload_id, len(parts) + 1, bytes(buffer)))
+            await run_in_threadpool(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket, Key=multipart_key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+            return multipart_key, validator, True
+        except BaseException:
+            if upload_id is not None:
+                await run_in_threadpool(
+                    self.client.abort_multipart_upload, Bucket=self.bucket, Key=multipart_key, UploadId=upload_id
+                )
+            raise
+    
+    async def _reusable(self, key: str, digest: str, reuse_existing: Optional[ReuseCheck]) -> bool:
+        """Whether the blob at key exists and may be kept instead of written again"""
+        if await run_in_threadpool(self._head, key) is None:
+            return False
+        return reuse_existing is None or await reuse_existing(digest)
+    
+    @staticmethod
+    def _object_args(key: str) -> dict:
+        # Blobs never change, so caches may keep them forever
+        return {"CacheControl": "public, max-age=31536000, immutable"} if key.startswith("blobs/") else {}
+    
+    async def upload_file(
+        self,
+        file_data: BinaryIO,
+        filename: str,
+        folder: str = "",
+        content_type: Optional[str] = None
+    ) -> str:
+        """Stream a file to S3, as a multipart upload when it is large"""
+        key = "/".join(part.strip("/") for part in (folder, safe_filename(filename)) if part)
+        stored_key, _, _ = await self._stream_upload(file_data, content_type, key)
+        return stored_key
+    
+    async def store_blob(
+        self,
+        file_data: BinaryIO,
+        content_type: Optional[str] = None,
+        allowed_types: Optional[List[str]] = None,
+        max_size: Optional[int] = None,
+        reuse_existing: Optional[ReuseCheck] = None
+    ) -> StoredBlob:
+        """Stream a file into the blob store, keeping one copy per digest"""
+        stored_key, validator, created = await self._stream_upload(
+            file_data, content_type, None, allowed_types, max_size, reuse_existing
+        )
+        path = blob_path(validator.digest, validator.content_type)
+        if stored_key != path:
+            # Multipart uploads land on a temporary key; copy server-side
+            try:
+                if not await self._reusable(path, validator.digest, reuse_existing):
+                    await run_in_threadpool(
+                        self.client.copy_object,
+                        Bucket=self.bucket, Key=path, CopySource={"Bucket": self.bucket, "Key": stored_key},
+                        ContentType=validator.content_type, MetadataDirective="REPLACE",
+                        **self._object_args(path)
+                    )
+                else:
+                    created = False
+            finally:
+                await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=stored_key)
+        return StoredBlob(validator.digest, validator.size, validator.content_type, path, created)
+    
+    async def write_part(self, file_path: str, file_data: Any, max_size: int) -> int:
+        """Buffer a part (at most max_size bytes) and PUT it as one object"""
+        buffer = bytearray()
+        async for chunk in iter_chunks(file_data, settings.upload_chunk_size):
+            buffer += chunk
+            if len(buffer) > max_size:
+                raise FileTooLarge(f"Part exceeds the {max_size} byte limit")
+        await run_in_threadpool(self.client.put_object, Bucket=self.bucket, Key=file_path, Body=bytes(buffer))
+        return len(buffer)
+    
+    async def list_files(self, prefix: str = "") -> List[str]:
+        """Object keys under a prefix"""
+        def _list() -> List[str]:
+            paginator = self.client.get_paginator("list_objects_v2")
+            return [
+                item["Key"]
+                for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+                for item in page.get("Contents", [])
+            ]
+        return await run_in_threadpool(_list)
+    
+    async def scan_files(self, start_after: str = "", limit: int = 1000) -> List[StoredFile]:
+        """Objects after start_after in key order; one ListObjectsV2 page per 1000"""
+        def _scan() -> List[StoredFile]:
+            found: List[StoredFile] = []
+            cursor = start_after
+            while len(found) < limit:
+                response = self.client.list_objects_v2(
+                    Bucket=self.bucket, StartAfter=cursor, MaxKeys=min(1000, limit - len(found))
+                )
+                contents = response.get("Contents", [])
+                found.extend(
+                    StoredFile(item["Key"], item["Size"], item["LastModified"].timestamp())
+                    for item in contents
+                )
+                if not contents or not response.get("IsTruncated"):
+                    break
+                cursor = contents[-1]["Key"]
+            return found
+        return await run_in_threadpool(_scan)
+    
+    async def _create_multipart(self, key: str, content_type: Optional[str]) -> str:
+        response = await run_in_threadpool(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, ContentType=content_type
+        )
+        return response["UploadId"]
+    
+    async def _upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        response = await run_in_threadpool(
+            self.client.upload_part,
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+    
+    def _head(self, file_path: str, checksum: bool = False) -> Optional[dict]:
+        try:
+            if checksum:
+                return self.client.head_object(Bucket=self.bucket, Key=file_path, ChecksumMode="ENABLED")
+            return self.client.head_object(Bucket=self.bucket, Key=file_path)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+    
+    async def download_file(self, file_path: str) -> Optional[BinaryIO]:
+        """Download a file from S3 as a streaming body"""
+        def _get() -> Optional[Any]:
+            try:
+                return self.client.get_object(Bucket=self.bucket, Key=file_path)["Body"]
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                    return None
+                raise
+        return await run_in_threadpool(_get)
+    
+    async def delete_file(self, file_path: str) -> bool:
+        """Delete a file from S3"""
+        if await run_in_threadpool(self._head, file_path) is None:
+            return False
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=file_path)
+        return True
+    
+    async def file_exists(self, file_path: str) -> bool:
+        """Check if a file exists in S3"""
+        return await run_in_threadpool(self._head, file_path) is not None
+    
+    async def file_size(self, file_path: str) -> Optional[int]:
+        """Size of an object, None if it does not exist"""
+        head = await run_in_threadpool(self._head, file_path)
+        return None if head is None else head["ContentLength"]
+    
+    async def promote_blob(
+        self,
+        staging_path: str,
+        digest: str,
+        content_type: str,
+        max_size: int,
+        reuse_existing: Optional[ReuseCheck] = None
+    ) -> Optional[StoredBlob]:
+        """Server-side copy of a staged object whose SHA-256, verified by S3 on upload, is digest"""
+        head = await run_in_threadpool(self._head, staging_path, True)
+        if head is None:
+            return None
+        checksum = head.get("ChecksumSHA256")
+        if not checksum or "-" in checksum:
+            # No full-object checksum stored: hash it ourselves
+            return await super().promote_blob(staging_path, digest, content_type, max_size, reuse_existing)
+        
+        path = blob_path(digest, content_type)
+        try:
+            if base64.b64decode(checksum).hex() != digest or head["ContentLength"] > max_size:
+                raise UploadRejected("Upload does not match the signed size or checksum")
+            created = not await self._reusable(path, digest, reuse_existing)
+            if created:
+                await run_in_threadpool(
+                    self.client.copy_object,
+                    Bucket=self.bucket, Key=path, CopySource={"Bucket": self.bucket, "Key": staging_path},
+                    ContentType=content_type, MetadataDirective="REPLACE",
+                    **self._object_args(path)
+                )
+        finally:
+            await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=staging_path)
+        return StoredBlob(digest, head["ContentLength"], content_type, path, created)
+    
+    def presign_upload(
+        self,
+        file_path: str,
+        content_type: str,
+        size: int,
+        sha256: str,
+        expires_in: int
+    ) -> Optional[Dict[str, Any]]:
+        """Presigned PUT; S3 rejects a body whose length or SHA-256 differ from the signed ones"""
+        object_args = self._object_args(file_path)
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": file_path,
+                "ContentType": content_type,
+                "ContentLength": size,
+                "ChecksumSHA256": sha256,
+                **object_args
+            },
+            ExpiresIn=expires_in
+        )
+        headers = {"Content-Type": content_type, "x-amz-checksum-sha256": sha256}
+        if "CacheControl" in object_args:
+            headers["Cache-Control"] = object_args["CacheControl"]
+        return {"url": url, "method": "PUT", "headers": headers}
+    
+    def presign_download(self, file_path: str, expires_in: int) -> Optional[str]:
+        """Presigned GET, for buckets that are not publicly readable"""
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": file_path}, ExpiresIn=expires_in
+        )
+    
+    def get_file_url(self, file_path: str) -> str:
+        """Get the public URL for a file"""
+        if settings.s3_public_url:
+            return f"{settings.s3_public_url.rstrip('/')}/{file_path}"
+        if settings.s3_endpoint_url:
+            return f"{settings.s3_endpoint_url.rstrip('/')}/{self.bucket}/{file_path}"
+        return f"https://{self.bucket}.s3.{settings.s3_region or 'us-east-1'}.amazonaws.com/{file_path}"
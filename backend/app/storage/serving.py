@@ -0,0 +1,138 @@
+"""
+HTTP responses for stored files: validators, caching and byte ranges.
+
+Full responses go through FileResponse, which hands the file to the server
+(`http.response.pathsend`) where supported, or to a reverse proxy with
+FILE_SENDFILE_HEADER (nginx X-Accel-Redirect / X-Sendfile) so the worker
+never copies the body. Single byte ranges are answered here so audio and
+video can seek; multi-range requests get the whole file.
+"""
+from email.utils import formatdate
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+import os
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+
+# Content-addressed files never change
+CACHE_IMMUTABLE = "max-age=31536000, immutable"
+# Files stored by name may be overwritten; revalidate with the ETag
+CACHE_REVALIDATE = "no-cache"
+
+_RANGE_CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Validator for a file stored by name"""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match uses"""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(first, last) byte of a single `bytes=` range; None to serve the whole file"""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+async def _iter_range(path: Path, start: int, length: int) -> AsyncIterator[bytes]:
+    handle = await run_in_threadpool(open, path, "rb")
+    try:
+        await run_in_threadpool(handle.seek, start)
+        while length > 0:
+            chunk = await run_in_threadpool(handle.read, min(_RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        await run_in_threadpool(handle.close)
+
+
+def _sendfile_headers(path: Path, storage_path: str) -> Dict[str, str]:
+    header = settings.file_sendfile_header
+    if header.lower() == "x-accel-redirect":
+        return {header: settings.file_sendfile_prefix.rstrip("/") + "/" + storage_path}
+    return {header: str(path)}
+
+
+def file_response(
+    request: Request,
+    path: Path,
+    storage_path: str,
+    stat_result: os.stat_result,
+    content_type: Optional[str],
+    etag: str,
+    cache_control: str
+) -> Response:
+    """Response for a stored file honouring If-None-Match, Range and If-Range"""
+    size = stat_result.st_size
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    content_type = content_type or "application/octet-stream"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if settings.file_sendfile_header:
+        # The proxy reads the file itself, ranges included
+        return Response(headers={**headers, **_sendfile_headers(path, storage_path)}, media_type=content_type)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            if request.method == "HEAD":
+                return Response(status_code=206, headers=headers, media_type=content_type)
+            return StreamingResponse(
+                _iter_range(path, start, end - start + 1),
+                status_code=206,
+                headers=headers,
+                media_type=content_type
+            )
+
+    return FileResponse(path, headers=headers, media_type=content_type, stat_result=stat_result)
@@ -0,0 +1,94 @@
+"""
+Short-lived signed upload and download URLs.
+
+The API authorizes a transfer and hands out a signed token; the file body
+then goes to the storage endpoint (`PUT /files/uploads/{token}`, no database
+access) or straight to S3 with a presigned URL, and never through an API
+worker. Upload tokens are ``u1.<payload>.<signature>``: URL-safe base64 JSON
+claims and a truncated HMAC-SHA256, like the signed session tokens. Download
+URLs carry ``expires`` and ``signature`` query parameters over the path.
+"""
+from dataclasses import asdict, dataclass
+from typing import Optional
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from app.config import settings
+
+TOKEN_PREFIX = "u1"
+_SIGNATURE_BYTES = 16
+
+_upload_key = hmac.new(settings.secret_key.encode(), b"signed-upload-url", hashlib.sha256).digest()
+_download_key = hmac.new(settings.secret_key.encode(), b"signed-download-url", hashlib.sha256).digest()
+
+
+@dataclass(frozen=True)
+class UploadClaims:
+    owner_type: str
+    owner_id: str
+    company_id: str
+    content_type: str
+    size: int  # declared by the client, enforced on receipt
+    filename: Optional[str]
+    expires_at: int  # unix seconds
+    digest: Optional[str] = None  # known up front for S3, set by the storage endpoint otherwise
+    path: Optional[str] = None
+    stored: bool = False  # True once our storage endpoint received and verified the body
+    nonce: Optional[str] = None  # spent on receipt and on completion, so each token is used once
+
+    def is_expired(self) -> bool:
+        return time.time() > self.expires_at
+
+    def owned_by(self, owner_type: str, owner_id: uuid.UUID) -> bool:
+        return self.owner_type == owner_type and self.owner_id == str(owner_id)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(key: bytes, message: bytes) -> bytes:
+    return hmac.new(key, message, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def expires_at(seconds: Optional[int] = None) -> int:
+    """Expiry timestamp SIGNED_URL_EXPIRE_SECONDS (or seconds) from now"""
+    return int(time.time()) + (settings.signed_url_expire_seconds if seconds is None else seconds)
+
+
+def issue_upload_token(claims: UploadClaims) -> str:
+    payload = _b64encode(json.dumps(asdict(claims), separators=(",", ":")).encode())
+    signed_part = f"{TOKEN_PREFIX}.{payload}"
+    return f"{signed_part}.{_b64encode(_sign(_upload_key, signed_part.encode()))}"
+
+
+def decode_upload_token(token: str) -> Optional[UploadClaims]:
+    """Verify an upload token; None if forged or malformed. Check ``is_expired()``."""
+    if not token.startswith(TOKEN_PREFIX + "."):
+        return None
+    signed_part, _, signature = token.rpartition(".")
+    try:
+        if not hmac.compare_digest(_b64decode(signature), _sign(_upload_key, signed_part.encode())):
+            return None
+        return UploadClaims(**json.loads(_b64decode(signed_part[len(TOKEN_PREFIX) + 1:])))
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def sign_download(path: str, expires: int) -> str:
+    """Signature for reading `path` until `expires`"""
+    return _b64encode(_sign(_download_key, f"{path}\n{expires}".encode()))
+
+
+def verify_download(path: str, expires: Optional[int], signature: Optional[str]) -> bool:
+    if expires is None or not signature or time.time() > expires:
+        return False
+    return hmac.compare_digest(signature.encode(), sign_download(path, expires).encode())
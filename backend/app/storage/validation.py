@@ -0,0 +1,67 @@
+"""
+Upload limits enforced while a file is streamed to storage.
+"""
+from typing import Iterable, Optional
+import hashlib
+from app.config import settings
+from app.storage.base import FileTooLarge, FileTypeNotAllowed
+
+# Leading bytes of the types we accept by default
+_SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+    "image/webp": (b"RIFF",),
+    "application/pdf": (b"%PDF-",),
+}
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Content type recognized from the first bytes of a file, if any"""
+    for content_type, signatures in _SIGNATURES.items():
+        if head.startswith(signatures):
+            if content_type == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return content_type
+    return None
+
+
+class UploadValidator:
+    """Checks size and type chunk by chunk so a bad upload is aborted early.
+    
+    Also hashes the content on the way, for content-addressed storage.
+    """
+    
+    def __init__(
+        self,
+        content_type: Optional[str],
+        max_size: Optional[int] = None,
+        allowed_types: Optional[Iterable[str]] = None,
+        declared_size: Optional[int] = None
+    ):
+        self.max_size = settings.max_file_size if max_size is None else max_size
+        self.allowed_types = list(settings.allowed_file_types if allowed_types is None else allowed_types)
+        self.content_type = (content_type or "").split(";")[0].strip().lower() or None
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        
+        if self.content_type not in self.allowed_types:
+            raise FileTypeNotAllowed(f"File type {self.content_type or 'unknown'} is not allowed")
+        if declared_size is not None and declared_size > self.max_size:
+            raise FileTooLarge(f"File exceeds the {self.max_size} byte limit")
+    
+    def feed(self, chunk: bytes) -> None:
+        if self.size == 0:
+            # The declared type must match the content for types we can recognize
+            sniffed = sniff_content_type(chunk[:16])
+            if self.content_type in _SIGNATURES and sniffed != self.content_type:
+                raise FileTypeNotAllowed(f"File content does not match {self.content_type}")
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise FileTooLarge(f"File exceeds the {self.max_size} byte limit")
+        self._sha256.update(chunk)
+    
+    @property
+    def digest(self) -> str:
+        """SHA-256 hex digest of everything fed so far"""
+        return self._sha256.hexdigest()
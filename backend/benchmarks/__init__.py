@@ -0,0 +1 @@
+# Benchmarks and query budget checks
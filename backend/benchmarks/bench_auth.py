@@ -0,0 +1,67 @@
+"""
+Microbenchmark of per-request authentication overhead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth [--iterations 2000]
+
+Times verify_token and the get_current_user / get_tenant_context
+dependencies with the verified-token and principal caches cold (cleared
+before every call) and warm.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp(prefix="oaas-auth-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'auth.db')}"
+os.environ["LOCAL_STORAGE_PATH"] = os.path.join(_tmp_dir, "uploads")
+os.environ.setdefault("SECRET_KEY", "auth-bench-secret")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from app.database import SessionLocal, run_migrations  # noqa: E402
+from app.auth.jwt import create_access_token, verify_token, verified_token_cache  # noqa: E402
+from app.auth.dependencies import get_current_user, get_tenant_context, principal_cache  # noqa: E402
+from benchmarks.synthetic import build_company  # noqa: E402
+
+
+def _time_per_call(func, iterations: int, cold: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if cold:
+            verified_token_cache.clear()
+            principal_cache.clear()
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        user = build_company(db)
+        token = create_access_token(data={"sub": str(user.id)})
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        cases = {
+            "verify_token": lambda: verify_token(token),
+            "get_current_user": lambda: get_current_user(credentials, db),
+            "get_tenant_context": lambda: get_tenant_context(credentials, db),
+        }
+        print(f"{args.iterations} iterations per case")
+        for name, func in cases.items():
+            cold = _time_per_call(func, args.iterations, cold=True)
+            warm = _time_per_call(func, args.iterations, cold=False)
+            print(f"  {name:<20} cold {cold * 1e6:8.1f}us  warm {warm * 1e6:8.1f}us  ({cold / warm:.1f}x)")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Login throughput and event-loop responsiveness under a burst of logins.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login [--logins 64] [--concurrency 16]
+
+Fires concurrent POST /api/auth/login requests in-process while a probe task
+measures how late the event loop wakes it up, and a parallel /health poller
+measures latency seen by unrelated requests. With bcrypt on the hashing pool
+the loop lag should stay in the low milliseconds.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp(prefix="oaas-login-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'login.db')}"
+os.environ["LOCAL_STORAGE_PATH"] = os.path.join(_tmp_dir, "uploads")
+os.environ.setdefault("SECRET_KEY", "login-bench-secret")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+os.environ.setdefault("RATE_LIMIT_POLICIES", '{"auth": {"requests": 1000000, "window": 60}}')
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import SessionLocal, run_migrations  # noqa: E402
+from app.auth.jwt import get_password_hash  # noqa: E402
+from app.auth.hashing import password_hasher  # noqa: E402
+from benchmarks.synthetic import build_company  # noqa: E402
+
+PASSWORD = "benchmark-password"
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+async def _probe_loop_lag(stop: asyncio.Event, interval: float, lags: list) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _poll_health(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def run(logins: int, concurrency: int) -> None:
+    db = SessionLocal()
+    try:
+        email = build_company(db, password_hash=get_password_hash(PASSWORD)).email
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        login_latencies, health_latencies, loop_lags, statuses = [], [], [], {}
+
+        async def _login():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+                login_latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        stop = asyncio.Event()
+        probes = [
+            asyncio.create_task(_probe_loop_lag(stop, 0.005, loop_lags)),
+            asyncio.create_task(_poll_health(client, stop, health_latencies)),
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*probes)
+
+    ms = lambda seconds: f"{seconds * 1000:.1f}ms"  # noqa: E731
+    print(f"{logins} logins, concurrency {concurrency}, {password_hasher.max_workers} hash workers")
+    print(f"  throughput        {logins / elapsed:.1f} logins/s  (statuses {statuses})")
+    print(f"  login latency     p50 {ms(_percentile(login_latencies, 0.5))}  p95 {ms(_percentile(login_latencies, 0.95))}")
+    print(f"  /health latency   p50 {ms(_percentile(health_latencies, 0.5))}  max {ms(max(health_latencies, default=0))}")
+    print(f"  event loop lag    mean {ms(statistics.fmean(loop_lags) if loop_lags else 0)}  max {ms(max(loop_lags, default=0))}")
+    print(f"  pool metrics      {password_hasher.metrics()}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    run_migrations()
+    asyncio.run(run(args.logins, args.concurrency))
+    password_hasher.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
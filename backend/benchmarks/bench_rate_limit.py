@@ -0,0 +1,149 @@
+"""
+Rate limiter cost at 10k requests/second.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit [--rps 10000] [--seconds 10] [--keys 200]
+                                          [--backend memory|sqlite|redis]
+
+Replays a simulated clock at the given request rate spread over `keys`
+sessions through RateLimiter.hit, and through the previous list-of-timestamps
+implementation for comparison. Reports time per check (which must stay well
+under 1/rps to keep up, and under 1ms for shared backends) and memory held
+per key. The redis backend runs against REDIS_URL when a server answers
+there, otherwise against the in-process fake server in benchmarks.fake_redis.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SECRET_KEY", "rate-limit-bench-secret")
+
+from app.config import settings  # noqa: E402
+from app.middleware.rate_limit import RateLimiter  # noqa: E402
+from app.rate_limit.factory import create_rate_limit_backend, set_rate_limit_backend  # noqa: E402
+from benchmarks.fake_redis import FakeRedisServer  # noqa: E402
+
+LIMIT_TYPE = "general"
+
+
+class ListTimestampLimiter:
+    """The former implementation: every timestamp in the window is kept per key"""
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.storage = {}
+
+    async def hit(self, key: str, now: float) -> bool:
+        timestamps = [t for t in self.storage.get(key, []) if now - t < self.window]
+        if len(timestamps) >= self.limit:
+            self.storage[key] = timestamps
+            return False
+        timestamps.append(now)
+        self.storage[key] = timestamps
+        # get_remaining_requests rebuilt the list a second time
+        self.storage[key] = [t for t in timestamps if now - t < self.window]
+        return True
+
+
+async def _replay(hit, rps: int, seconds: int, keys: int, trace_memory: bool = False):
+    keys_list = [f"{LIMIT_TYPE}:session-{n}" for n in range(keys)]
+    total = rps * seconds
+    step = 1.0 / rps
+    allowed = 0
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    now = 1_700_000_000.0
+    for i in range(total):
+        if await hit(keys_list[i % keys], now):
+            allowed += 1
+        now += step
+    elapsed = time.perf_counter() - started
+    memory = 0
+    if trace_memory:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return total, allowed, elapsed, memory
+
+
+async def _redis_url() -> "tuple":
+    """REDIS_URL if a server answers there, else a fresh fake server"""
+    import redis.asyncio as aioredis
+    client = aioredis.from_url(settings.redis_url, socket_connect_timeout=0.2)
+    try:
+        await client.ping()
+        return settings.redis_url, None
+    except Exception:
+        server = FakeRedisServer()
+        await server.start()
+        return server.url, server
+    finally:
+        await client.aclose()
+
+
+async def run(args) -> int:
+    config = RateLimiter.RATE_LIMITS[LIMIT_TYPE]
+    baseline = ListTimestampLimiter(config["requests"], config["window"])
+    fake_server = None
+    if args.backend == "redis":
+        settings.redis_url, fake_server = await _redis_url()
+        settings.rate_limit_redis_prefix = f"rl-bench-{os.getpid()}:"
+    elif args.backend == "sqlite":
+        settings.rate_limit_sqlite_path = os.path.join(tempfile.mkdtemp(prefix="oaas-rl-"), "rl.sqlite3")
+
+    async def limiter_hit(key: str, now: float) -> bool:
+        return (await RateLimiter.hit(key, LIMIT_TYPE, now)).allowed
+
+    cases = {
+        f"sliding window ({args.backend})": limiter_hit,
+        "timestamp list (old)": baseline.hit,
+    }
+    budget_us = 1e6 / args.rps
+    where = f" at {settings.redis_url}" + (" (fake)" if fake_server else "") if args.backend == "redis" else ""
+    print(f"{args.rps} req/s for {args.seconds}s over {args.keys} keys{where}, "
+          f"limit {config['requests']}/{config['window']}s, budget {budget_us:.0f}us/check")
+    try:
+        for name, hit in cases.items():
+            runs = []
+            for trace_memory in (False, True):
+                # Fresh state per run: new key prefix / file / store
+                if args.backend == "redis":
+                    settings.rate_limit_redis_prefix += "x"
+                backend = create_rate_limit_backend(args.backend)
+                set_rate_limit_backend(backend)
+                baseline.storage.clear()
+                runs.append(await _replay(hit, args.rps, args.seconds, args.keys, trace_memory))
+                metrics = backend.metrics()
+                await backend.close()
+            total, allowed, elapsed, _ = runs[0]
+            memory = runs[1][3]
+            per_check = elapsed / total * 1e6
+            print(f"  {name:<24} {per_check:7.2f}us/check  {total / elapsed:>10,.0f} checks/s  "
+                  f"{memory / args.keys:7.0f} B/key  allowed {allowed}")
+        if metrics.get("errors"):
+            print(f"  backend errors: {metrics['errors']} ({metrics.get('last_error')})")
+    finally:
+        set_rate_limit_backend(None)
+        if fake_server is not None:
+            await fake_server.stop()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rps", type=int, default=10000)
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--backend", choices=["memory", "sqlite", "redis"], default="memory")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Query budget scenarios shared by benchmarks.query_budgets and the pytest suite
+(tests/test_query_budgets.py, tests/test_ordering.py). Importing this module
+has no side effects.
+"""
+
+# (stages, blocks per stage, new hires)
+FLOW_SIZES = [(1, 1, 1), (5, 4, 5), (20, 10, 20)]
+
+# Maximum queries per request, independent of flow size. A budget of None
+# marks an endpoint that is known to scale with flow size; it is reported
+# but not enforced until it is fixed. Budgets are measured with a cold
+# principal cache, i.e. they include the tenant lookup.
+ENDPOINT_BUDGETS = {
+    "GET /api/flows/": 2,
+    "GET /api/flows/{flow_id}": 2,
+    "GET /api/flows/{flow_id}/stats": 8,
+    "GET /api/flows/{flow_id}/pipeline": None,
+    "GET /api/stages/flows/{flow_id}/stages": None,
+    "GET /api/new-hires/{new_hire_id}/progress": None,
+    "GET /api/onboarding/{session_token}": None,
+    "GET /api/onboarding/{session_token}/progress": None,
+}
+
+# Writes, with the request body they are measured with. Reordering is one
+# UPDATE whatever the number of stages or blocks.
+WRITE_BUDGETS = {
+    "PATCH /api/stages/flows/{flow_id}/stages/reorder": (
+        4, lambda flow: list(reversed(flow.stage_ids))
+    ),
+    "POST /api/content-blocks/stages/{stage_id}/content-blocks/reorder": (
+        5, lambda flow: {"content_blocks": [
+            {"id": block_id, "order_index": position}
+            for position, block_id in enumerate(reversed(flow.block_ids), 1)
+        ]}
+    ),
+    "POST /api/content-blocks/stages/{stage_id}/content-blocks/{content_block_id}/move": (
+        7, lambda flow: {"after_id": flow.block_ids[0] if len(flow.block_ids) > 1 else None}
+    ),
+}
+
+
+def endpoint_url(endpoint: str, flow) -> str:
+    """URL of an "METHOD /path/{param}" endpoint for a synthetic flow"""
+    return (
+        endpoint.split(" ", 1)[1]
+        .replace("{flow_id}", flow.flow_id)
+        .replace("{stage_id}", flow.stage_ids[0])
+        .replace("{content_block_id}", flow.block_ids[-1])
+        .replace("{new_hire_id}", flow.new_hire_ids[0])
+        .replace("{session_token}", flow.session_tokens[0])
+    )
@@ -0,0 +1,155 @@
+"""
+Exercise S3Storage against an S3-compatible server.
+
+Usage (from backend/):
+    python -m benchmarks.check_s3_storage [--size-mb 24]
+
+Uses S3_ENDPOINT_URL / S3_BUCKET when set (e.g. a local MinIO), otherwise
+starts moto's in-process S3 server (pip install "moto[server]"). Checks a
+single-PUT upload, a multipart upload, an upload aborted midway for being
+too large (no object or pending multipart upload may remain), download,
+existence and deletion, content-addressed blobs (stored once per digest),
+presigned uploads to a staging key and their promotion into the blob store,
+presigned downloads, paged key listing, and reports upload
+throughput.
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", "s3-check-secret")
+os.environ["FILE_STORAGE_TYPE"] = "s3"
+
+
+def _start_stand_in():
+    """Start moto's S3 server unless a real endpoint is configured"""
+    if os.environ.get("S3_ENDPOINT_URL"):
+        return None
+    import logging
+    from moto.server import ThreadedMotoServer
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    os.environ["S3_ENDPOINT_URL"] = f"http://{host}:{port}"
+    os.environ.setdefault("S3_BUCKET", "oaas-check")
+    os.environ.setdefault("S3_ACCESS_KEY", "test")
+    os.environ.setdefault("S3_SECRET_KEY", "test")
+    os.environ.setdefault("S3_REGION", "us-east-1")
+    return server
+
+
+def _png(size: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + os.urandom(max(0, size - 8))
+
+
+async def run(size_mb: int, stand_in: bool) -> int:
+    from app.config import settings
+    from app.storage.base import FileTooLarge, UploadRejected
+    from app.storage.factory import get_storage
+
+    storage = get_storage()
+    client = storage.client
+    try:
+        client.create_bucket(Bucket=storage.bucket)
+    except client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+    failures = []
+
+    def check(name: str, ok: bool) -> None:
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            failures.append(name)
+
+    small = _png(64 * 1024)
+    key = await storage.upload_file(io.BytesIO(small), "small.png", "check", "image/png")
+    body = await storage.download_file(key)
+    check("single PUT round trip", body.read() == small)
+
+    settings.max_file_size = (size_mb + 1) * 1024 * 1024
+    large = _png(size_mb * 1024 * 1024)
+    started = time.perf_counter()
+    key = await storage.upload_file(io.BytesIO(large), "large.png", "check", "image/png")
+    elapsed = time.perf_counter() - started
+    head = client.head_object(Bucket=storage.bucket, Key=key)
+    check("multipart upload stored", head["ContentLength"] == len(large) and "-" in head["ETag"])
+    print(f"       {size_mb}MB in {elapsed:.2f}s ({size_mb / elapsed:.1f} MB/s)")
+
+    settings.max_file_size = storage.part_size + 1024
+    try:
+        await storage.upload_file(io.BytesIO(large), "too-large.png", "check", "image/png")
+        check("oversized upload rejected", False)
+    except FileTooLarge:
+        pending = client.list_multipart_uploads(Bucket=storage.bucket).get("Uploads", [])
+        check("oversized upload aborted", not pending and not await storage.file_exists("check/too-large.png"))
+
+    settings.max_file_size = (size_mb + 1) * 1024 * 1024
+    for name, content in (("small", small), ("multipart", large)):
+        first = await storage.store_blob(io.BytesIO(content), "image/png")
+        second = await storage.store_blob(io.BytesIO(content), "image/png")
+        head = client.head_object(Bucket=storage.bucket, Key=first.path)
+        check(f"{name} blob stored once", first.created and not second.created and first.path == second.path
+              and head["ContentLength"] == len(content) and "immutable" in head.get("CacheControl", ""))
+    leftovers = client.list_objects_v2(Bucket=storage.bucket, Prefix="tmp/").get("KeyCount", 0)
+    check("no temporary objects left", leftovers == 0)
+
+    # Signed direct uploads and downloads
+    import base64
+    import hashlib
+    import httpx
+    from app.storage.base import blob_path
+    direct = _png(32 * 1024)
+    digest = hashlib.sha256(direct).digest()
+    staging = "tmp/signed/check"
+    upload = storage.presign_upload(staging, "image/png", len(direct), base64.b64encode(digest).decode(), 60)
+    response = httpx.request(upload["method"], upload["url"], content=direct, headers=upload["headers"])
+    check("presigned upload", response.status_code == 200 and await storage.file_size(staging) == len(direct))
+    blob = await storage.promote_blob(staging, digest.hex(), "image/png", len(direct))
+    path = blob_path(digest.hex(), "image/png")
+    check("staged upload promoted", blob is not None and blob.path == path
+          and await storage.file_size(path) == len(direct) and not await storage.file_exists(staging))
+    await storage.upload_file(io.BytesIO(direct), "check", "tmp/signed", "image/png")
+    try:
+        await storage.promote_blob(staging, "0" * 64, "image/png", len(direct))
+        check("staged upload with another digest rejected", False)
+    except UploadRejected:
+        check("staged upload with another digest rejected", not await storage.file_exists(staging))
+    if stand_in:
+        print("  skip presigned upload checks the digest (moto does not verify checksums)")
+    else:
+        upload = storage.presign_upload(path + ".check", "image/png", len(direct), base64.b64encode(digest).decode(), 60)
+        response = httpx.request(upload["method"], upload["url"], content=_png(len(direct)), headers=upload["headers"])
+        check("presigned upload checks the digest", response.status_code >= 400 and await storage.file_size(path + ".check") is None)
+    response = httpx.get(storage.presign_download(path, 60))
+    check("presigned download", response.status_code == 200 and response.content == direct)
+
+    everything = await storage.list_files()
+    first = await storage.scan_files("", 2)
+    rest = await storage.scan_files(first[-1].path, 1000) if first else []
+    check("scan_files pages in key order", [stored.path for stored in first + rest] == sorted(everything))
+
+    check("exists", await storage.file_exists(key))
+    check("delete", await storage.delete_file(key) and not await storage.file_exists(key))
+    check("delete missing", not await storage.delete_file(key))
+    check("download missing", await storage.download_file(key) is None)
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=24)
+    args = parser.parse_args()
+    server = _start_stand_in()
+    print(f"S3 endpoint {os.environ['S3_ENDPOINT_URL']} bucket {os.environ.get('S3_BUCKET')}")
+    try:
+        return asyncio.run(run(args.size_mb, server is not None))
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
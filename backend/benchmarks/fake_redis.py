@@ -0,0 +1,149 @@
+"""
+Minimal in-process Redis-protocol (RESP2) server for benchmarks and tests.
+
+Implements only the commands the rate limiter and redis-py's handshake use:
+PING, ECHO, CLIENT, SELECT, INCR, INCRBY, DECR, DECRBY, GET, SET, EXPIRE, PEXPIRE,
+TTL, DEL, FLUSHALL and DBSIZE, with lazy key expiry.
+
+    server = FakeRedisServer()
+    await server.start()          # binds 127.0.0.1 on a free port
+    url = server.url              # redis://127.0.0.1:<port>/0
+    ...
+    await server.stop()
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class FakeRedisServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _set(self, key: bytes, value: bytes, keep_ttl: bool = True) -> None:
+        expires_at = self.data[key][1] if keep_ttl and key in self.data else None
+        self.data[key] = (value, expires_at)
+
+    def _incr(self, key: bytes, amount: int) -> bytes:
+        value = int(self._get(key) or 0) + amount
+        self._set(key, str(value).encode())
+        return b":%d\r\n" % value
+
+    def _expire(self, key: bytes, seconds: float) -> bytes:
+        if self._get(key) is None:
+            return b":0\r\n"
+        self.data[key] = (self.data[key][0], time.monotonic() + seconds)
+        return b":1\r\n"
+
+    def execute(self, args: List[bytes]) -> bytes:
+        self.commands += 1
+        command = args[0].upper()
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command == b"ECHO":
+            return _bulk(args[1])
+        if command in (b"CLIENT", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"INCR":
+            return self._incr(args[1], 1)
+        if command == b"INCRBY":
+            return self._incr(args[1], int(args[2]))
+        if command == b"DECR":
+            return self._incr(args[1], -1)
+        if command == b"DECRBY":
+            return self._incr(args[1], -int(args[2]))
+        if command == b"GET":
+            return _bulk(self._get(args[1]))
+        if command == b"SET":
+            self._set(args[1], args[2], keep_ttl=False)
+            return b"+OK\r\n"
+        if command == b"EXPIRE":
+            return self._expire(args[1], int(args[2]))
+        if command == b"PEXPIRE":
+            return self._expire(args[1], int(args[2]) / 1000)
+        if command == b"TTL":
+            if self._get(args[1]) is None:
+                return b":-2\r\n"
+            expires_at = self.data[args[1]][1]
+            return b":-1\r\n" if expires_at is None else b":%d\r\n" % int(expires_at - time.monotonic())
+        if command == b"DEL":
+            removed = sum(1 for key in args[1:] if self._get(key) is not None and self.data.pop(key))
+            return b":%d\r\n" % removed
+        if command == b"FLUSHALL":
+            self.data.clear()
+            return b"+OK\r\n"
+        if command == b"DBSIZE":
+            return b":%d\r\n" % len(self.data)
+        return b"-ERR unknown command '%s'\r\n" % args[0]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                args = await _read_command(reader)
+                if args is None:
+                    break
+                replies = [self.execute(args)]
+                # Answer a whole pipeline with one write
+                while _has_buffered(reader):
+                    args = await _read_command(reader)
+                    if args is None:
+                        break
+                    replies.append(self.execute(args))
+                writer.write(b"".join(replies))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _has_buffered(reader: asyncio.StreamReader) -> bool:
+    return bool(getattr(reader, "_buffer", b""))
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()  # inline command
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        length = int(header[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
@@ -0,0 +1,79 @@
+"""
+Per-endpoint SQL query budgets checked against synthetic flows of several sizes.
+
+Usage (from backend/):
+    python -m benchmarks.query_budgets
+
+Exits non-zero when an endpoint exceeds its budget, so it can run in CI. The
+scenarios live in benchmarks.budgets; tests/test_query_budgets.py runs the
+same ones under pytest.
+"""
+import os
+import sys
+import tempfile
+
+_tmp_dir = tempfile.mkdtemp(prefix="oaas-budgets-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'budgets.db')}"
+os.environ["LOCAL_STORAGE_PATH"] = os.path.join(_tmp_dir, "uploads")
+os.environ.setdefault("SECRET_KEY", "query-budget-secret")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import SessionLocal, run_migrations  # noqa: E402
+from app.auth.dependencies import principal_cache  # noqa: E402
+from app.middleware.query_stats import query_budget  # noqa: E402
+from benchmarks.budgets import ENDPOINT_BUDGETS, FLOW_SIZES, WRITE_BUDGETS, endpoint_url  # noqa: E402
+from benchmarks.synthetic import build_flow  # noqa: E402
+
+
+def main() -> int:
+    run_migrations()
+    failures = []
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        for stages, blocks, hires in FLOW_SIZES:
+            db = SessionLocal()
+            try:
+                flow = build_flow(db, stages, blocks, hires, completed_stages=stages // 2)
+            finally:
+                db.close()
+
+            headers = {"Authorization": f"Bearer {flow.access_token}"}
+            print(f"\nFlow {stages} stages x {blocks} blocks, {hires} new hires")
+            for endpoint, budget in ENDPOINT_BUDGETS.items():
+                limit = budget if budget is not None else sys.maxsize
+                principal_cache.clear()
+                try:
+                    with query_budget(limit, endpoint) as stats:
+                        response = client.get(endpoint_url(endpoint, flow), headers=headers)
+                except AssertionError as e:
+                    failures.append(str(e).splitlines()[0])
+                    stats = None
+                count = stats.count if stats else "over budget"
+                marker = "" if budget is not None else "  (known N+1, not enforced)"
+                print(f"  {endpoint:<48} {response.status_code}  queries={count}{marker}")
+
+            for endpoint, (budget, body) in WRITE_BUDGETS.items():
+                principal_cache.clear()
+                try:
+                    with query_budget(budget, endpoint) as stats:
+                        response = client.request(
+                            endpoint.split(" ", 1)[0], endpoint_url(endpoint, flow), json=body(flow), headers=headers
+                        )
+                except AssertionError as e:
+                    failures.append(str(e).splitlines()[0])
+                    stats = None
+                count = stats.count if stats else "over budget"
+                print(f"  {endpoint:<48} {response.status_code}  queries={count}")
+
+    if failures:
+        print("\nQuery budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
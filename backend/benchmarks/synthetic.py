@@ -0,0 +1,117 @@
+"""
+Synthetic data builders shared by the benchmark and budget scripts.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+import secrets
+from sqlalchemy.orm import Session
+from app.models.company import Company
+from app.models.user import User
+from app.models.onboarding_flow import OnboardingFlow
+from app.models.stage import Stage
+from app.models.content_block import ContentBlock
+from app.models.new_hire import NewHire
+from app.models.progress import Progress
+from app.auth.jwt import create_access_token
+
+
+@dataclass
+class SyntheticFlow:
+    company_id: str
+    user_id: str
+    access_token: str
+    flow_id: str
+    stage_ids: List[str] = field(default_factory=list)
+    block_ids: List[str] = field(default_factory=list)  # blocks of the first stage, in order
+    new_hire_ids: List[str] = field(default_factory=list)
+    session_tokens: List[str] = field(default_factory=list)
+
+
+def build_company(db: Session, password_hash: str = "not-a-real-hash") -> User:
+    """Create a company with a single admin user"""
+    company = Company(name=f"Synthetic {secrets.token_hex(4)}")
+    db.add(company)
+    db.flush()
+
+    user = User(
+        company_id=company.id,
+        email=f"admin-{secrets.token_hex(6)}@example.com",
+        first_name="Synthetic",
+        last_name="Admin",
+        password_hash=password_hash,
+        role="admin"
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def build_flow(
+    db: Session,
+    stages: int,
+    blocks_per_stage: int,
+    new_hires: int,
+    completed_stages: int = 0
+) -> SyntheticFlow:
+    """Create a flow with the given shape; each new hire completes the first N stages"""
+    user = build_company(db)
+    flow = OnboardingFlow(company_id=user.company_id, name=f"Flow {stages}x{blocks_per_stage}", status="published")
+    db.add(flow)
+    db.flush()
+
+    stage_rows = []
+    block_rows = []
+    for s in range(stages):
+        stage = Stage(flow_id=flow.id, name=f"Stage {s + 1}", order=s + 1, type="text")
+        db.add(stage)
+        db.flush()
+        stage_rows.append(stage)
+        for b in range(blocks_per_stage):
+            block = ContentBlock(
+                stage_id=stage.id,
+                type="text_input",
+                config={"required": True},
+                content={"label": f"Question {b + 1}"},
+                order_index=b + 1
+            )
+            db.add(block)
+            block_rows.append((stage, block))
+    db.flush()
+
+    result = SyntheticFlow(
+        company_id=str(user.company_id),
+        user_id=str(user.id),
+        access_token=create_access_token(data={"sub": str(user.id)}),
+        flow_id=str(flow.id),
+        stage_ids=[str(s.id) for s in stage_rows],
+        block_ids=[str(block.id) for stage, block in block_rows if stage is stage_rows[0]]
+    )
+
+    completed_stage_ids = {s.id for s in stage_rows[:completed_stages]}
+    for n in range(new_hires):
+        new_hire = NewHire(
+            company_id=user.company_id,
+            flow_id=flow.id,
+            email=f"hire-{n}-{secrets.token_hex(4)}@example.com",
+            first_name="New",
+            last_name=f"Hire {n}",
+            status="started"
+        )
+        token = new_hire.issue_session_token(datetime.utcnow() + timedelta(days=7))
+        db.add(new_hire)
+        db.flush()
+        for stage, block in block_rows:
+            if stage.id in completed_stage_ids:
+                db.add(Progress(
+                    new_hire_id=new_hire.id,
+                    stage_id=stage.id,
+                    content_block_id=block.id,
+                    status="completed",
+                    data={"data": {"type": "text_input", "value": "ok"}}
+                ))
+        result.new_hire_ids.append(str(new_hire.id))
+        result.session_tokens.append(token)
+
+    db.commit()
+    return result
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Management commands for the Onboarding-as-a-Service backend
+
+Usage:
+    python manage.py migrate [revision]   # upgrade the schema (default: head)
+    python manage.py current              # show the schema revision
+    python manage.py stamp <revision>     # mark the schema revision without running DDL
+    python manage.py deletion-jobs        # finish pending or interrupted deletion jobs
+    python manage.py deletion-jobs --retry-failed  # also retry jobs that hit DELETION_JOB_MAX_ATTEMPTS
+    python manage.py files-migrate        # move name-addressed uploads into the blob store
+    python manage.py files-gc             # delete blobs and stored files nobody references
+    python manage.py images-render        # render missing logo / media image variants
+    python manage.py files-inspect        # inspect uploaded files the background queue has not
+"""
+import argparse
+import asyncio
+import sys
+
+
+def cmd_migrate(args):
+    from app.database import run_migrations, get_schema_version
+    run_migrations(args.revision)
+    print(f"✅ Database schema at revision {get_schema_version()}")
+
+
+def cmd_current(args):
+    from app.database import get_schema_version, SCHEMA_VERSION
+    current = get_schema_version()
+    print(f"Database revision: {current or '(none)'}")
+    print(f"Expected revision: {SCHEMA_VERSION}")
+    return 0 if current == SCHEMA_VERSION else 1
+
+
+def cmd_stamp(args):
+    from app.database import stamp_schema
+    stamp_schema(args.revision)
+    print(f"✅ Database stamped at revision {args.revision}")
+
+
+def cmd_deletion_jobs(args):
+    from app.services.deletion_service import DeletionService
+    completed = DeletionService.resume_pending_jobs(retry_failed=args.retry_failed)
+    print(f"✅ Completed {completed} deletion job(s)")
+
+
+def cmd_files_migrate(args):
+    from app.database import SessionLocal
+    from app.services.file_service import FileService
+    db = SessionLocal()
+    try:
+        result = asyncio.run(FileService.migrate_legacy_files(db, delete_legacy=args.delete_legacy))
+    finally:
+        db.close()
+    print(
+        f"✅ Migrated {result['migrated']} file(s) ({result['deduplicated']} duplicate), "
+        f"skipped {result['skipped']}, missing {result['missing']}"
+    )
+
+
+def cmd_files_gc(args):
+    from app.database import SessionLocal
+    from app.services.file_gc_service import FileGCService
+    db = SessionLocal()
+    try:
+        result = asyncio.run(FileGCService.run(db, grace_seconds=args.grace_seconds, max_keys=args.max_keys))
+    finally:
+        db.close()
+    print(
+        f"✅ Deleted {result['deleted_blobs']} blob(s) and {result['deleted_files']} orphaned file(s), "
+        f"reclaimed {result['reclaimed_bytes']} bytes; dropped {result['dropped_references']} unused upload(s), "
+        f"discarded {result['expired_uploads']} expired resumable upload(s)"
+    )
+    scan = "storage pass complete" if result["pass_complete"] else "storage pass continues next run"
+    print(f"   Scanned {result['scanned_keys']} storage key(s), {scan}")
+
+
+def cmd_images_render(args):
+    from app.database import SessionLocal
+    from app.services.image_service import ImageService, image_processor
+    db = SessionLocal()
+    try:
+        result = asyncio.run(ImageService.generate_missing_variants(db))
+    finally:
+        db.close()
+        image_processor.shutdown()
+    print(
+        f"✅ Rendered variants for {result['logos']} logo(s) and {result['media']} media block(s), "
+        f"skipped {result['skipped']}"
+    )
+
+
+def cmd_files_inspect(args):
+    from app.services.inspection_service import InspectionService
+    result = asyncio.run(InspectionService.inspect_pending())
+    print(f"✅ Inspected {result['inspected']} file(s), {result['failed']} failed")
+    return 1 if result["failed"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="OaaS backend management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply database migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    current_parser = subparsers.add_parser("current", help="Show the database schema revision")
+    current_parser.set_defaults(func=cmd_current)
+
+    stamp_parser = subparsers.add_parser("stamp", help="Set the schema revision without migrating")
+    stamp_parser.add_argument("revision")
+    stamp_parser.set_defaults(func=cmd_stamp)
+
+    deletion_parser = subparsers.add_parser("deletion-jobs", help="Run pending background deletion jobs")
+    deletion_parser.add_argument("--retry-failed", action="store_true", help="Retry failed jobs regardless of DELETION_JOB_MAX_ATTEMPTS")
+    deletion_parser.set_defaults(func=cmd_deletion_jobs)
+
+    files_migrate_parser = subparsers.add_parser("files-migrate", help="Move legacy uploads into the blob store")
+    files_migrate_parser.add_argument("--delete-legacy", action="store_true", help="Delete the old files once migrated")
+    files_migrate_parser.set_defaults(func=cmd_files_migrate)
+
+    files_gc_parser = subparsers.add_parser("files-gc", help="Delete unreferenced blobs and orphaned files")
+    files_gc_parser.add_argument("--grace-seconds", type=int, default=None)
+    files_gc_parser.add_argument("--max-keys", type=int, default=None, help="storage keys to examine (FILE_GC_MAX_KEYS)")
+    files_gc_parser.set_defaults(func=cmd_files_gc)
+
+    images_parser = subparsers.add_parser("images-render", help="Render missing image variants")
+    images_parser.set_defaults(func=cmd_images_render)
+
+    files_inspect_parser = subparsers.add_parser("files-inspect", help="Inspect uploaded files not inspected yet")
+    files_inspect_parser.set_defaults(func=cmd_files_inspect)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Alembic environment. Uses the application's engine and model metadata so
+migrations always target the configured DATABASE_URL.
+"""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import text
+from app.database import Base, engine
+import app.models  # noqa: F401  (register all models on Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Arbitrary constant shared by every process that runs migrations
+MIGRATION_LOCK_ID = 72061349
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of applying it"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Apply migrations using the application engine"""
+    with engine.connect() as connection:
+        is_postgres = connection.dialect.name == "postgresql"
+        if is_postgres:
+            # Serialize concurrent `manage.py migrate` runs (e.g. one per deploy host)
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite cannot ALTER most constraints in place
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        try:
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            if is_postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,191 @@
+"""initial schema
+
+Matches the models as they were created by Base.metadata.create_all.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 08:28:10
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _uuid():
+    return postgresql.UUID(as_uuid=True)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'companies',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('industry', sa.String(length=100), nullable=True),
+        sa.Column('size', sa.String(length=50), nullable=True),
+        sa.Column('website', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('primary_color', sa.String(length=7), nullable=True),
+        sa.Column('secondary_color', sa.String(length=7), nullable=True),
+        sa.Column('accent_color', sa.String(length=7), nullable=True),
+        sa.Column('logo_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_companies_name', 'companies', ['name'], unique=False)
+
+    op.create_table(
+        'content_types',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('display_name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('category', sa.String(length=50), nullable=True),
+        sa.Column('default_config', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_content_types_name', 'content_types', ['name'], unique=True)
+
+    op.create_table(
+        'stage_templates',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('default_content', sa.Text(), nullable=True),
+        sa.Column('default_config', sa.Text(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'onboarding_flows',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('company_id', _uuid(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('duration_days', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_onboarding_flows_company_id', 'onboarding_flows', ['company_id'], unique=False)
+
+    op.create_table(
+        'users',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('company_id', _uuid(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_company_id', 'users', ['company_id'], unique=False)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'new_hires',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('company_id', _uuid(), nullable=False),
+        sa.Column('flow_id', _uuid(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('session_token', sa.String(length=255), nullable=False),
+        sa.Column('session_token_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('invited_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['flow_id'], ['onboarding_flows.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_new_hires_company_id', 'new_hires', ['company_id'], unique=False)
+    op.create_index('ix_new_hires_email', 'new_hires', ['email'], unique=False)
+    op.create_index('ix_new_hires_flow_id', 'new_hires', ['flow_id'], unique=False)
+    op.create_index('ix_new_hires_session_token', 'new_hires', ['session_token'], unique=True)
+    op.create_index('ix_new_hires_session_token_expires_at', 'new_hires', ['session_token_expires_at'], unique=False)
+
+    op.create_table(
+        'stages',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('flow_id', _uuid(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['flow_id'], ['onboarding_flows.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stages_flow_id', 'stages', ['flow_id'], unique=False)
+    op.create_index('ix_stages_order', 'stages', ['order'], unique=False)
+
+    op.create_table(
+        'content_blocks',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('stage_id', _uuid(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('config', sa.Text(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('order_index', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['stage_id'], ['stages.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_content_blocks_order_index', 'content_blocks', ['order_index'], unique=False)
+    op.create_index('ix_content_blocks_stage_id', 'content_blocks', ['stage_id'], unique=False)
+    op.create_index('ix_content_blocks_type', 'content_blocks', ['type'], unique=False)
+
+    op.create_table(
+        'progress',
+        sa.Column('id', _uuid(), nullable=False),
+        sa.Column('new_hire_id', _uuid(), nullable=False),
+        sa.Column('stage_id', _uuid(), nullable=False),
+        sa.Column('content_block_id', _uuid(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['content_block_id'], ['content_blocks.id']),
+        sa.ForeignKeyConstraint(['new_hire_id'], ['new_hires.id']),
+        sa.ForeignKeyConstraint(['stage_id'], ['stages.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_progress_content_block_id', 'progress', ['content_block_id'], unique=False)
+    op.create_index('ix_progress_new_hire_id', 'progress', ['new_hire_id'], unique=False)
+    op.create_index('ix_progress_stage_id', 'progress', ['stage_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('progress')
+    op.drop_table('content_blocks')
+    op.drop_table('stages')
+    op.drop_table('new_hires')
+    op.drop_table('users')
+    op.drop_table('onboarding_flows')
+    op.drop_table('stage_templates')
+    op.drop_table('content_types')
+    op.drop_table('companies')
@@ -0,0 +1,35 @@
+"""composite indexes for hot read paths
+
+Progress is looked up by (new_hire_id, content_block_id) for every block of a
+session, stages are listed by flow in order and blocks by stage in order.
+On PostgreSQL the indexes are built CONCURRENTLY so they can be applied online.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 08:40:00
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_progress_new_hire_block', 'progress', ['new_hire_id', 'content_block_id']),
+    ('ix_stages_flow_order', 'stages', ['flow_id', 'order']),
+    ('ix_content_blocks_stage_order', 'content_blocks', ['stage_id', 'order_index']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
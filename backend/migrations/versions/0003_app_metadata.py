@@ -0,0 +1,31 @@
+"""app metadata key/value table
+
+Holds the seed catalog fingerprint so startup can skip seeding with a single
+primary-key read.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'app_metadata',
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('app_metadata')
@@ -0,0 +1,51 @@
+"""soft-delete markers and background deletion jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+SOFT_DELETE_TABLES = ['onboarding_flows', 'stages', 'new_hires']
+
+
+def upgrade() -> None:
+    for table in SOFT_DELETE_TABLES:
+        # Nullable column without default: a metadata-only change on PostgreSQL
+        op.add_column(table, sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_deleted_at', table, ['deleted_at'], unique=False)
+
+    op.create_table(
+        'deletion_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('step', sa.String(length=50), nullable=True),
+        sa.Column('deleted_rows', sa.Integer(), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_deletion_jobs_company_id', 'deletion_jobs', ['company_id'], unique=False)
+    op.create_index('ix_deletion_jobs_status', 'deletion_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('deletion_jobs')
+    for table in SOFT_DELETE_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_deleted_at')
+            batch_op.drop_column('deleted_at')
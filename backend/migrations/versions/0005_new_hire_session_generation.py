@@ -0,0 +1,29 @@
+"""new hire session token generation
+
+Signed onboarding session tokens carry the generation they were issued at;
+bumping it revokes all earlier tokens without a token blacklist.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'new_hires',
+        sa.Column('session_generation', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('new_hires') as batch_op:
+        batch_op.drop_column('session_generation')
@@ -0,0 +1,38 @@
+"""revoked refresh tokens and token families
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('token_id', sa.String(length=64), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('reason', sa.String(length=20), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('token_id')
+    )
+    op.create_index('ix_revoked_tokens_user_id', 'revoked_tokens', ['user_id'])
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'])
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='revoked_tokens')
+    op.drop_index('ix_revoked_tokens_user_id', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
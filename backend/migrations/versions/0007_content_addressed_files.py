@@ -0,0 +1,54 @@
+"""content-addressed file blobs and their references
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'file_blobs',
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('storage_path', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_stored_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('digest')
+    )
+    op.create_index('ix_file_blobs_last_stored_at', 'file_blobs', ['last_stored_at'])
+    op.create_table(
+        'file_references',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('blob_digest', sa.String(length=64), nullable=False),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('owner_type', sa.String(length=30), nullable=False),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['blob_digest'], ['file_blobs.digest']),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_file_references_blob_digest', 'file_references', ['blob_digest'])
+    op.create_index('ix_file_references_company_id', 'file_references', ['company_id'])
+    op.create_index('ix_file_references_owner', 'file_references', ['owner_type', 'owner_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_file_references_owner', table_name='file_references')
+    op.drop_index('ix_file_references_company_id', table_name='file_references')
+    op.drop_index('ix_file_references_blob_digest', table_name='file_references')
+    op.drop_table('file_references')
+    op.drop_index('ix_file_blobs_last_stored_at', table_name='file_blobs')
+    op.drop_table('file_blobs')
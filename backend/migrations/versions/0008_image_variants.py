@@ -0,0 +1,26 @@
+"""resized image variants for company logos and media blocks
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 17:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('companies', sa.Column('logo_variants', sa.Text(), nullable=True))
+    op.add_column('content_blocks', sa.Column('media_variants', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('content_blocks') as batch_op:
+        batch_op.drop_column('media_variants')
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.drop_column('logo_variants')
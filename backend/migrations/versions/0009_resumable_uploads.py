@@ -0,0 +1,43 @@
+"""resumable chunked uploads
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 19:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resumable_uploads',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('owner_type', sa.String(length=30), nullable=False),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('size', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('received', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('parts', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_resumable_uploads_owner', 'resumable_uploads', ['owner_type', 'owner_id'])
+    op.create_index('ix_resumable_uploads_expires_at', 'resumable_uploads', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resumable_uploads_expires_at', table_name='resumable_uploads')
+    op.drop_index('ix_resumable_uploads_owner', table_name='resumable_uploads')
+    op.drop_table('resumable_uploads')
@@ -0,0 +1,27 @@
+"""background inspection results on file blobs
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 21:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('file_blobs', sa.Column('inspection', sa.Text(), nullable=True))
+    op.add_column('file_blobs', sa.Column('inspected_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_file_blobs_inspected_at', 'file_blobs', ['inspected_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_file_blobs_inspected_at', table_name='file_blobs')
+    with op.batch_alter_table('file_blobs') as batch_op:
+        batch_op.drop_column('inspected_at')
+        batch_op.drop_column('inspection')
@@ -0,0 +1,23 @@
+"""attempt count on deletion jobs
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-20 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('deletion_jobs', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('deletion_jobs') as batch_op:
+        batch_op.drop_column('attempts')
@@ -0,0 +1,75 @@
+"""
+Shared fixtures. The app is pointed at a throwaway SQLite database and upload
+directory before anything imports app.config.
+"""
+import asyncio
+import os
+import tempfile
+
+_tmp_dir = tempfile.mkdtemp(prefix="oaas-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'tests.db')}"
+os.environ["LOCAL_STORAGE_PATH"] = os.path.join(_tmp_dir, "uploads")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+os.environ.setdefault("INSPECTION_WORKERS", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+async def _wait_for_startup_jobs():
+    # Startup resumes deletion jobs on the default executor; SQLite uses one
+    # connection for every thread, so let them finish before building data
+    await asyncio.get_running_loop().shutdown_default_executor()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client on a migrated database, with startup and shutdown hooks run"""
+    from app.database import run_migrations
+    from app.main import app
+
+    run_migrations()
+    with TestClient(app, raise_server_exceptions=False) as test_client:
+        test_client.portal.call(_wait_for_startup_jobs)
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    """A session on the test database"""
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def small_flow(client):
+    """A fresh company with one stage, one content block and one new hire"""
+    from app.database import SessionLocal
+    from benchmarks.synthetic import build_flow
+
+    db = SessionLocal()
+    try:
+        return build_flow(db, 1, 1, 1)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def query_budget():
+    """app.middleware.query_stats.query_budget, measured with a cold principal cache.
+
+        def test_list(client, query_budget):
+            with query_budget(2, "GET /api/flows/"):
+                client.get("/api/flows/", headers=auth)
+    """
+    from app.auth.dependencies import principal_cache
+    from app.middleware.query_stats import query_budget as budget
+
+    principal_cache.clear()
+    return budget
@@ -0,0 +1,73 @@
+"""
+Refresh token rotation, reuse detection and logout
+"""
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+from app.auth.jwt import create_refresh_token, create_token_pair, verify_token
+from app.config import settings
+
+
+def _refresh(client, refresh_token):
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def _flows(client, access_token):
+    return client.get("/api/flows/", headers={"Authorization": f"Bearer {access_token}"})
+
+
+def test_refresh_rotates_within_the_family(client, small_flow):
+    _, refresh_token = create_token_pair(small_flow.user_id)
+    response = _refresh(client, refresh_token)
+    assert response.status_code == 200, response.text
+    tokens = response.json()
+
+    old, new = verify_token(refresh_token), verify_token(tokens["refresh_token"])
+    assert new["jti"] != old["jti"]
+    assert new["fam"] == old["fam"] == verify_token(tokens["access_token"])["fam"]
+    assert _flows(client, tokens["access_token"]).status_code == 200
+    assert _refresh(client, tokens["refresh_token"]).status_code == 200
+
+
+def test_reuse_revokes_the_whole_family(client, small_flow):
+    _, first = create_token_pair(small_flow.user_id)
+    rotated = _refresh(client, first).json()
+
+    response = _refresh(client, first)
+    assert response.status_code == 401
+    assert "reuse" in response.json()["detail"]
+
+    # Every token of the family is dead, including the legitimate newest pair
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+    assert _flows(client, rotated["access_token"]).status_code == 401
+
+    # Other logins of the same user are unaffected
+    access_token, refresh_token = create_token_pair(small_flow.user_id)
+    assert _flows(client, access_token).status_code == 200
+    assert _refresh(client, refresh_token).status_code == 200
+
+
+def test_logout_revokes_the_family(client, small_flow):
+    access_token, refresh_token = create_token_pair(small_flow.user_id)
+    assert _flows(client, access_token).status_code == 200
+
+    response = client.post("/api/auth/logout", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    assert _refresh(client, refresh_token).status_code == 401
+    assert _flows(client, access_token).status_code == 401
+
+
+def test_invalid_refresh_tokens_are_rejected(client, small_flow):
+    access_token, refresh_token = create_token_pair(small_flow.user_id)
+    forged = jwt.encode(
+        {**verify_token(refresh_token), "jti": "forged"}, "not-the-secret", algorithm=settings.algorithm
+    )
+    expired = jwt.encode(
+        {**verify_token(refresh_token), "exp": datetime.utcnow() - timedelta(minutes=1)},
+        settings.secret_key,
+        algorithm=settings.algorithm,
+    )
+    for token in (forged, expired, access_token, create_refresh_token({"sub": "not-a-uuid"})):
+        response = _refresh(client, token)
+        assert response.status_code == 401, token
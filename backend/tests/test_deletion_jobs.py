@@ -0,0 +1,80 @@
+"""
+Background deletion jobs: cascades and retries
+"""
+import os
+import uuid
+from unittest import mock
+
+import anyio
+
+from app.models.deletion_job import DeletionJob
+from app.models.new_hire import NewHire
+from app.models.onboarding_flow import OnboardingFlow
+from app.models.resumable_upload import ResumableUpload
+from app.services.deletion_service import DeletionService
+from app.services.file_service import FileService, OWNER_ONBOARDING_UPLOAD, RESUMABLE_PREFIX
+from app.storage.factory import get_storage
+
+
+def _headers(flow):
+    return {"Authorization": f"Bearer {flow.access_token}"}
+
+
+def _partial_upload(db, new_hire_id):
+    """A resumable upload of a new hire with one chunk stored"""
+    new_hire = db.get(NewHire, new_hire_id)
+    upload = FileService.create_resumable_upload(
+        db, OWNER_ONBOARDING_UPLOAD, new_hire.id, new_hire.company_id, "scan.png", "image/png", 8192
+    )["upload"]
+    upload_id = upload.id
+
+    async def chunk():
+        yield b"\x89PNG\r\n\x1a\n" + os.urandom(4088)
+
+    anyio.run(FileService.append_resumable_upload, db, upload, 0, chunk())
+    return upload_id
+
+
+def _parts(upload_id):
+    return anyio.run(get_storage().list_files, f"{RESUMABLE_PREFIX}{upload_id}/")
+
+
+def test_deleting_a_new_hire_removes_partial_uploads(client, db, small_flow):
+    new_hire_id = uuid.UUID(small_flow.new_hire_ids[0])
+    upload_id = _partial_upload(db, new_hire_id)
+    assert _parts(upload_id)
+
+    response = client.delete(f"/api/new-hires/{new_hire_id}", headers=_headers(small_flow))
+    assert response.status_code == 200, response.text
+
+    db.expire_all()
+    assert db.get(ResumableUpload, upload_id) is None
+    assert _parts(upload_id) == []
+
+
+def test_deleting_a_flow_removes_partial_uploads(client, db, small_flow):
+    upload_id = _partial_upload(db, uuid.UUID(small_flow.new_hire_ids[0]))
+
+    response = client.delete(f"/api/flows/{small_flow.flow_id}", headers=_headers(small_flow))
+    assert response.status_code == 200, response.text
+
+    db.expire_all()
+    assert db.get(ResumableUpload, upload_id) is None
+    assert _parts(upload_id) == []
+
+
+def test_failed_jobs_are_retried_up_to_the_cap(db, small_flow):
+    flow = db.get(OnboardingFlow, uuid.UUID(small_flow.flow_id))
+    job_id = DeletionService.schedule_flow_deletion(db, flow).id
+
+    with mock.patch.object(DeletionService, "_cascade_steps", side_effect=RuntimeError("boom")):
+        DeletionService.run_job(job_id)
+        for _ in range(3):
+            DeletionService.resume_pending_jobs()
+    db.expire_all()
+    job = db.get(DeletionJob, job_id)
+    assert (job.status, job.attempts) == ("failed", 3)
+
+    DeletionService.resume_pending_jobs(retry_failed=True)
+    db.expire_all()
+    assert db.get(DeletionJob, job_id).status == "completed"
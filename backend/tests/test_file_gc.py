@@ -0,0 +1,107 @@
+"""
+Blob garbage collection racing uploads of the same content
+"""
+import io
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import anyio
+from starlette.datastructures import Headers, UploadFile
+
+from app.database import SessionLocal
+from app.models.file_blob import FileBlob, FileReference
+from app.services.file_service import FileService, OWNER_ONBOARDING_UPLOAD
+from app.storage.factory import get_storage
+
+
+def _png() -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + os.urandom(2048)
+
+
+def _stale_blob(db, content: bytes):
+    """A stored, unreferenced blob last stored two days ago"""
+    blob = anyio.run(FileService.store_blob, io.BytesIO(content), "image/png")
+    FileService._record_blob(db, blob)
+    db.commit()
+    row = db.get(FileBlob, blob.digest)
+    row.last_stored_at = datetime.utcnow() - timedelta(days=2)
+    db.commit()
+    return blob
+
+
+def _upload(db, content: bytes, owner_id):
+    upload = UploadFile(io.BytesIO(content), filename="scan.png", headers=Headers({"content-type": "image/png"}))
+    return anyio.run(FileService.store_upload, db, upload, OWNER_ONBOARDING_UPLOAD, owner_id, uuid.uuid4())
+
+
+def _file_exists(path: str) -> bool:
+    return anyio.run(get_storage().file_exists, path)
+
+
+def test_unreferenced_blob_is_collected(db):
+    blob = _stale_blob(db, _png())
+    anyio.run(FileService.collect_garbage, db, 3600)
+    db.expire_all()
+    assert db.get(FileBlob, blob.digest) is None
+    assert not _file_exists(blob.path)
+
+
+def test_referenced_blob_is_kept(db):
+    content = _png()
+    blob = _stale_blob(db, content)
+    _upload(db, content, uuid.uuid4())
+    db.get(FileBlob, blob.digest).last_stored_at = datetime.utcnow() - timedelta(days=2)
+    db.commit()
+
+    anyio.run(FileService.collect_garbage, db, 3600)
+    db.expire_all()
+    assert db.get(FileBlob, blob.digest) is not None
+    assert _file_exists(blob.path)
+
+
+def test_upload_rewrites_a_blob_collected_after_its_dedup_check(db, monkeypatch):
+    content = _png()
+    blob = _stale_blob(db, content)
+    keep = FileService._keep_stored_blob
+
+    async def collect_first(digest):
+        # The upload found the file already stored; GC removes row and file now
+        gc_db = SessionLocal()
+        try:
+            await FileService.collect_garbage(gc_db, 3600)
+        finally:
+            gc_db.close()
+        assert not await get_storage().file_exists(blob.path)
+        return await keep(digest)
+
+    monkeypatch.setattr(FileService, "_keep_stored_blob", collect_first)
+    owner_id = uuid.uuid4()
+    stored = _upload(db, content, owner_id)
+
+    assert stored["blob"].created
+    assert _file_exists(blob.path)
+    db.expire_all()
+    assert db.get(FileBlob, blob.digest) is not None
+    assert db.query(FileReference).filter(FileReference.owner_id == owner_id).count() == 1
+
+
+def test_upload_that_refreshed_the_blob_first_keeps_it(db, monkeypatch):
+    content = _png()
+    blob = _stale_blob(db, content)
+    keep = FileService._keep_stored_blob
+
+    async def collect_after(digest):
+        kept = await keep(digest)
+        gc_db = SessionLocal()
+        try:
+            await FileService.collect_garbage(gc_db, 3600)
+        finally:
+            gc_db.close()
+        return kept
+
+    monkeypatch.setattr(FileService, "_keep_stored_blob", collect_after)
+    stored = _upload(db, content, uuid.uuid4())
+
+    assert not stored["blob"].created
+    assert _file_exists(blob.path)
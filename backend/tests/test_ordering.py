@@ -0,0 +1,130 @@
+"""
+Sparse ordering keys: positions in the API, single-row moves and write budgets
+"""
+import pytest
+
+from benchmarks.budgets import FLOW_SIZES, WRITE_BUDGETS, endpoint_url
+from benchmarks.synthetic import build_flow
+
+
+def _build(stages, blocks, hires):
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return build_flow(db, stages, blocks, hires)
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module", params=FLOW_SIZES, ids=lambda size: "x".join(map(str, size)))
+def flow(request, client):
+    return _build(*request.param)
+
+
+@pytest.fixture
+def stage_flow(client):
+    """A flow with three stages of four blocks"""
+    return _build(3, 4, 1)
+
+
+def _headers(flow):
+    return {"Authorization": f"Bearer {flow.access_token}"}
+
+
+def _blocks_url(flow):
+    return f"/api/content-blocks/stages/{flow.stage_ids[0]}/content-blocks"
+
+
+def _listed(client, flow):
+    response = client.get(_blocks_url(flow), headers=_headers(flow))
+    assert response.status_code == 200, response.text
+    return [(block["id"], block["order_index"]) for block in response.json()]
+
+
+@pytest.mark.parametrize("endpoint", list(WRITE_BUDGETS))
+def test_write_budget(endpoint, flow, client, query_budget):
+    budget, body = WRITE_BUDGETS[endpoint]
+    method = endpoint.split(" ", 1)[0]
+    with query_budget(budget, endpoint):
+        response = client.request(method, endpoint_url(endpoint, flow), json=body(flow), headers=_headers(flow))
+    assert response.status_code == 200, response.text
+
+
+def test_responses_return_positions(client, stage_flow):
+    assert _listed(client, stage_flow) == [(block_id, n) for n, block_id in enumerate(stage_flow.block_ids, 1)]
+
+    response = client.get(f"/api/content-blocks/content-blocks/{stage_flow.block_ids[2]}", headers=_headers(stage_flow))
+    assert response.json()["order_index"] == 3
+
+    response = client.get(
+        f"/api/stages/flows/{stage_flow.flow_id}/stages/{stage_flow.stage_ids[0]}", headers=_headers(stage_flow)
+    )
+    assert [block["order_index"] for block in response.json()["content_blocks"]] == [1, 2, 3, 4]
+
+
+def test_create_inserts_at_position(client, stage_flow):
+    response = client.post(
+        _blocks_url(stage_flow),
+        json={
+            "type": "header",
+            "config": {
+                "label": "Second",
+                "description": None,
+                "validation": {"rules": [], "messages": {}},
+                "display": {},
+                "style": {},
+            },
+            "content": {"title": "Second"},
+            "order_index": 2,
+        },
+        headers=_headers(stage_flow),
+    )
+    assert response.status_code == 200, response.text
+    created = response.json()
+    assert created["order_index"] == 2
+
+    ids = [stage_flow.block_ids[0], created["id"], *stage_flow.block_ids[1:]]
+    assert _listed(client, stage_flow) == [(block_id, n) for n, block_id in enumerate(ids, 1)]
+
+
+def test_move_returns_new_position(client, stage_flow):
+    first, second, third, last = stage_flow.block_ids
+    response = client.post(
+        f"{_blocks_url(stage_flow)}/{last}/move", json={"after_id": first}, headers=_headers(stage_flow)
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["order_index"] == 2
+    assert _listed(client, stage_flow) == [(first, 1), (last, 2), (second, 3), (third, 4)]
+
+    response = client.post(
+        f"{_blocks_url(stage_flow)}/{third}/move", json={"after_id": None}, headers=_headers(stage_flow)
+    )
+    assert response.json()["order_index"] == 1
+
+
+def test_reorder_returns_positions(client, stage_flow):
+    body = {"content_blocks": [{"id": stage_flow.block_ids[-1], "order_index": 1}]}
+    response = client.post(f"{_blocks_url(stage_flow)}/reorder", json=body, headers=_headers(stage_flow))
+    assert response.status_code == 200, response.text
+    ids = [stage_flow.block_ids[-1], *stage_flow.block_ids[:-1]]
+    assert [(block["id"], block["order_index"]) for block in response.json()] == [
+        (block_id, n) for n, block_id in enumerate(ids, 1)
+    ]
+
+
+def test_move_after_itself_is_rejected(client, stage_flow):
+    block_id = stage_flow.block_ids[1]
+    response = client.post(
+        f"{_blocks_url(stage_flow)}/{block_id}/move", json={"after_id": block_id}, headers=_headers(stage_flow)
+    )
+    assert response.status_code == 400
+
+    stage_id = stage_flow.stage_ids[1]
+    response = client.post(
+        f"/api/stages/flows/{stage_flow.flow_id}/stages/{stage_id}/move",
+        json={"after_id": stage_id},
+        headers=_headers(stage_flow),
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "A stage cannot be moved after itself"
@@ -0,0 +1,34 @@
+"""
+Per-endpoint read query budgets, on the synthetic flows of benchmarks.query_budgets
+"""
+import pytest
+
+from benchmarks.budgets import ENDPOINT_BUDGETS, FLOW_SIZES, endpoint_url
+from benchmarks.synthetic import build_flow
+
+
+@pytest.fixture(scope="module", params=FLOW_SIZES, ids=lambda size: "x".join(map(str, size)))
+def flow(request, client):
+    from app.database import SessionLocal
+
+    stages, blocks, hires = request.param
+    db = SessionLocal()
+    try:
+        return build_flow(db, stages, blocks, hires, completed_stages=stages // 2)
+    finally:
+        db.close()
+
+
+def _headers(flow):
+    return {"Authorization": f"Bearer {flow.access_token}"}
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINT_BUDGETS))
+def test_read_budget(endpoint, flow, client, query_budget):
+    budget = ENDPOINT_BUDGETS[endpoint]
+    if budget is None:
+        pytest.skip("known N+1, not enforced")
+    with query_budget(budget, endpoint):
+        response = client.get(endpoint_url(endpoint, flow), headers=_headers(flow))
+    assert response.status_code == 200, response.text
+
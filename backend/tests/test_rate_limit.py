@@ -0,0 +1,175 @@
+"""
+Sliding window rate limiting, and its backends: shared counters, fallback when
+the store fails, cleanup
+"""
+import sqlite3
+import threading
+
+import anyio
+import pytest
+
+from app.rate_limit.base import evaluate_sliding_window
+from app.rate_limit.memory_backend import MemoryBackend
+from app.rate_limit.sqlite_backend import SQLiteBackend
+
+WINDOW = 60
+NOW = 1_000_040.0  # a third into a window
+
+
+def _hits(backend, key, count, limit=5, now=NOW):
+    async def run():
+        return [await backend.hit(key, limit, WINDOW, now) for _ in range(count)]
+    return anyio.run(run)
+
+
+def _allowed(results):
+    return [result.allowed for result in results]
+
+
+def test_window_admits_up_to_the_limit():
+    results = _hits(MemoryBackend(100), "ip:1", 7)
+    assert _allowed(results) == [True] * 5 + [False] * 2
+    assert [result.remaining for result in results] == [4, 3, 2, 1, 0, 0, 0]
+    # The window started 20s before NOW
+    assert all(result.reset_at == NOW + 40 for result in results)
+    # ...and then 12s more, until the full window has decayed enough for one more
+    assert results[-1].retry_after == 40 + 12
+
+
+def test_previous_window_is_weighted_by_its_remaining_share():
+    backend = MemoryBackend(100)
+    _hits(backend, "ip:1", 10, limit=10, now=NOW)
+    next_window = NOW - 20 + WINDOW
+    # A quarter into the next window, 3/4 of the previous 10 still count
+    assert _allowed(_hits(backend, "ip:1", 4, limit=10, now=next_window + 15)) == [True, True, False, False]
+    # Two windows later nothing counts any more
+    assert _allowed(_hits(backend, "ip:1", 10, limit=10, now=next_window + 2 * WINDOW)) == [True] * 10
+
+
+def test_rejected_requests_are_not_counted():
+    backend = MemoryBackend(100)
+    _hits(backend, "ip:1", 50, limit=5)
+    assert backend.store.get("ip:1").current == 5
+
+
+def test_retry_after_is_when_a_request_fits_again():
+    backend = MemoryBackend(100)
+    _hits(backend, "ip:1", 10, limit=10, now=NOW)
+    later = NOW - 20 + WINDOW + 5  # early in the next window
+    _hits(backend, "ip:1", 1, limit=10, now=later)
+    rejected = _hits(backend, "ip:1", 1, limit=10, now=later)[0]
+    assert not rejected.allowed
+    assert not _hits(backend, "ip:1", 1, limit=10, now=later + rejected.retry_after - 1)[0].allowed
+    assert _hits(backend, "ip:1", 1, limit=10, now=later + rejected.retry_after)[0].allowed
+
+
+def test_retry_after_a_full_window():
+    backend = MemoryBackend(100)
+    rejected = _hits(backend, "ip:1", 6, limit=5)[-1]
+    assert not _hits(backend, "ip:1", 1, limit=5, now=NOW + rejected.retry_after - 1)[0].allowed
+    assert _hits(backend, "ip:1", 1, limit=5, now=NOW + rejected.retry_after)[0].allowed
+
+
+@pytest.mark.parametrize("previous, current", [(0, 0), (7, 0), (10, 3), (3, 9), (10, 10)])
+def test_estimate_matches_the_weighted_sum(previous, current):
+    for elapsed in (0, 15, 30, 59):
+        result = evaluate_sliding_window(previous, current, 10, WINDOW, 600.0 + elapsed)
+        estimated = previous * (1 - elapsed / WINDOW) + current
+        assert result.allowed == (estimated + 1 <= 10)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "rate-limit.sqlite3")
+
+
+def test_sqlite_counters_are_shared_by_workers(sqlite_path):
+    worker_a, worker_b = SQLiteBackend(sqlite_path), SQLiteBackend(sqlite_path)
+    try:
+        assert all(result.allowed for result in _hits(worker_a, "ip:1", 3))
+        results = _hits(worker_b, "ip:1", 3)
+        assert [result.allowed for result in results] == [True, True, False]
+        assert worker_b.errors == 0
+        assert worker_b.metrics()["rows"] == 1
+    finally:
+        anyio.run(worker_a.close)
+        anyio.run(worker_b.close)
+
+
+def test_sqlite_locked_file_falls_back_to_memory(sqlite_path):
+    backend = SQLiteBackend(sqlite_path)
+    holder = sqlite3.connect(sqlite_path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        # Each hit waits out the one second busy timeout
+        results = _hits(backend, "ip:1", 3, limit=2)
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    # Decided by the per-process fallback, which still enforces the limit
+    assert [result.allowed for result in results] == [True, True, False]
+    assert backend.errors == 3
+    assert "locked" in backend.last_error
+    assert backend.metrics()["fallback"]["keys"] == 1
+    anyio.run(backend.close)
+
+
+def test_sqlite_metrics_survive_a_broken_file(sqlite_path):
+    backend = SQLiteBackend(sqlite_path)
+    backend._connect().execute("DROP TABLE rate_limit_counters")
+    metrics = backend.metrics()
+    assert metrics["rows"] is None
+    assert backend.errors == 1
+    anyio.run(backend.close)
+
+
+def test_sqlite_close_closes_every_thread_connection(sqlite_path):
+    backend = SQLiteBackend(sqlite_path)
+    threads = [threading.Thread(target=backend._hit, args=("ip:1", 100, WINDOW, NOW)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections = list(backend._connections)
+    assert len(connections) == 4  # the constructor's and one per thread
+
+    anyio.run(backend.close)
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # Usable again afterwards, on new connections
+    assert _hits(backend, "ip:1", 1)[0].allowed
+    anyio.run(backend.close)
+
+
+def test_redis_outage_falls_back_and_opens_the_circuit():
+    pytest.importorskip("redis")
+    from app.rate_limit.redis_backend import RedisBackend
+
+    # Nothing listens on port 1
+    backend = RedisBackend("redis://127.0.0.1:1/0", timeout=0.1, retry_seconds=60)
+    try:
+        results = _hits(backend, "ip:1", 6)
+        assert [result.allowed for result in results] == [True] * 5 + [False]
+        # One failed attempt, then the fallback alone until retry_seconds pass
+        assert backend.errors == 1
+        assert backend.metrics()["circuit_open"]
+    finally:
+        anyio.run(backend.close)
+
+
+
+def test_metrics_endpoint_reports_sqlite_rows(client, sqlite_path):
+    from app.rate_limit.factory import get_rate_limit_backend, set_rate_limit_backend
+
+    previous = get_rate_limit_backend()
+    backend = SQLiteBackend(sqlite_path)
+    set_rate_limit_backend(backend)
+    try:
+        _hits(backend, "ip:1", 1)
+        response = client.get("/metrics")
+    finally:
+        set_rate_limit_backend(previous)
+        anyio.run(backend.close)
+    assert response.status_code == 200
+    assert response.json()["rate_limit"]["rows"] == 1
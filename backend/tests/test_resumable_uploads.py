@@ -0,0 +1,102 @@
+"""
+Chunked uploads: offsets, finalizing, and no open transaction while bytes move
+"""
+import hashlib
+import os
+import uuid
+
+import anyio
+
+from app.models.new_hire import NewHire
+from app.models.resumable_upload import ResumableUpload
+from app.services.file_service import FileService, OWNER_ONBOARDING_UPLOAD
+
+
+def _png(size: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + os.urandom(size - 8)
+
+
+def _start(client, flow, body: bytes):
+    response = client.post(
+        f"/api/onboarding/{flow.session_tokens[0]}/uploads/resumable",
+        json={
+            "filename": "recording.png",
+            "content_type": "image/png",
+            "size": len(body),
+            "sha256": hashlib.sha256(body).hexdigest()
+        }
+    )
+    assert response.status_code == 201, response.text
+    return f"/api/onboarding/{flow.session_tokens[0]}/uploads/resumable/{response.json()['upload_id']}"
+
+
+def test_chunks_then_finalize(client, small_flow):
+    body = _png(10_000)
+    url = _start(client, small_flow, body)
+
+    first = client.patch(url, content=body[:4000], headers={"Upload-Offset": "0"})
+    assert first.status_code == 200 and first.json()["offset"] == 4000
+    # A retried chunk at a stale offset is told where to resume
+    stale = client.patch(url, content=body[:4000], headers={"Upload-Offset": "0"})
+    assert stale.status_code == 409 and stale.headers["Upload-Offset"] == "4000"
+    assert client.patch(url, content=body[4000:], headers={"Upload-Offset": "4000"}).json()["offset"] == len(body)
+
+    finalized = client.post(f"{url}/finalize")
+    assert finalized.status_code == 200, finalized.text
+    assert finalized.json()["data"]["size"] == len(body)
+    assert client.post(f"{url}/finalize").status_code == 404
+
+
+def test_finalize_rejects_other_content(client, small_flow):
+    body = _png(2048)
+    url = _start(client, small_flow, body)
+    client.patch(url, content=_png(2048), headers={"Upload-Offset": "0"})
+    assert client.post(f"{url}/finalize").status_code == 400
+
+
+def _upload(db, flow, body: bytes) -> ResumableUpload:
+    new_hire = db.get(NewHire, uuid.UUID(flow.new_hire_ids[0]))
+    created = FileService.create_resumable_upload(
+        db, OWNER_ONBOARDING_UPLOAD, new_hire.id, new_hire.company_id, "x.png", "image/png", len(body)
+    )
+    return created["upload"]
+
+
+async def _chunks(body: bytes):
+    yield body
+
+
+def test_chunk_is_stored_outside_a_transaction(db, small_flow):
+    body = _png(4096)
+    upload = _upload(db, small_flow, body)
+    seen = []
+
+    async def chunks():
+        seen.append(db.in_transaction())
+        yield body
+
+    result = anyio.run(FileService.append_resumable_upload, db, upload, 0, chunks())
+    assert result == {"success": True, "offset": len(body)}
+    assert seen == [False]
+    # The session stays usable for the rest of the request
+    assert db.get(ResumableUpload, upload.id).received == len(body)
+
+
+def test_parts_are_assembled_outside_a_transaction(db, small_flow, monkeypatch):
+    body = _png(4096)
+    upload = _upload(db, small_flow, body)
+    anyio.run(FileService.append_resumable_upload, db, upload, 0, _chunks(body))
+    upload = db.get(ResumableUpload, upload.id)
+
+    store_blob = FileService.store_blob
+    seen = []
+
+    async def watched(*args, **kwargs):
+        seen.append(db.in_transaction())
+        return await store_blob(*args, **kwargs)
+
+    monkeypatch.setattr(FileService, "store_blob", watched)
+    stored = anyio.run(FileService.finalize_resumable_upload, db, upload)
+    assert stored["success"] and stored["blob"].size == len(body)
+    assert seen == [False]
+
@@ -0,0 +1,76 @@
+"""
+Signed onboarding session tokens: forgery, tampering and revocation
+"""
+import hashlib
+import hmac
+import uuid
+from datetime import datetime, timedelta
+
+from app.auth import session_tokens
+from app.auth.session_tokens import decode_session_token, issue_session_token
+from app.models.new_hire import NewHire
+
+
+def _session(client, token):
+    return client.get(f"/api/onboarding/{token}")
+
+
+def _ids():
+    return uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def test_token_round_trip():
+    new_hire_id, flow_id, company_id = _ids()
+    expires_at = datetime(2030, 1, 1)
+    claims = decode_session_token(issue_session_token(new_hire_id, flow_id, company_id, expires_at, 3))
+    assert (claims.new_hire_id, claims.flow_id, claims.company_id) == (new_hire_id, flow_id, company_id)
+    assert claims.expires_at == expires_at
+    assert claims.generation == 3
+    assert not claims.is_expired()
+
+
+def test_tampered_payload_is_rejected():
+    token = issue_session_token(*_ids(), datetime(2030, 1, 1), 1)
+    prefix, payload, signature = token.split(".")
+    other_payload = issue_session_token(*_ids(), datetime(2030, 1, 1), 1).split(".")[1]
+    for forged in (
+        f"{prefix}.{other_payload}.{signature}",
+        f"{prefix}.{payload}.{signature[:-2]}AA",
+        f"{prefix}.{payload[:-4]}.{signature}",
+        f"{prefix}.{payload}",
+        f"{prefix}.!!.{signature}",
+    ):
+        assert decode_session_token(forged) is None, forged
+
+
+def test_token_signed_with_another_key_is_rejected(monkeypatch):
+    monkeypatch.setattr(
+        session_tokens, "_signing_key", hmac.new(b"another-secret", b"onboarding-session-token", hashlib.sha256).digest()
+    )
+    forged = issue_session_token(*_ids(), datetime(2030, 1, 1), 1)
+    monkeypatch.undo()
+    assert decode_session_token(forged) is None
+
+
+def test_forged_token_is_refused_before_the_route(client, small_flow):
+    prefix, payload, signature = small_flow.session_tokens[0].split(".")
+    response = _session(client, f"{prefix}.{payload}.{'A' * len(signature)}")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid onboarding session token"
+
+
+def test_valid_token_for_missing_new_hire_is_not_found(client):
+    response = _session(client, issue_session_token(*_ids(), datetime.utcnow() + timedelta(days=1), 1))
+    assert response.status_code == 404
+
+
+def test_reissuing_revokes_earlier_tokens(client, db, small_flow):
+    old_token = small_flow.session_tokens[0]
+    assert _session(client, old_token).status_code == 200
+
+    new_hire = db.get(NewHire, uuid.UUID(small_flow.new_hire_ids[0]))
+    new_token = new_hire.issue_session_token(datetime.utcnow() + timedelta(days=7))
+    db.commit()
+
+    assert _session(client, old_token).status_code == 404
+    assert _session(client, new_token).status_code == 200
@@ -0,0 +1,155 @@
+"""
+Signed upload URLs: forged and reused tokens, and direct uploads to a staging key
+"""
+import base64
+import dataclasses
+import hashlib
+import io
+import os
+
+import anyio
+import pytest
+
+from app.database import SessionLocal
+from app.storage.factory import get_storage
+from app.storage.local import LocalStorage
+from app.storage.signed_urls import decode_upload_token, issue_upload_token
+
+
+def _png(size: int = 4096) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + os.urandom(size - 8)
+
+
+def _sign(client, flow, body: bytes, **extra):
+    response = client.post(
+        f"/api/onboarding/{flow.session_tokens[0]}/uploads/sign",
+        json={"filename": "scan.png", "content_type": "image/png", "size": len(body), **extra}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _complete(client, flow, upload_token: str):
+    return client.post(
+        f"/api/onboarding/{flow.session_tokens[0]}/uploads/complete", json={"upload_token": upload_token}
+    )
+
+
+def test_signed_upload_round_trip(client, small_flow):
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    stored = client.put(signed["upload_url"], content=body, headers=signed["headers"])
+    assert stored.status_code == 200, stored.text
+
+    completed = _complete(client, small_flow, stored.json()["upload_token"])
+    assert completed.status_code == 200, completed.text
+    assert completed.json()["data"]["size"] == len(body)
+
+
+def test_upload_url_accepts_one_body(client, small_flow):
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    assert client.put(signed["upload_url"], content=body, headers=signed["headers"]).status_code == 200
+    assert client.put(signed["upload_url"], content=body, headers=signed["headers"]).status_code == 403
+
+
+def test_upload_token_completes_once(client, small_flow):
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    receipt = client.put(signed["upload_url"], content=body, headers=signed["headers"]).json()["upload_token"]
+    assert _complete(client, small_flow, receipt).status_code == 200
+    assert _complete(client, small_flow, receipt).status_code == 400
+
+
+def test_forged_upload_tokens_are_rejected(client, small_flow):
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    token = signed["upload_url"].rsplit("/", 1)[1]
+    prefix, payload, signature = token.split(".")
+
+    tampered = payload[:-2] + ("AA" if not payload.endswith("AA") else "BB")
+    for forged in (f"{prefix}.{tampered}.{signature}", f"{prefix}.{payload}.{'A' * len(signature)}", "u1.e30.x"):
+        assert client.put(f"/files/uploads/{forged}", content=body, headers=signed["headers"]).status_code == 403
+        assert _complete(client, small_flow, forged).status_code == 400
+
+
+def test_receipt_for_another_owner_is_rejected(client, small_flow):
+    from benchmarks.synthetic import build_flow
+
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    receipt = client.put(signed["upload_url"], content=body, headers=signed["headers"]).json()["upload_token"]
+
+    db = SessionLocal()
+    try:
+        stranger = build_flow(db, 1, 1, 1)
+    finally:
+        db.close()
+    assert _complete(client, stranger, receipt).status_code == 400
+    assert _complete(client, small_flow, receipt).status_code == 200
+
+
+def test_oversized_and_mistyped_bodies_are_rejected(client, small_flow):
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    response = client.put(signed["upload_url"], content=body + b"extra", headers=signed["headers"])
+    assert response.status_code == 413
+
+    signed = _sign(client, small_flow, body)
+    response = client.put(signed["upload_url"], content=b"MZ" + body[2:], headers=signed["headers"])
+    assert response.status_code == 415
+
+
+@pytest.fixture
+def direct_uploads(monkeypatch):
+    """Let LocalStorage hand out "direct" upload URLs, like S3, to a staging key"""
+    staged = {}
+
+    def presign_upload(self, file_path, content_type, size, sha256, expires_in):
+        staged["path"] = file_path
+        return {"url": f"direct://{file_path}", "method": "PUT", "headers": {"Content-Type": content_type}}
+
+    monkeypatch.setattr(LocalStorage, "presign_upload", presign_upload)
+    return staged
+
+
+async def _put_staged(path: str, body: bytes) -> None:
+    await get_storage().write_part(path, io.BytesIO(body), len(body))
+
+
+def test_direct_upload_needs_the_content_not_just_its_hash(client, small_flow, direct_uploads):
+    victim = _png()
+    digest = hashlib.sha256(victim).hexdigest()
+    # Someone who knows a file's hash and size signs an upload for it...
+    signed = _sign(client, small_flow, victim, sha256=digest)
+    assert direct_uploads["path"].startswith("tmp/signed/")
+    assert not direct_uploads["path"].startswith("blobs/")
+
+    # ...and completes without uploading anything
+    response = _complete(client, small_flow, signed["upload_token"])
+    assert response.status_code == 400 and "not been uploaded" in response.json()["detail"]
+
+    # ...or with other content of the same size
+    anyio.run(_put_staged, direct_uploads["path"], _png(len(victim)))
+    response = _complete(client, small_flow, signed["upload_token"])
+    assert response.status_code == 400 and "checksum" in response.json()["detail"]
+
+
+def test_direct_upload_is_promoted_once(client, small_flow, direct_uploads):
+    body = _png()
+    signed = _sign(client, small_flow, body, sha256=base64.b64encode(hashlib.sha256(body).digest()).decode())
+    anyio.run(_put_staged, direct_uploads["path"], body)
+
+    first = _complete(client, small_flow, signed["upload_token"])
+    assert first.status_code == 200, first.text
+    assert first.json()["data"]["size"] == len(body)
+    assert not anyio.run(get_storage().file_exists, direct_uploads["path"])
+    assert _complete(client, small_flow, signed["upload_token"]).status_code == 400
+
+
+def test_expired_upload_token_is_rejected(client, small_flow):
+    body = _png()
+    signed = _sign(client, small_flow, body)
+    claims = decode_upload_token(signed["upload_token"])
+    expired = issue_upload_token(dataclasses.replace(claims, expires_at=1))
+    assert client.put(f"/files/uploads/{expired}", content=body, headers=signed["headers"]).status_code == 403
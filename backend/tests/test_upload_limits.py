@@ -0,0 +1,95 @@
+"""
+Upload size and type limits, checked while the file streams to storage
+"""
+import io
+import os
+
+import anyio
+import pytest
+
+from app.config import settings
+from app.storage.base import FileTooLarge, FileTypeNotAllowed
+from app.storage.local import LocalStorage
+from app.storage.validation import UploadValidator
+
+PNG = b"\x89PNG\r\n\x1a\n"
+JPEG = b"\xff\xd8\xff\xe0"
+
+
+def _upload(client, small_flow, content: bytes, content_type: str, filename: str = "scan.png"):
+    return client.post(
+        f"/api/onboarding/{small_flow.session_tokens[0]}/uploads",
+        files={"file": (filename, content, content_type)},
+    )
+
+
+def _leftovers(folder):
+    return [name for name in os.listdir(folder) if name.startswith(".upload-")] if os.path.isdir(folder) else []
+
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    monkeypatch.setattr(settings, "max_file_size", 4096)
+    monkeypatch.setattr(settings, "upload_chunk_size", 1024)
+    return 4096
+
+
+def test_validator_rejects_disallowed_and_missing_types():
+    for content_type in ("application/x-msdownload", "text/html", None, ""):
+        with pytest.raises(FileTypeNotAllowed):
+            UploadValidator(content_type, allowed_types=["image/png"])
+    # Parameters and case are ignored
+    assert UploadValidator("Image/PNG; charset=binary", allowed_types=["image/png"]).content_type == "image/png"
+
+
+def test_validator_checks_declared_and_running_size():
+    with pytest.raises(FileTooLarge):
+        UploadValidator("image/png", max_size=10, allowed_types=["image/png"], declared_size=11)
+
+    validator = UploadValidator("image/png", max_size=10, allowed_types=["image/png"])
+    validator.feed(PNG)
+    with pytest.raises(FileTooLarge):
+        validator.feed(b"123")
+
+
+@pytest.mark.parametrize("content_type, head", [
+    ("image/png", JPEG),
+    ("image/jpeg", PNG),
+    ("application/pdf", b"<html>"),
+    ("image/webp", b"RIFF\x00\x00\x00\x00WAVE"),
+    ("image/png", b""),
+])
+def test_validator_rejects_content_that_does_not_match_its_type(content_type, head):
+    validator = UploadValidator(content_type, allowed_types=[content_type])
+    with pytest.raises(FileTypeNotAllowed):
+        validator.feed(head)
+
+
+def test_oversized_stream_leaves_no_partial_file(client, small_limit):
+    storage = LocalStorage()
+    with pytest.raises(FileTooLarge):
+        anyio.run(storage.upload_file, io.BytesIO(PNG + os.urandom(small_limit)), "big.png", "limits", "image/png")
+    folder = storage.base_path / "limits"
+    assert _leftovers(folder) == []
+    assert not (folder / "big.png").exists()
+
+
+def test_client_filename_cannot_leave_the_folder(client):
+    storage = LocalStorage()
+    path = anyio.run(storage.upload_file, io.BytesIO(PNG + b"data"), "../../escape.png", "limits", "image/png")
+    assert path == os.path.join("limits", "escape.png")
+
+
+def test_upload_route_answers_413_and_415(client, small_flow, small_limit):
+    response = _upload(client, small_flow, PNG + os.urandom(small_limit), "image/png")
+    assert response.status_code == 413
+
+    response = _upload(client, small_flow, b"MZ\x90\x00", "application/x-msdownload", "tool.exe")
+    assert response.status_code == 415
+
+    # Declared as an image, but it is not one
+    response = _upload(client, small_flow, b"<script>alert(1)</script>", "image/png")
+    assert response.status_code == 415
+
+    response = _upload(client, small_flow, PNG + os.urandom(1024), "image/png")
+    assert response.status_code == 200, response.text